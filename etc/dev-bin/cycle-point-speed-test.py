@@ -0,0 +1,139 @@
+#!/usr/bin/env python2
+
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2018 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Time cycle point operations.
+
+Usage: cycle-point-speed-test.py [N_POINTS [CALENDAR]]
+
+Time comparison, sorting, min/max, add, subtract and hashing of N_POINTS
+hourly date-time cycle points, in the CALENDAR cycling mode (default
+gregorian), and of integer cycle points for reference. Use N_POINTS larger
+than the size of the caches of cycle point operations to time the worst case.
+"""
+
+import os
+import random
+import sys
+from time import time
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'lib'))
+
+from cylc.cycling import iso8601
+from cylc.cycling.integer import IntegerPoint, IntegerInterval
+
+
+def run(label, func, points, *args):
+    """Time func(points, *args), print microseconds per point."""
+    time0 = time()
+    func(points, *args)
+    print('%-8s %-16s %8.2f us/point' % (
+        label, func.__name__, (time() - time0) * 1.0e6 / len(points)))
+
+
+def compare(points):
+    """Compare each point with the next one."""
+    for point, other in zip(points, points[1:] + points[:1]):
+        point < other
+
+
+def sort(points):
+    """Sort the points."""
+    sorted(points)
+
+
+def min_max(points):
+    """Find minimum and maximum of the points."""
+    min(points)
+    max(points)
+
+
+def add(points, interval):
+    """Add an interval to each point."""
+    for point in points:
+        point + interval
+
+
+def sub_interval(points, interval):
+    """Subtract an interval from each point."""
+    for point in points:
+        point - interval
+
+
+def sub_point(points, other):
+    """Subtract a point from each point."""
+    for point in points:
+        point - other
+
+
+def hash_set(points):
+    """Put the points in a set."""
+    set(points)
+
+
+def main():
+    n_points = 20000
+    if sys.argv[1:]:
+        n_points = int(sys.argv[1])
+    calendar = 'gregorian'
+    if sys.argv[2:]:
+        calendar = sys.argv[2]
+    iso8601.init(time_zone='Z', cycling_mode=calendar)
+    random.seed(0)
+
+    interval = iso8601.ISO8601Interval('PT1H')
+    point = iso8601.ISO8601Point('20000101T0000Z')
+    point_strings = []
+    for _ in range(n_points):
+        point_strings.append(str(point))
+        point += interval
+    random.shuffle(point_strings)
+    time0 = time()
+    points = [
+        iso8601.ISO8601Point(point_string).standardise()
+        for point_string in point_strings]
+    print('%-8s %-16s %8.2f us/point' % (
+        'iso8601', 'standardise', (time() - time0) * 1.0e6 / len(points)))
+    for func, args in [
+            (compare, []),
+            (sort, []),
+            (min_max, []),
+            (add, [interval]),
+            (sub_interval, [interval]),
+            (sub_point, [points[0]]),
+            (hash_set, [])]:
+        # New point objects for each run, as in a running suite
+        points = [
+            iso8601.ISO8601Point(point_string)
+            for point_string in point_strings]
+        run('iso8601', func, points, *args)
+
+    integer_points = [IntegerPoint(str(i)) for i in range(n_points)]
+    random.shuffle(integer_points)
+    for func, args in [
+            (compare, []),
+            (sort, []),
+            (min_max, []),
+            (add, [IntegerInterval('P1')]),
+            (sub_interval, [IntegerInterval('P1')]),
+            (sub_point, [integer_points[0]]),
+            (hash_set, [])]:
+        run('integer', func, integer_points, *args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python2
+
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2018 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Measure the memory used per task proxy.
+
+Usage: task-proxy-memory-test.py [N_TASKS [N_CYCLES [N_OR]]]
+
+Generate a suite with N_TASKS tasks per hourly cycle, each with an inter-cycle
+trigger and a same-cycle trigger, plus a task with an N_OR-way conditional
+trigger. Create task proxies for N_CYCLES cycles, and report the growth of the
+resident set size of this process per task proxy.
+"""
+
+import gc
+import os
+import sys
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'lib'))
+
+from cylc.config import SuiteConfig
+from cylc.cycling.loader import get_point_relative
+from cylc.task_proxy import TaskProxy
+
+SUITE_RC = """
+[cylc]
+    UTC mode = True
+[scheduling]
+    initial cycle point = 2000
+    [[dependencies]]
+        [[[PT1H]]]
+            graph = \"\"\"
+%(graph)s
+\"\"\"
+[runtime]
+    [[root]]
+        script = true
+        [[[outputs]]]
+            hello = Hello World
+"""
+
+
+def get_rss():
+    """Return resident set size of this process in bytes."""
+    return int(open('/proc/self/statm').read().split()[1]) * os.sysconf(
+        'SC_PAGE_SIZE')
+
+
+def main():
+    n_tasks, n_cycles, n_or = [
+        int(arg) for arg in (sys.argv[1:] + ['100', '100', '50'][
+            len(sys.argv[1:]):])]
+    lines = ['t%d[-PT1H] => t%d => t%d' % (i, i, i + 1)
+             for i in range(n_tasks - 1)]
+    lines.append(' | '.join(
+        't%d:hello' % i for i in range(min(n_or, n_tasks))) + ' => any')
+    tmpdir = mkdtemp()
+    try:
+        with open(os.path.join(tmpdir, 'suite.rc'), 'wb') as handle:
+            handle.write(SUITE_RC % {'graph': '\n'.join(lines)})
+        config = SuiteConfig(
+            'task-proxy-memory-test', os.path.join(tmpdir, 'suite.rc'))
+    finally:
+        rmtree(tmpdir)
+    tdefs = config.taskdefs.values()
+    point = config.start_point
+    points = []
+    for _ in range(n_cycles):
+        points.append(point)
+        point = get_point_relative('PT1H', point)
+    # Warm up caches shared between proxies, e.g. of cycle point arithmetic
+    for point in points:
+        for tdef in tdefs:
+            TaskProxy(tdef, point)
+    gc.collect()
+    rss0 = get_rss()
+    time0 = time()
+    itasks = []
+    for point in points:
+        for tdef in tdefs:
+            itasks.append(TaskProxy(tdef, point))
+    elapsed = time() - time0
+    gc.collect()
+    rss1 = get_rss()
+    print('%d task proxies (%d tasks x %d cycles)' % (
+        len(itasks), len(tdefs), n_cycles))
+    print('%.1f bytes per task proxy' % (float(rss1 - rss0) / len(itasks)))
+    print('%.1f microseconds per task proxy' % (
+        elapsed * 1.0e6 / len(itasks)))
+
+
+if __name__ == '__main__':
+    main()
@@ -20,6 +20,8 @@
 import re
 from threading import RLock
 
+from parsec.util import poverride_copy
+
 from cylc.broadcast_report import (
     CHANGE_FMT, CHANGE_PREFIX_SET,
     get_broadcast_change_report,
@@ -36,6 +38,10 @@ class BroadcastMgr(object):
     Broadcast settings are stored in the form:
         self.broadcasts['*']['root'] = {'environment': {'FOO': 'bar'}}
         self.broadcasts['20100808T06Z']['root'] = {'script': 'stuff'}
+
+    Each change to the settings of a (point_string, namespace) records a new
+    value of the generation counter in self.generations, so that memoised
+    runtime configurations can be checked for changes in their broadcasts.
     """
 
     ALL_CYCLE_POINTS_STRS = ["*", "all-cycle-points", "all-cycles"]
@@ -47,6 +53,12 @@ class BroadcastMgr(object):
         self.broadcasts = {}
         self.ext_triggers = {}  # Can use collections.Counter in future
         self.lock = RLock()
+        # Generation counter, and latest generation by (point, namespace)
+        self.generation = 0
+        self.generations = {}
+        # (tdef.rtconfig, generation, runtime config) by
+        # (task name, point string or None if no point specific broadcast)
+        self.rtconfig_cache = {}
 
     def add_ext_triggers(self, ext_trigger_queue):
         """Add external triggers from queue."""
@@ -93,6 +105,7 @@ class BroadcastMgr(object):
                             elif (not cancel_keys_list or
                                     keys + [key] in cancel_keys_list):
                                 stuff[key] = None
+                                self._set_generation(point_string, namespace)
                                 setting = {key: value}
                                 for rkey in reversed(keys):
                                     setting = {rkey: setting}
@@ -102,6 +115,7 @@ class BroadcastMgr(object):
         # Prune any empty branches
         bad_options = self._get_bad_options(
             self._prune(), point_strings, namespaces, cancel_keys_list)
+        self._expire_rtconfig_cache()
 
         # Log the broadcast
         self.suite_db_mgr.put_broadcast(modified_settings, is_cancel=True)
@@ -152,6 +166,44 @@ class BroadcastMgr(object):
                     self._addict(ret, self.broadcasts[cycle][namespace])
         return ret
 
+    def get_rtconfig(self, tdef, point_string):
+        """Return runtime config of a task, with its broadcasts applied.
+
+        Memoise the result by (task name, point_string), or by (task name,
+        None) if no broadcast targets the point of the task specifically, so
+        tasks at all such points share the result. A result is reused until
+        there is a broadcast change to the task or its ancestors, or until
+        tdef.rtconfig is replaced by a reload. Sections not modified by any
+        broadcast are shared with tdef.rtconfig.
+        """
+        name = tdef.name
+        with self.lock:
+            generation = 0
+            point_key = None
+            for cycle in self.ALL_CYCLE_POINTS_STRS + [point_string]:
+                for namespace in self.linearized_ancestors[name]:
+                    try:
+                        gen = self.generations[(cycle, namespace)]
+                    except KeyError:
+                        continue
+                    generation = max(generation, gen)
+                    if cycle == point_string:
+                        point_key = point_string
+            key = (name, point_key)
+            try:
+                rtconfig_src, rtconfig_gen, rtconfig = self.rtconfig_cache[key]
+            except KeyError:
+                pass
+            else:
+                if rtconfig_src is tdef.rtconfig and rtconfig_gen == generation:
+                    return rtconfig
+            rtconfig = poverride_copy(
+                tdef.rtconfig,
+                self.get_broadcast(TaskID.get(name, point_string)),
+                prepend=True)
+            self.rtconfig_cache[key] = (tdef.rtconfig, generation, rtconfig)
+            return rtconfig
+
     def load_db_broadcast_states(self, row_idx, row):
         """Load broadcast variables from runtime DB broadcast states row."""
         if row_idx == 0:
@@ -170,6 +222,7 @@ class BroadcastMgr(object):
                 dict_.setdefault(section, {})
                 dict_ = dict_[section]
             dict_[cur_key] = value
+            self._set_generation(point, namespace)
         LOG.info(CHANGE_FMT.strip() % {
             "change": CHANGE_PREFIX_SET,
             "point": point,
@@ -240,6 +293,7 @@ class BroadcastMgr(object):
                             self._addict(
                                 self.broadcasts[point_string][namespace],
                                 setting)
+                            self._set_generation(point_string, namespace)
                             modified_settings.append(
                                 (point_string, namespace, setting))
 
@@ -264,6 +318,28 @@ class BroadcastMgr(object):
             else:
                 target[key] = source[key]
 
+    def _expire_rtconfig_cache(self):
+        """Forget generations and runtime configs of cleared cycle points.
+
+        Generations of all-cycle broadcasts are kept, because a generation
+        must not go back to an older value while a memoised runtime config
+        depends on it.
+        """
+        with self.lock:
+            for point_string, namespace in list(self.generations):
+                if (point_string not in self.ALL_CYCLE_POINTS_STRS and
+                        point_string not in self.broadcasts):
+                    del self.generations[(point_string, namespace)]
+            for name, point_string in list(self.rtconfig_cache):
+                if (point_string is not None and
+                        point_string not in self.broadcasts):
+                    del self.rtconfig_cache[(name, point_string)]
+
+    def _set_generation(self, point_string, namespace):
+        """Record a change to the broadcast of (point_string, namespace)."""
+        self.generation += 1
+        self.generations[(point_string, namespace)] = self.generation
+
     @staticmethod
     def _cancel_keys_in_prunes(prunes, cancel_keys):
         """Is cancel_keys pruned?"""
@@ -359,3 +435,98 @@ class BroadcastMgr(object):
                         else:
                             keys_list.append(keys + [key])
         return keys_list
+
+
+if __name__ == "__main__":
+    import unittest
+    from cylc.cycling.loader import DefaultCycler, INTEGER_CYCLING_TYPE
+    from parsec.OrderedDict import OrderedDictWithDefaults
+    from parsec.util import pdeepcopy, poverride
+
+    class _SuiteDatabaseManager(object):
+        """Mock suite database manager."""
+
+        def put_broadcast(self, *_, **__):
+            """Ignore broadcast."""
+            pass
+
+    class _TaskDef(object):
+        """Mock task definition."""
+
+        def __init__(self, name):
+            self.name = name
+            self.rtconfig = OrderedDictWithDefaults()
+            self.rtconfig['script'] = 'true'
+            self.rtconfig['environment'] = OrderedDictWithDefaults()
+            self.rtconfig['environment']['FOO'] = 'foo'
+            self.rtconfig.defaults_ = OrderedDictWithDefaults()
+            self.rtconfig.defaults_['remote'] = OrderedDictWithDefaults()
+            self.rtconfig.defaults_['remote']['host'] = None
+
+    class TestBroadcastMgr(unittest.TestCase):
+        """Test BroadcastMgr.get_rtconfig."""
+
+        def setUp(self):
+            DefaultCycler.TYPE = INTEGER_CYCLING_TYPE
+            self.broadcast_mgr = BroadcastMgr(_SuiteDatabaseManager())
+            self.broadcast_mgr.linearized_ancestors = {
+                'foo': ['foo', 'root'], 'bar': ['bar', 'root'],
+                'root': ['root']}
+            self.tdefs = {'foo': _TaskDef('foo'), 'bar': _TaskDef('bar')}
+
+        def _get_rtconfig(self, name, point_string):
+            """Check get_rtconfig against a deep copy, and return it."""
+            tdef = self.tdefs[name]
+            rtconfig = self.broadcast_mgr.get_rtconfig(tdef, point_string)
+            expected = pdeepcopy(tdef.rtconfig)
+            poverride(
+                expected,
+                self.broadcast_mgr.get_broadcast(
+                    TaskID.get(name, point_string)),
+                prepend=True)
+            self.assertEqual(expected, rtconfig)
+            self.assertEqual(expected.items(), rtconfig.items())
+            return rtconfig
+
+        def test_no_broadcast(self):
+            """Runtime config is shared if there is no broadcast."""
+            self.assertTrue(
+                self._get_rtconfig('foo', '1') is self.tdefs['foo'].rtconfig)
+
+        def test_broadcast(self):
+            """Runtime config is memoised until broadcast changes."""
+            self.broadcast_mgr.put_broadcast(
+                ['*'], ['root'], [{'environment': {'BAR': 'bar'}}])
+            rtconfig = self._get_rtconfig('foo', '1')
+            self.assertEqual(
+                ['BAR', 'FOO'], rtconfig['environment'].keys())
+            self.assertEqual(['FOO'], self.tdefs['foo'].rtconfig[
+                'environment'].keys())
+            # Shared by all points, unchanged sections shared with source
+            self.assertTrue(rtconfig is self._get_rtconfig('foo', '2'))
+            self.assertTrue(
+                rtconfig.defaults_ is self.tdefs['foo'].rtconfig.defaults_)
+            # Broadcast to a point, other points and tasks not affected
+            self.broadcast_mgr.put_broadcast(
+                ['2'], ['foo'], [{'remote': {'host': 'h2'}}])
+            self.assertTrue(rtconfig is self._get_rtconfig('foo', '1'))
+            rtconfig_2 = self._get_rtconfig('foo', '2')
+            self.assertEqual('h2', rtconfig_2['remote']['host'])
+            self.assertEqual(
+                None, self.tdefs['foo'].rtconfig['remote']['host'])
+            bar_rtconfig = self._get_rtconfig('bar', '2')
+            self.assertTrue(bar_rtconfig is self._get_rtconfig('bar', '1'))
+            # Clear broadcast to the point
+            self.broadcast_mgr.clear_broadcast(['2'])
+            self.assertEqual([], [
+                key for key in self.broadcast_mgr.rtconfig_cache
+                if key[1] is not None])
+            self.assertEqual(
+                None, self._get_rtconfig('foo', '2')['remote']['host'])
+            # Broadcast to root affects all
+            self.broadcast_mgr.put_broadcast(
+                ['*'], ['root'], [{'script': 'false'}])
+            self.assertEqual('false', self._get_rtconfig('foo', '1')['script'])
+            self.assertEqual('false', self._get_rtconfig('bar', '1')['script'])
+
+    unittest.main()
@@ -60,12 +60,15 @@ SPEC = {
         'maximum number of tries': vdr(vtype='integer', default=7),
         'connection timeout': vdr(
             vtype='interval', default=DurationFloat(30)),
+        'relay': vdr(vtype='boolean', default=False),
     },
 
     'cylc': {
         'UTC mode': vdr(vtype='boolean', default=False),
         'health check interval': vdr(
             vtype='interval', default=DurationFloat(600)),
+        'database persistent connection': vdr(
+            vtype='boolean', default=False),
         'task event mail interval': vdr(
             vtype='interval', default=DurationFloat(300)),
         'events': {
@@ -30,6 +30,7 @@ import traceback
 
 from cylc.c3mro import C3
 from cylc.conditional_simplifier import ConditionalSimplifier
+from cylc.config_cache import SuiteConfigCache
 from cylc.exceptions import CylcError
 from cylc.graph_parser import GraphParser
 from cylc.param_expand import NameExpander
@@ -53,7 +54,8 @@ from isodatetime.parsers import DurationParser
 from parsec.OrderedDict import OrderedDictWithDefaults
 from parsec.util import replicate
 from cylc.suite_logging import OUT, ERR
-from cylc.suite_srv_files_mgr import SuiteSrvFilesManager
+from cylc.suite_srv_files_mgr import (
+    SuiteSrvFilesManager, SuiteServiceFileError)
 from cylc.task_outputs import TASK_OUTPUT_SUCCEEDED
 from cylc.cfgspec.utils import (
     get_interval_as_seconds, DEFAULT_XTRIG_INTVL_SECS)
@@ -93,6 +95,8 @@ class SuiteConfig(object):
         'event', 'suite', 'point', 'name', 'submit_num', 'id', 'message',
         'batch_sys_name', 'batch_sys_job_id', 'submit_time', 'start_time',
         'finish_time', 'user@host')
+    # Attributes set by processing the sparse config, to cache with it.
+    CACHE_ATTRS = ['parameters', 'task_param_vars', 'ns_defn_order']
 
     def __init__(self, suite, fpath, template_vars=None,
                  owner=None, run_mode='live', is_validate=False, strict=False,
@@ -172,154 +176,24 @@ class SuiteConfig(object):
         self.cfg = self.pcfg.get(sparse=True)
         self.mem_log("config.py: after get(sparse=True)")
 
-        # First check for the essential scheduling section.
-        if 'scheduling' not in self.cfg:
-            raise SuiteConfigError("ERROR: missing [scheduling] section.")
-        if 'dependencies' not in self.cfg['scheduling']:
-            raise SuiteConfigError(
-                "ERROR: missing [scheduling][[dependencies]] section.")
-        # (The check that 'graph' is definied is below).
-        # The two runahead limiting schemes are mutually exclusive.
-        rlim = self.cfg['scheduling'].get('runahead limit', None)
-        mact = self.cfg['scheduling'].get('max active cycle points', None)
-        if rlim is not None and mact is not None:
-            raise SuiteConfigError(
-                "ERROR: use 'runahead limit' OR "
-                "'max active cycle points', not both")
-
-        # Override the suite defn with an initial point from the CLI.
-        if cli_initial_point_string is not None:
-            self.cfg['scheduling']['initial cycle point'] = (
-                cli_initial_point_string)
-
-        dependency_map = self.cfg.get('scheduling', {}).get(
-            'dependencies', {})
-
-        if not self.is_graph_defined(dependency_map):
-            raise SuiteConfigError('No suite dependency graph defined.')
-
-        if 'cycling mode' not in self.cfg.get('scheduling', {}):
-            # Auto-detect integer cycling for pure async graph suites.
-            if dependency_map.get('graph'):
-                # There is an async graph setting.
-                # If it is by itself, it is integer shorthand.
-                # If there are cycling graphs as well, it is obsolete
-                # (pre cylc-6) syntax.
-                just_has_async_graph = True
-                non_async_item = None
-                for item, value in dependency_map.items():
-                    if item != 'graph' and value.get('graph'):
-                        just_has_async_graph = False
-                        non_async_item = item
-                        break
-                icp = self.cfg['scheduling'].get('initial cycle point')
-                fcp = self.cfg['scheduling'].get('final cycle point')
-                if just_has_async_graph and not (
-                        icp in [None, "1"] and fcp in [None, icp]):
-                    raise SuiteConfigError(
-                        'Conflicting syntax: integer vs ' +
-                        'cycling suite: ' +
-                        'are you missing a [dependencies][[[R1]]] section?')
-                if just_has_async_graph:
-                    # There aren't any other graphs, so set integer cycling.
-                    self.cfg['scheduling']['cycling mode'] = (
-                        INTEGER_CYCLING_TYPE
-                    )
-                    if 'initial cycle point' not in self.cfg['scheduling']:
-                        self.cfg['scheduling']['initial cycle point'] = "1"
-                    if 'final cycle point' not in self.cfg['scheduling']:
-                        self.cfg['scheduling']['final cycle point'] = "1"
-                else:
-                    # Looks like cylc-5 mixed-async.
-                    raise SuiteConfigError(
-                        'Obsolete syntax: mixed integer [dependencies]graph ' +
-                        'with cycling [dependencies][{0}]'.format(
-                            non_async_item)
-                    )
-
-        # allow test suites with no [runtime]:
-        if 'runtime' not in self.cfg:
-            self.cfg['runtime'] = OrderedDictWithDefaults()
-
-        if 'root' not in self.cfg['runtime']:
-            self.cfg['runtime']['root'] = OrderedDictWithDefaults()
-
-        try:
-            parameter_values = self.cfg['cylc']['parameters']
-        except KeyError:
-            # (Suite config defaults not put in yet.)
-            parameter_values = {}
-        try:
-            parameter_templates = self.cfg['cylc']['parameter templates']
-        except KeyError:
-            parameter_templates = {}
-        # parameter values and templates are normally needed together.
-        self.parameters = (parameter_values, parameter_templates)
-
-        if cylc.flags.verbose:
-            OUT.info(
-                "Expanding [runtime] namespace lists and parameters")
-
-        # Set default parameter expansion templates if necessary.
-        for pname, pvalues in parameter_values.items():
-            if pvalues and pname not in parameter_templates:
-                if any(not isinstance(pvalue, int) for pvalue in pvalues):
-                    # Strings, bare parameter values
-                    parameter_templates[pname] = r'_%%(%s)s' % pname
-                elif any(pvalue < 0 for pvalue in pvalues):
-                    # Integers, with negative value(s)
-                    # Prefix values with signs and parameter names
-                    parameter_templates[pname] = r'_%s%%(%s)+0%dd' % (
-                        pname, pname,
-                        max(len(str(pvalue)) for pvalue in pvalues))
-                else:
-                    # Integers, positive only
-                    # Prefix values with parameter names
-                    parameter_templates[pname] = r'_%s%%(%s)0%dd' % (
-                        pname, pname, len(str(max(pvalues))))
-
-        # Expand parameters in 'special task' lists.
-        if 'special tasks' in self.cfg['scheduling']:
-            for spec, names in self.cfg['scheduling']['special tasks'].items():
-                self.cfg['scheduling']['special tasks'][spec] = (
-                    self._expand_name_list(names))
-
-        # Expand parameters in internal queue member lists.
-        if 'queues' in self.cfg['scheduling']:
-            for queue, cfg in self.cfg['scheduling']['queues'].items():
-                if 'members' not in cfg:
-                    continue
-                self.cfg['scheduling']['queues'][queue]['members'] = (
-                    self._expand_name_list(cfg['members']))
-
-        # Check environment variable names and parameter environment templates
-        # Done before inheritance to avoid repetition
-        self.check_env_names()
-        self.check_param_env_tmpls()
-        self.mem_log("config.py: before _expand_runtime")
-        self._expand_runtime()
-        self.mem_log("config.py: after _expand_runtime")
-
-        self.ns_defn_order = self.cfg['runtime'].keys()
-
-        self.mem_log("config.py: before compute_family_tree")
-        # do sparse inheritance
-        self.compute_family_tree()
-        self.mem_log("config.py: after compute_family_tree")
-        self.mem_log("config.py: before inheritance")
-        self.compute_inheritance()
-        self.mem_log("config.py: after inheritance")
-
-        # self.print_inheritance() # (debugging)
-
-        # filter task environment variables after inheritance
-        self.filter_env()
-
-        # Now add config defaults.  Items added prior to this ends up in the
-        # sparse dict (e.g. parameter-expanded namepaces).
-        self.mem_log("config.py: before get(sparse=False)")
-        self.cfg = self.pcfg.get(sparse=False)
-        self.mem_log("config.py: after get(sparse=False)")
+        # Re-use the result of processing an identical configuration, from
+        # the cache of a registered suite, or process it and cache the result.
+        cache = SuiteConfigCache(
+            self._get_cache_fname(), self.cfg, self.pcfg.spec,
+            cli_initial_point_string)
+        cached = cache.load()
+        if cached is None:
+            self._process_cfg(cli_initial_point_string)
+            cache.dump(
+                [self.pcfg.sparse, self.pcfg.dense, self.runtime] +
+                [getattr(self, attr) for attr in self.CACHE_ATTRS])
+        else:
+            self.mem_log("config.py: loaded processed config from cache")
+            self.pcfg.sparse, self.pcfg.dense, runtime = cached[0:3]
+            for attr, value in zip(self.CACHE_ATTRS, cached[3:]):
+                setattr(self, attr, value)
+            self._load_runtime(runtime)
+            self.cfg = self.pcfg.get(sparse=False)
 
         # after the call to init_cyclers, we can start getting proper points.
         init_cyclers(self.cfg)
@@ -712,6 +586,198 @@ class SuiteConfig(object):
 
         self.mem_log("config.py: end init config")
 
+    def _get_cache_fname(self):
+        """Return the path of the processed config cache file, or None.
+
+        Only cache the processed config of a registered suite whose source
+        directory is the directory of the suite definition being loaded.
+        """
+        srv_files_mgr = SuiteSrvFilesManager()
+        try:
+            source = srv_files_mgr.get_suite_source_dir(self.suite, self.owner)
+        except SuiteServiceFileError:
+            return None
+        if os.path.realpath(source) != os.path.realpath(self.fdir):
+            return None
+        return os.path.join(
+            srv_files_mgr.get_suite_srv_dir(self.suite, self.owner),
+            srv_files_mgr.FILE_BASE_SUITE_RC_CACHE)
+
+    def _load_runtime(self, runtime):
+        """Load the runtime hierarchy dicts from the cache.
+
+        Insert items in the same order as compute_family_tree, because the
+        iteration order of plain dicts (which matters in places) depends on
+        it, and does not survive pickling.
+        """
+        for key in ['parents', 'linearized ancestors', 'first-parent ancestors']:
+            for name in self.ns_defn_order:
+                self.runtime[key][name] = runtime[key][name]
+        for key, ancestors_key in [
+                ('descendants', 'linearized ancestors'),
+                ('first-parent descendants', 'first-parent ancestors')]:
+            for name in self.ns_defn_order:
+                for ancestor in runtime[ancestors_key][name][1:]:
+                    if ancestor not in self.runtime[key]:
+                        self.runtime[key][ancestor] = runtime[key][ancestor]
+
+    def _process_cfg(self, cli_initial_point_string):
+        """Process the sparse config.
+
+        Expand parameters and namespace lists, compute the runtime
+        inheritance hierarchy and inheritance, then add config defaults.
+        The result is the dense config in self.cfg, along with self.runtime
+        and the attributes in self.CACHE_ATTRS.
+        """
+        # First check for the essential scheduling section.
+        if 'scheduling' not in self.cfg:
+            raise SuiteConfigError("ERROR: missing [scheduling] section.")
+        if 'dependencies' not in self.cfg['scheduling']:
+            raise SuiteConfigError(
+                "ERROR: missing [scheduling][[dependencies]] section.")
+        # (The check that 'graph' is definied is below).
+        # The two runahead limiting schemes are mutually exclusive.
+        rlim = self.cfg['scheduling'].get('runahead limit', None)
+        mact = self.cfg['scheduling'].get('max active cycle points', None)
+        if rlim is not None and mact is not None:
+            raise SuiteConfigError(
+                "ERROR: use 'runahead limit' OR "
+                "'max active cycle points', not both")
+
+        # Override the suite defn with an initial point from the CLI.
+        if cli_initial_point_string is not None:
+            self.cfg['scheduling']['initial cycle point'] = (
+                cli_initial_point_string)
+
+        dependency_map = self.cfg.get('scheduling', {}).get(
+            'dependencies', {})
+
+        if not self.is_graph_defined(dependency_map):
+            raise SuiteConfigError('No suite dependency graph defined.')
+
+        if 'cycling mode' not in self.cfg.get('scheduling', {}):
+            # Auto-detect integer cycling for pure async graph suites.
+            if dependency_map.get('graph'):
+                # There is an async graph setting.
+                # If it is by itself, it is integer shorthand.
+                # If there are cycling graphs as well, it is obsolete
+                # (pre cylc-6) syntax.
+                just_has_async_graph = True
+                non_async_item = None
+                for item, value in dependency_map.items():
+                    if item != 'graph' and value.get('graph'):
+                        just_has_async_graph = False
+                        non_async_item = item
+                        break
+                icp = self.cfg['scheduling'].get('initial cycle point')
+                fcp = self.cfg['scheduling'].get('final cycle point')
+                if just_has_async_graph and not (
+                        icp in [None, "1"] and fcp in [None, icp]):
+                    raise SuiteConfigError(
+                        'Conflicting syntax: integer vs ' +
+                        'cycling suite: ' +
+                        'are you missing a [dependencies][[[R1]]] section?')
+                if just_has_async_graph:
+                    # There aren't any other graphs, so set integer cycling.
+                    self.cfg['scheduling']['cycling mode'] = (
+                        INTEGER_CYCLING_TYPE
+                    )
+                    if 'initial cycle point' not in self.cfg['scheduling']:
+                        self.cfg['scheduling']['initial cycle point'] = "1"
+                    if 'final cycle point' not in self.cfg['scheduling']:
+                        self.cfg['scheduling']['final cycle point'] = "1"
+                else:
+                    # Looks like cylc-5 mixed-async.
+                    raise SuiteConfigError(
+                        'Obsolete syntax: mixed integer [dependencies]graph ' +
+                        'with cycling [dependencies][{0}]'.format(
+                            non_async_item)
+                    )
+
+        # allow test suites with no [runtime]:
+        if 'runtime' not in self.cfg:
+            self.cfg['runtime'] = OrderedDictWithDefaults()
+
+        if 'root' not in self.cfg['runtime']:
+            self.cfg['runtime']['root'] = OrderedDictWithDefaults()
+
+        try:
+            parameter_values = self.cfg['cylc']['parameters']
+        except KeyError:
+            # (Suite config defaults not put in yet.)
+            parameter_values = {}
+        try:
+            parameter_templates = self.cfg['cylc']['parameter templates']
+        except KeyError:
+            parameter_templates = {}
+        # parameter values and templates are normally needed together.
+        self.parameters = (parameter_values, parameter_templates)
+
+        if cylc.flags.verbose:
+            OUT.info(
+                "Expanding [runtime] namespace lists and parameters")
+
+        # Set default parameter expansion templates if necessary.
+        for pname, pvalues in parameter_values.items():
+            if pvalues and pname not in parameter_templates:
+                if any(not isinstance(pvalue, int) for pvalue in pvalues):
+                    # Strings, bare parameter values
+                    parameter_templates[pname] = r'_%%(%s)s' % pname
+                elif any(pvalue < 0 for pvalue in pvalues):
+                    # Integers, with negative value(s)
+                    # Prefix values with signs and parameter names
+                    parameter_templates[pname] = r'_%s%%(%s)+0%dd' % (
+                        pname, pname,
+                        max(len(str(pvalue)) for pvalue in pvalues))
+                else:
+                    # Integers, positive only
+                    # Prefix values with parameter names
+                    parameter_templates[pname] = r'_%s%%(%s)0%dd' % (
+                        pname, pname, len(str(max(pvalues))))
+
+        # Expand parameters in 'special task' lists.
+        if 'special tasks' in self.cfg['scheduling']:
+            for spec, names in self.cfg['scheduling']['special tasks'].items():
+                self.cfg['scheduling']['special tasks'][spec] = (
+                    self._expand_name_list(names))
+
+        # Expand parameters in internal queue member lists.
+        if 'queues' in self.cfg['scheduling']:
+            for queue, cfg in self.cfg['scheduling']['queues'].items():
+                if 'members' not in cfg:
+                    continue
+                self.cfg['scheduling']['queues'][queue]['members'] = (
+                    self._expand_name_list(cfg['members']))
+
+        # Check environment variable names and parameter environment templates
+        # Done before inheritance to avoid repetition
+        self.check_env_names()
+        self.check_param_env_tmpls()
+        self.mem_log("config.py: before _expand_runtime")
+        self._expand_runtime()
+        self.mem_log("config.py: after _expand_runtime")
+
+        self.ns_defn_order = self.cfg['runtime'].keys()
+
+        self.mem_log("config.py: before compute_family_tree")
+        # do sparse inheritance
+        self.compute_family_tree()
+        self.mem_log("config.py: after compute_family_tree")
+        self.mem_log("config.py: before inheritance")
+        self.compute_inheritance()
+        self.mem_log("config.py: after inheritance")
+
+        # self.print_inheritance() # (debugging)
+
+        # filter task environment variables after inheritance
+        self.filter_env()
+
+        # Now add config defaults.  Items added prior to this ends up in the
+        # sparse dict (e.g. parameter-expanded namepaces).
+        self.mem_log("config.py: before get(sparse=False)")
+        self.cfg = self.pcfg.get(sparse=False)
+        self.mem_log("config.py: after get(sparse=False)")
+
     def _check_circular(self):
         """Check for circular dependence in graph."""
         start_point_string = (
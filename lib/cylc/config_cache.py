@@ -0,0 +1,192 @@
+#!/usr/bin/env python2
+
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2018 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""On-disk cache of processed suite configurations."""
+
+import cPickle as pickle
+import gc
+from hashlib import sha1
+import os
+from tempfile import NamedTemporaryFile
+
+from cylc.version import CYLC_VERSION
+from parsec.validate import get_defaults
+
+
+class SuiteConfigCache(object):
+    """On-disk cache of the result of processing a suite configuration.
+
+    An entry is keyed on a digest of the parsed (sparse) configuration, which
+    already reflects include-files, Jinja2/EmPy processing (including any use
+    of template variables, environment variables and suite lib/python), the
+    defaults of the configuration spec (some of which come from the global
+    configuration), any extra arguments that affect the processing, and the
+    cylc version. The file holds one entry - the most recent.
+
+    Attributes:
+        .fname (str):
+            Path of the cache file, or None to disable caching.
+        .key (str):
+            Digest of the inputs of the cached processing.
+    """
+
+    def __init__(self, fname, sparse, spec, *args):
+        self.fname = fname
+        self.key = None
+        if fname is not None:
+            self.key = sha1(pickle.dumps(
+                (CYLC_VERSION, sparse, get_defaults(spec), args),
+                pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+    def load(self):
+        """Return the cached result, or None if there is no valid entry."""
+        if self.fname is None:
+            return None
+        # (Garbage collection passes over the many new objects created by
+        # pickling or unpickling a large config more than double the time.)
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self.fname, 'rb') as handle:
+                if pickle.load(handle) != self.key:
+                    return None
+                return pickle.load(handle)
+        except Exception:
+            # Missing, unreadable, truncated or incompatible cache file.
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def dump(self, value):
+        """Store value as the result for the current key.
+
+        Write to a temporary file in the same directory and rename it, so
+        concurrent readers never see a partial file. Failure to write the
+        cache is not an error.
+        """
+        if self.fname is None:
+            return
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        handle = None
+        try:
+            handle = NamedTemporaryFile(
+                prefix=os.path.basename(self.fname),
+                dir=os.path.dirname(self.fname), delete=False)
+            pickle.dump(self.key, handle, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(value, handle, pickle.HIGHEST_PROTOCOL)
+            handle.close()
+            os.rename(handle.name, self.fname)
+        except (IOError, OSError, TypeError, pickle.PicklingError):
+            if handle is not None:
+                handle.close()
+                try:
+                    os.unlink(handle.name)
+                except OSError:
+                    pass
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+
+if __name__ == "__main__":
+    from shutil import rmtree
+    from tempfile import mkdtemp
+    import unittest
+
+    from parsec.OrderedDict import OrderedDictWithDefaults
+    from parsec.validate import validator
+
+    SPEC = {'a': {'b': validator(vtype='integer', default=1)}}
+
+    class TestSuiteConfigCache(unittest.TestCase):
+        """Test SuiteConfigCache."""
+
+        def setUp(self):
+            self.dir_ = mkdtemp()
+            self.fname = os.path.join(self.dir_, 'suite.rc.cache')
+
+        def tearDown(self):
+            rmtree(self.dir_)
+
+        @staticmethod
+        def get_sparse(value):
+            """Return a sparse config with a[b] = value."""
+            sparse = OrderedDictWithDefaults()
+            sparse['a'] = OrderedDictWithDefaults()
+            sparse['a']['b'] = value
+            return sparse
+
+        def test_key(self):
+            """Key depends on sparse config, spec defaults and args."""
+            key = SuiteConfigCache(self.fname, self.get_sparse(2), SPEC).key
+            self.assertEqual(key, SuiteConfigCache(
+                self.fname, self.get_sparse(2), SPEC).key)
+            for sparse, spec, args in [
+                    (self.get_sparse(3), SPEC, ()),
+                    (self.get_sparse(2), {
+                        'a': {'b': validator(vtype='integer', default=2)}},
+                     ()),
+                    (self.get_sparse(2), SPEC, ('2000',))]:
+                self.assertNotEqual(key, SuiteConfigCache(
+                    self.fname, sparse, spec, *args).key)
+            self.assertEqual(
+                None, SuiteConfigCache(None, self.get_sparse(2), SPEC).key)
+
+        def test_dump_load(self):
+            """Value is loaded only with the key it was dumped with."""
+            cache = SuiteConfigCache(self.fname, self.get_sparse(2), SPEC)
+            self.assertEqual(None, cache.load())
+            value = self.get_sparse(4)
+            value['a'].defaults_ = OrderedDictWithDefaults([('c', 5)])
+            cache.dump([value, {'x': ['y']}])
+            loaded = cache.load()
+            self.assertEqual([value, {'x': ['y']}], loaded)
+            self.assertTrue(isinstance(loaded[0], OrderedDictWithDefaults))
+            self.assertEqual(5, loaded[0]['a']['c'])
+            self.assertEqual(
+                None,
+                SuiteConfigCache(self.fname, self.get_sparse(3), SPEC).load())
+            self.assertEqual(
+                None,
+                SuiteConfigCache(None, self.get_sparse(2), SPEC).load())
+            self.assertEqual([self.fname], [
+                os.path.join(self.dir_, name)
+                for name in os.listdir(self.dir_)])
+
+        def test_bad_file(self):
+            """Bad cache files are ignored."""
+            cache = SuiteConfigCache(self.fname, self.get_sparse(2), SPEC)
+            with open(self.fname, 'wb') as handle:
+                pickle.dump(cache.key, handle)
+                handle.write('junk')
+            self.assertEqual(None, cache.load())
+            os.unlink(self.fname)
+            os.mkdir(self.fname)
+            cache.dump(1)
+            self.assertEqual(None, cache.load())
+            self.assertEqual([self.fname], [
+                os.path.join(self.dir_, name)
+                for name in os.listdir(self.dir_)])
+            cache = SuiteConfigCache(
+                os.path.join(self.dir_, 'no', 'such', 'dir', 'cache'),
+                self.get_sparse(2), SPEC)
+            cache.dump(1)
+            self.assertEqual(None, cache.load())
+
+    unittest.main()
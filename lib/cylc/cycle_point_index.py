@@ -0,0 +1,139 @@
+#!/usr/bin/env python2
+
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2018 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Sorted index of cycle points, with a count of items at each point."""
+
+from bisect import bisect_left, bisect_right, insort
+
+
+class CyclePointIndex(object):
+    """Sorted cycle points, with a count of items (e.g. tasks) at each point.
+
+    Points are added and removed one item at a time. The earliest and latest
+    points are found in constant time, and a range of points by bisection.
+
+    Attributes:
+        .counts (dict):
+            Number of items at each point.
+        .points (list):
+            Sorted points with one or more items.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.points = []
+
+    def __len__(self):
+        return len(self.points)
+
+    def add(self, point):
+        """Add an item at point."""
+        try:
+            self.counts[point] += 1
+        except KeyError:
+            self.counts[point] = 1
+            insort(self.points, point)
+
+    def remove(self, point):
+        """Remove an item at point.
+
+        Raise KeyError if there is no item at point.
+        """
+        count = self.counts[point] - 1
+        if count:
+            self.counts[point] = count
+        else:
+            del self.counts[point]
+            del self.points[bisect_left(self.points, point)]
+
+    def get_first(self):
+        """Return the earliest point, or None if there is none."""
+        if self.points:
+            return self.points[0]
+
+    def get_last(self):
+        """Return the latest point, or None if there is none."""
+        if self.points:
+            return self.points[-1]
+
+    def get_points_from(self, point, limit=None):
+        """Return a list of up to limit points from point onwards."""
+        index = bisect_left(self.points, point)
+        if limit is None:
+            return self.points[index:]
+        return self.points[index:index + limit]
+
+    def get_points_until(self, point):
+        """Return a list of points up to and including point."""
+        return self.points[:bisect_right(self.points, point)]
+
+
+if __name__ == "__main__":
+    import unittest
+
+    class TestCyclePointIndex(unittest.TestCase):
+        """Test CyclePointIndex."""
+
+        def test_add_remove(self):
+            """Points are kept sorted, and removed with their last item."""
+            index = CyclePointIndex()
+            self.assertEqual(None, index.get_first())
+            self.assertEqual(None, index.get_last())
+            for point in [3, 1, 2, 3, 1]:
+                index.add(point)
+            self.assertEqual([1, 2, 3], index.points)
+            self.assertEqual({1: 2, 2: 1, 3: 2}, index.counts)
+            self.assertEqual(1, index.get_first())
+            self.assertEqual(3, index.get_last())
+            index.remove(1)
+            self.assertEqual([1, 2, 3], index.points)
+            index.remove(1)
+            self.assertEqual([2, 3], index.points)
+            index.remove(2)
+            index.remove(3)
+            index.remove(3)
+            self.assertEqual(0, len(index))
+            self.assertEqual({}, index.counts)
+            self.assertRaises(KeyError, index.remove, 3)
+
+        def test_get_points(self):
+            """Ranges of points are found from or until a point."""
+            index = CyclePointIndex()
+            for point in [10, 20, 30, 40]:
+                index.add(point)
+            self.assertEqual([20, 30, 40], index.get_points_from(20))
+            self.assertEqual([30, 40], index.get_points_from(25))
+            self.assertEqual([10, 20], index.get_points_from(0, 2))
+            self.assertEqual([], index.get_points_from(50))
+            self.assertEqual([10, 20, 30], index.get_points_until(30))
+            self.assertEqual([10, 20], index.get_points_until(25))
+            self.assertEqual([], index.get_points_until(5))
+
+        def test_cycle_points(self):
+            """Equal integer cycle points are the same index entry."""
+            from cylc.cycling.integer import IntegerPoint
+            index = CyclePointIndex()
+            index.add(IntegerPoint('2'))
+            index.add(IntegerPoint('10'))
+            index.add(IntegerPoint('2'))
+            self.assertEqual(
+                [IntegerPoint('2'), IntegerPoint('10')], index.points)
+            index.remove(IntegerPoint('2'))
+            index.remove(IntegerPoint('2'))
+            self.assertEqual([IntegerPoint('10')], index.points)
+
+    unittest.main()
@@ -19,6 +19,7 @@
 """This module provides base classes for cycling data objects."""
 
 from abc import ABCMeta, abstractmethod, abstractproperty
+from bisect import bisect_left, insort
 
 
 def parse_exclusion(expr):
@@ -421,7 +422,9 @@ class ExclusionBase(object):
 
     def __init__(self, start_point, end_point=None):
         """creates an exclusions object that can contain integer points
-        or integer sequences to be used as excluded points."""
+        or integer sequences to be used as excluded points.
+
+        The exclusion points are kept sorted, for lookup by bisection."""
         self.exclusion_sequences = []
         self.exclusion_points = []
         self.exclusion_start_point = start_point
@@ -432,6 +435,17 @@ class ExclusionBase(object):
         """Constructs the set of exclusion sequences or points"""
         pass
 
+    def add_exclusion_point(self, point):
+        """Add point to the sorted exclusion points, if not already there."""
+        if not self._is_exclusion_point(point):
+            insort(self.exclusion_points, point)
+
+    def _is_exclusion_point(self, point):
+        """Return True if point is one of the exclusion points."""
+        index = bisect_left(self.exclusion_points, point)
+        return (index < len(self.exclusion_points) and
+                self.exclusion_points[index] == point)
+
     def __contains__(self, point):
         """Return True if the provided point is in this exclusion.
 
@@ -439,7 +453,7 @@ class ExclusionBase(object):
             point (PointBase): The cycle point to check.
 
         """
-        if point in self.exclusion_points:
+        if self._is_exclusion_point(point):
             return True
         if any(seq.is_valid(point) for seq in self.exclusion_sequences):
             return True
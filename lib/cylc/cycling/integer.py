@@ -253,8 +253,7 @@ class IntegerExclusions(ExclusionBase):
                     point,
                     None,
                     is_required=False).standardise()
-                if integer_point not in self.exclusion_points:
-                    self.exclusion_points.append(integer_point)
+                self.add_exclusion_point(integer_point)
             except PointParsingError:
                 # Try making an integer sequence
                 integer_exclusion_sequence = (IntegerSequence(
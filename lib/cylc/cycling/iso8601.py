@@ -18,10 +18,13 @@
 
 """Date-time cycling by point, interval, and sequence classes."""
 
+from bisect import bisect_left
+from datetime import date
 import re
+from threading import Lock
 import unittest
 
-from isodatetime.data import Calendar, Duration
+from isodatetime.data import CALENDAR, Calendar, Duration, TimePoint
 from isodatetime.dumpers import TimePointDumper
 from isodatetime.timezone import (
     get_local_time_zone, get_local_time_zone_format)
@@ -40,6 +43,18 @@ DATE_TIME_FORMAT = "CCYYMMDDThhmm"
 EXPANDED_DATE_TIME_FORMAT = "+XCCYYMMDDThhmm"
 NEW_DATE_TIME_REC = re.compile("T")
 
+# Date-times in ISO 8601 basic or extended calendar date formats, and time
+# zones, for fast conversion to seconds since the Unix epoch.
+DATE_TIME_RECS = (
+    re.compile(
+        r"\A(\d{4})(\d{2})(\d{2})T(\d{2})(?:(\d{2})(\d{2})?)?"
+        r"(Z|[+-]\d{2}(?:\d{2})?)?\Z"),
+    re.compile(
+        r"\A(\d{4})-(\d{2})-(\d{2})T(\d{2})(?::(\d{2})(?::(\d{2}))?)?"
+        r"(Z|[+-]\d{2}(?::\d{2})?)?\Z"),
+)
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
 WARNING_PARSE_EXPANDED_YEAR_DIGITS = (
     "(incompatible with [cylc]cycle point num expanded year digits = %s ?)")
 
@@ -63,34 +78,67 @@ def memoize(function):
     The inputs and results of the function must be immutable.
     Keyword arguments are not allowed.
 
-    To avoid memory leaks, only the first 10000 separate input
-    permutations are cached for a given function.
+    To avoid memory leaks, only MEMOIZE_LIMIT separate input permutations
+    are cached for a given function. The least recently used one is evicted
+    to make room for a new one.
 
     """
     inputs_results = {}
+    # Circular doubly linked list of cached items, in order of use, with
+    # each link: [previous link, next link, args, results]
+    root = []
+    root[:] = [root, root, None, None]
+    lock = Lock()
 
     def _wrapper(*args):
         """Cache results for function(*args)."""
-        try:
-            return inputs_results[args]
-        except KeyError:
-            results = function(*args)
-            if len(inputs_results) > MEMOIZE_LIMIT:
-                # Full up, no more room.
-                inputs_results.popitem()
-            inputs_results[args] = results
-            return results
+        with lock:
+            try:
+                link = inputs_results[args]
+            except KeyError:
+                pass
+            else:
+                # Move link to the most recently used end.
+                link_prev, link_next = link[0], link[1]
+                link_prev[1] = link_next
+                link_next[0] = link_prev
+                last = root[0]
+                last[1] = root[0] = link
+                link[0] = last
+                link[1] = root
+                return link[3]
+        results = function(*args)
+        with lock:
+            if args in inputs_results:
+                # Added by another thread.
+                return results
+            if len(inputs_results) >= MEMOIZE_LIMIT:
+                # Full up, evict least recently used.
+                oldest = root[1]
+                root[1] = oldest[1]
+                oldest[1][0] = root
+                del inputs_results[oldest[2]]
+            last = root[0]
+            link = [last, root, args, results]
+            last[1] = root[0] = inputs_results[args] = link
+        return results
     return _wrapper
 
 
 class ISO8601Point(PointBase):
 
-    """A single point in an ISO8601 date time sequence."""
+    """A single point in an ISO8601 date time sequence.
+
+    For fast comparison and subtraction, a point is also represented by an
+    integer key, the number of seconds since the Unix epoch in the calendar
+    of the suite, computed on demand. (The key is None for a point with
+    fractional seconds, which falls back to isodatetime.)
+    """
 
     TYPE = CYCLER_TYPE_ISO8601
     TYPE_SORT_KEY = CYCLER_TYPE_SORT_KEY_ISO8601
 
-    __slots__ = ('value')
+    __slots__ = ('_key',)
 
     @classmethod
     def from_nonstandard_string(cls, point_string):
@@ -109,7 +157,19 @@ class ISO8601Point(PointBase):
             return cmp(self.TYPE_SORT_KEY, other.TYPE_SORT_KEY)
         if self.value == other.value:
             return 0
-        return self._iso_point_cmp(self.value, other.value)
+        key = self.get_key()
+        other_key = other.get_key()
+        if key is None or other_key is None:
+            return self._iso_point_cmp(self.value, other.value)
+        return cmp(key, other_key)
+
+    def get_key(self):
+        """Return the point as seconds since the Unix epoch, or None."""
+        try:
+            return self._key
+        except AttributeError:
+            self._key = self._iso_point_key(self.value)
+            return self._key
 
     def standardise(self):
         """Reformat self.value into a standard representation."""
@@ -122,13 +182,21 @@ class ISO8601Point(PointBase):
             else:
                 message = str(exc)
             raise PointParsingError(type(self), self.value, message)
+        try:
+            del self._key
+        except AttributeError:
+            pass
         return self
 
     def sub(self, other):
         """Subtract a Point or Interval from self."""
         if isinstance(other, ISO8601Point):
-            return ISO8601Interval(
-                self._iso_point_sub_point(self.value, other.value))
+            key = self.get_key()
+            other_key = other.get_key()
+            if key is None or other_key is None:
+                return ISO8601Interval(
+                    self._iso_point_sub_point(self.value, other.value))
+            return ISO8601Interval(self._iso_seconds_interval(key - other_key))
         return ISO8601Point(
             self._iso_point_sub_interval(self.value, other.value))
 
@@ -151,6 +219,84 @@ class ISO8601Point(PointBase):
         other_point = point_parse(other_point_string)
         return cmp(point, other_point)
 
+    @staticmethod
+    @memoize
+    def _iso_point_key(point_string):
+        """Return the point_string as seconds since the Unix epoch.
+
+        Return None if it is not a whole number of seconds.
+        """
+        key = ISO8601Point._get_gregorian_key(point_string)
+        if key is None:
+            key = ISO8601Point._get_parsed_key(point_string)
+        return key
+
+    @staticmethod
+    def _get_gregorian_key(point_string):
+        """Return point_string as seconds since the Unix epoch, without
+        parsing it into a TimePoint.
+
+        Only for points in the Gregorian calendar, in the ISO 8601 basic or
+        extended calendar date-time formats with whole seconds. Return None
+        otherwise.
+        """
+        if (CALENDAR.mode.lower() != Calendar.MODE_GREGORIAN or
+                "%" in SuiteSpecifics.DUMP_FORMAT or
+                SuiteSpecifics.NUM_EXPANDED_YEAR_DIGITS):
+            return None
+        for rec in DATE_TIME_RECS:
+            match = rec.match(point_string)
+            if match:
+                break
+        else:
+            return None
+        year, month, day, hour, minute, second, time_zone = match.groups()
+        hour = int(hour)
+        minute = int(minute or 0)
+        second = int(second or 0)
+        if hour > 23 or minute > 59 or second > 59:
+            return None
+        if time_zone is None:
+            try:
+                tz_hours, tz_minutes = SuiteSpecifics.ASSUMED_TIME_ZONE
+            except TypeError:
+                return None
+            if not isinstance(tz_hours, int) or not isinstance(
+                    tz_minutes, int):
+                # E.g. ("05", "30"), leave it to isodatetime
+                return None
+        elif time_zone == "Z":
+            tz_hours, tz_minutes = (0, 0)
+        else:
+            tz_hours = int(time_zone[1:3])
+            tz_minutes = int(time_zone[-2:] if len(time_zone) > 3 else 0)
+            if time_zone[0] == "-":
+                tz_hours, tz_minutes = (-tz_hours, -tz_minutes)
+        try:
+            days = date(int(year), int(month), int(day)).toordinal()
+        except ValueError:
+            return None
+        return (
+            (days - UNIX_EPOCH_ORDINAL) * 86400 + hour * 3600 + minute * 60 +
+            second - tz_hours * 3600 - tz_minutes * 60)
+
+    @staticmethod
+    def _get_parsed_key(point_string):
+        """Return the parsed point_string as seconds since the Unix epoch.
+
+        Return None if it is not a whole number of seconds.
+        """
+        point = point_parse(point_string)
+        if point.truncated:
+            return None
+        days, seconds = (point - TimePoint(
+            **CALENDAR.UNIX_EPOCH_DATE_TIME_REFERENCE_PROPERTIES)
+        ).get_days_and_seconds()
+        key = days * CALENDAR.SECONDS_IN_DAY + seconds
+        if not isinstance(key, (int, long)):
+            return None
+        return key
+
     @staticmethod
     @memoize
     def _iso_point_sub_interval(point_string, interval_string):
@@ -167,6 +313,27 @@ class ISO8601Point(PointBase):
         other_point = point_parse(other_point_string)
         return str(point - other_point)
 
+    @staticmethod
+    @memoize
+    def _iso_seconds_interval(seconds):
+        """Return the difference between two points, given in seconds.
+
+        The result is the same as subtracting one parsed point from the
+        other, in days, hours, minutes and seconds.
+        """
+        if seconds < 0:
+            return str(-1 * ISO8601Point._iso_seconds_duration(-seconds))
+        return str(ISO8601Point._iso_seconds_duration(seconds))
+
+    @staticmethod
+    def _iso_seconds_duration(seconds):
+        """Return seconds as Duration in days, hours, minutes and seconds."""
+        days, seconds = divmod(seconds, CALENDAR.SECONDS_IN_DAY)
+        hours, seconds = divmod(seconds, CALENDAR.SECONDS_IN_HOUR)
+        minutes, seconds = divmod(seconds, CALENDAR.SECONDS_IN_MINUTE)
+        return Duration(
+            days=days, hours=hours, minutes=minutes, seconds=seconds)
+
 
 class ISO8601Interval(IntervalBase):
 
@@ -304,8 +471,8 @@ class ISO8601Exclusions(ExclusionBase):
                 # Try making an ISO8601Point
                 exclusion_point = ISO8601Point.from_nonstandard_string(
                     str(point)) if point else None
-                if exclusion_point not in self.exclusion_points:
-                    self.exclusion_points.append(exclusion_point)
+                if exclusion_point is not None:
+                    self.add_exclusion_point(exclusion_point)
             except (AttributeError, TypeError, ValueError):
                 # Try making an ISO8601Sequence
                 exclusion = ISO8601Sequence(point, self.exclusion_start_point,
@@ -317,16 +484,26 @@ class ISO8601Sequence(SequenceBase):
 
     """A sequence of ISO8601 date time points separated by an interval.
     Note that an ISO8601Sequence object (may) contain
-    ISO8601ExclusionSequences"""
+    ISO8601ExclusionSequences
+
+    Points of the recurrence are generated on demand, and cached in ascending
+    order in a window that is extended forward as later points are needed.
+    Lookups are bisections of the window. When the window grows beyond
+    _MAX_CACHED_POINTS, its older half is dropped. A lookup before the start
+    of the window, or far beyond its end, restarts the window just before the
+    point looked up, if the recurrence has an exact interval, or else at the
+    start of the recurrence.
+    """
 
     TYPE = CYCLER_TYPE_ISO8601
     TYPE_SORT_KEY = CYCLER_TYPE_SORT_KEY_ISO8601
-    _MAX_CACHED_POINTS = 100
+    _MAX_CACHED_POINTS = 1000
+    # Restart caching at a later point, rather than generate more points
+    _MAX_STEPS_EXTEND = 10
 
     __slots__ = ('dep_section', 'context_start_point', 'context_end_point',
-                 'offset', '_cached_first_point_values',
-                 '_cached_next_point_values', '_cached_valid_point_booleans',
-                 '_cached_recent_valid_points', 'spec', 'abbrev_util',
+                 'offset', '_points', '_points_iter', '_points_from_start',
+                 '_points_start_key', '_points_step', 'spec', 'abbrev_util',
                  'recurrence', 'exclusions', 'step', 'value')
 
     @classmethod
@@ -360,11 +537,6 @@ class ISO8601Sequence(SequenceBase):
 
         self.offset = ISO8601Interval.get_null()
 
-        self._cached_first_point_values = {}
-        self._cached_next_point_values = {}
-        self._cached_valid_point_booleans = {}
-        self._cached_recent_valid_points = []
-
         self.spec = dep_section
         self.abbrev_util = CylcTimeParser(self.context_start_point,
                                           self.context_end_point,
@@ -400,6 +572,7 @@ class ISO8601Sequence(SequenceBase):
                 pass
 
         self.step = ISO8601Interval(str(self.recurrence.duration))
+        self._init_points()
         self.value = str(self.recurrence)
         # Concatenate the strings in exclusion list
         if self.exclusions:
@@ -419,45 +592,43 @@ class ISO8601Sequence(SequenceBase):
             self.recurrence.start_point += interval_parse(str(i_offset))
         if self.recurrence.end_point is not None:
             self.recurrence.end_point += interval_parse(str(i_offset))
-        self._cached_first_point_values = {}
-        self._cached_next_point_values = {}
-        self._cached_valid_point_booleans = {}
-        self._cached_recent_valid_points = []
+        self._init_points()
         self.value = str(self.recurrence) + '!' + str(self.exclusions)
         if self.exclusions:
             self.value += '!' + str(self.exclusions)
 
+    def _init_points(self):
+        """Clear cached points, and note the start and exact interval of the
+        recurrence in seconds, if they exist."""
+        self._points = []
+        self._points_iter = None
+        self._points_from_start = False
+        self._points_start_key = None
+        self._points_step = None
+        recurrence = self.recurrence
+        duration = recurrence.duration
+        if (recurrence.format_number != 3 or recurrence.repetitions == 1 or
+                duration.years or duration.months):
+            return
+        days, seconds = duration.get_days_and_seconds()
+        step = days * CALENDAR.SECONDS_IN_DAY + seconds
+        if step > 0 and step == int(step):
+            self._points_start_key = ISO8601Point(
+                str(recurrence.start_point)).get_key()
+            self._points_step = int(step)
+
     def is_on_sequence(self, point):
         """Return True if point is on-sequence."""
-        # Iterate starting at recent valid points, for speed.
         if self.exclusions and point in self.exclusions:
             return False
-
-        for valid_point in reversed(self._cached_recent_valid_points):
-            if valid_point == point:
-                return True
-            if valid_point > point:
-                continue
-            next_point = valid_point
-            while next_point is not None and next_point < point:
-                next_point = self.get_next_point_on_sequence(next_point)
-            if next_point is None:
-                continue
-            if next_point == point:
-                return True
-        return self.recurrence.get_is_valid(point_parse(point.value))
+        index = self._get_index(point)
+        if index is None:
+            return self.recurrence.get_is_valid(point_parse(point.value))
+        return index < len(self._points) and self._points[index] == point
 
     def is_valid(self, point):
         """Return True if point is on-sequence and in-bounds."""
-        try:
-            return self._cached_valid_point_booleans[point.value]
-        except KeyError:
-            is_valid = self.is_on_sequence(point)
-            if (len(self._cached_valid_point_booleans) >
-                    self._MAX_CACHED_POINTS):
-                self._cached_valid_point_booleans.popitem()
-            self._cached_valid_point_booleans[point.value] = is_valid
-            return is_valid
+        return self.is_on_sequence(point)
 
     def get_prev_point(self, point):
         """Return the previous point < point, or None if out of bounds."""
@@ -482,6 +653,18 @@ class ISO8601Sequence(SequenceBase):
         """Return the largest point < some arbitrary point."""
         if self.is_on_sequence(point):
             return self.get_prev_point(point)
+        index = self._get_index(point)
+        if index is None:
+            return self._get_nearest_prev_point_by_iter(point)
+        while index > 0:
+            index -= 1
+            prev_cycle_point = self._points[index]
+            if not self.exclusions or prev_cycle_point not in self.exclusions:
+                return prev_cycle_point
+        return None
+
+    def _get_nearest_prev_point_by_iter(self, point):
+        """Return the largest point < point, iterating the recurrence."""
         p_iso_point = point_parse(point.value)
         prev_cycle_point = None
 
@@ -509,55 +692,12 @@ class ISO8601Sequence(SequenceBase):
 
     def get_next_point(self, point):
         """Return the next point > p, or None if out of bounds."""
-        try:
-            return ISO8601Point(self._cached_next_point_values[point.value])
-        except KeyError:
-            pass
-        # Iterate starting at recent valid points, for speed.
-        for valid_point in reversed(self._cached_recent_valid_points):
-            if valid_point >= point:
-                continue
-            next_point = valid_point
-            excluded = False
-            while next_point is not None and (next_point <= point or excluded):
-                excluded = False
-                next_point = self.get_next_point_on_sequence(next_point)
-                if next_point and next_point in self.exclusions:
-                    excluded = True
-            if next_point is not None:
-                self._check_and_cache_next_point(point, next_point)
-                return next_point
-        # Iterate starting at the beginning.
-        p_iso_point = point_parse(point.value)
-        for recurrence_iso_point in self.recurrence:
-            if recurrence_iso_point > p_iso_point:
-                next_point = ISO8601Point(str(recurrence_iso_point))
-                if next_point and next_point in self.exclusions:
-                    continue
-                self._check_and_cache_next_point(point, next_point)
-                return next_point
-        return None
-
-    def _check_and_cache_next_point(self, point, next_point):
-        """Verify and cache the get_next_point return info."""
-        # Verify next_point != point.
-        if next_point == point:
-            raise SequenceDegenerateError(
-                self.recurrence, SuiteSpecifics.DUMP_FORMAT,
-                next_point, point
-            )
-
-        # Cache the answer for point -> next_point.
-        if (len(self._cached_next_point_values) >
-                self._MAX_CACHED_POINTS):
-            self._cached_next_point_values.popitem()
-        self._cached_next_point_values[point.value] = next_point.value
-
-        # Cache next_point as a valid starting point for this recurrence.
-        if (len(self._cached_next_point_values) >
-                self._MAX_CACHED_POINTS):
-            self._cached_recent_valid_points.pop(0)
-        self._cached_recent_valid_points.append(next_point)
+        index = self._get_index(point)
+        if index is None:
+            return self._get_first_point_by_iter(point, True)
+        if index < len(self._points) and self._points[index] == point:
+            index += 1
+        return self._get_point_not_excluded(index)
 
     def get_next_point_on_sequence(self, point):
         """Return the on-sequence point > point assuming that point is
@@ -578,26 +718,133 @@ class ISO8601Sequence(SequenceBase):
 
     def get_first_point(self, point):
         """Return the first point >= to point, or None if out of bounds."""
-        try:
-            return ISO8601Point(self._cached_first_point_values[point.value])
-        except KeyError:
-            pass
+        index = self._get_index(point)
+        if index is None:
+            return self._get_first_point_by_iter(point, False)
+        return self._get_point_not_excluded(index)
+
+    def _get_first_point_by_iter(self, point, is_after):
+        """Return the first point >= point (> point if is_after), iterating
+        the recurrence."""
         p_iso_point = point_parse(point.value)
         for recurrence_iso_point in self.recurrence:
-            if recurrence_iso_point >= p_iso_point:
-                first_point_value = str(recurrence_iso_point)
-                ret = ISO8601Point(first_point_value)
-                # Check multiple exclusions
-                if ret and ret in self.exclusions:
-                    return self.get_next_point_on_sequence(ret)
-                if (len(self._cached_first_point_values) >
-                        self._MAX_CACHED_POINTS):
-                    self._cached_first_point_values.popitem()
-                self._cached_first_point_values[point.value] = (
-                    first_point_value)
+            if (recurrence_iso_point > p_iso_point or
+                    not is_after and recurrence_iso_point == p_iso_point):
+                ret = ISO8601Point(str(recurrence_iso_point))
+                if ret == point and is_after:
+                    raise SequenceDegenerateError(
+                        self.recurrence, SuiteSpecifics.DUMP_FORMAT,
+                        ret, point
+                    )
+                if self.exclusions and ret in self.exclusions:
+                    continue
                 return ret
         return None
 
+    def _get_index(self, point):
+        """Return index of the first cached point >= point.
+
+        Extend the cached points of the recurrence to cover point, or to the
+        end of the recurrence. Return None if the recurrence is iterated in
+        reverse, i.e. it has no start point, so cannot be cached in order.
+        """
+        if self.recurrence.start_point is None:
+            return None
+        points = self._points
+        if (not self._points_from_start and (
+                not points or point <= points[0]) or
+                points and self._points_iter is not None and
+                self._get_n_steps(point) - self._get_n_steps(points[-1]) >
+                self._MAX_STEPS_EXTEND):
+            self._reset_points(point)
+            points = self._points
+        while points and points[-1] < point:
+            if len(points) >= self._MAX_CACHED_POINTS:
+                # Forget the older half of the window
+                del points[:len(points) // 2]
+                self._points_from_start = False
+            if not self._cache_next_point():
+                break
+        return bisect_left(points, point)
+
+    def _get_n_steps(self, point):
+        """Return number of whole intervals from start of recurrence to point.
+
+        Return 0 if the recurrence does not have an exact interval, i.e. it is
+        in months or years, so its points must be iterated from its start.
+        """
+        if self._points_start_key is None:
+            return 0
+        key = point.get_key()
+        if key is None or key < self._points_start_key:
+            return 0
+        n_steps = (key - self._points_start_key) // self._points_step
+        if self.recurrence.repetitions is not None:
+            n_steps = min(n_steps, self.recurrence.repetitions - 1)
+        return n_steps
+
+    def _reset_points(self, point):
+        """(Re)start caching points of the recurrence, before point.
+
+        If the recurrence has an exact interval, start at its point before the
+        last point <= point. Otherwise, start at the start of the recurrence.
+        """
+        recurrence = self.recurrence
+        self._points = []
+        self._points_iter = None
+        self._points_from_start = True
+        n_steps = self._get_n_steps(point) - 1
+        if n_steps > 0:
+            iso_point = recurrence.get_next(
+                recurrence.start_point + recurrence.duration * (n_steps - 1))
+            if iso_point is not None:
+                self._points_iter = self._iter_recurrence(iso_point)
+                self._points_from_start = False
+        if self._points_iter is None:
+            self._points_iter = iter(recurrence)
+        self._cache_next_point()
+
+    def _iter_recurrence(self, iso_point):
+        """Iterate the recurrence from iso_point, a point on it."""
+        while iso_point is not None:
+            yield iso_point
+            iso_point = self.recurrence.get_next(iso_point)
+
+    def _get_point_not_excluded(self, index):
+        """Return the first cached point not excluded, from index.
+
+        Extend the cached points as necessary. Return None if there are no
+        more points in the recurrence.
+        """
+        while True:
+            while index >= len(self._points):
+                if not self._cache_next_point():
+                    return None
+            point = self._points[index]
+            if not self.exclusions or point not in self.exclusions:
+                return point
+            index += 1
+
+    def _cache_next_point(self):
+        """Append the next point of the recurrence to the cached points.
+
+        Return False if there are no more points in the recurrence.
+        """
+        if self._points_iter is None:
+            return False
+        try:
+            iso_point = next(self._points_iter)
+        except StopIteration:
+            self._points_iter = None
+            return False
+        point = ISO8601Point(str(iso_point))
+        if self._points and self._points[-1] >= point:
+            raise SequenceDegenerateError(
+                self.recurrence, SuiteSpecifics.DUMP_FORMAT,
+                self._points[-1], point)
+        self._points.append(point)
+        return True
+
     def get_start_point(self):
         """Return the first point in this sequence, or None."""
         for recurrence_iso_point in self.recurrence:
@@ -713,15 +960,25 @@ def init(num_expanded_year_digits=0, custom_dump_format=None, time_zone=None,
 
 def get_point_relative(offset_string, base_point):
     """Create a point from offset_string applied to base_point."""
-    try:
-        interval = ISO8601Interval(str(interval_parse(offset_string)))
-    except ValueError:
+    interval_string = _get_offset_interval_string(offset_string)
+    if interval_string is None:
         return ISO8601Point(str(
             SuiteSpecifics.abbrev_util.parse_timepoint(
                 offset_string, context_point=_point_parse(base_point.value))
         ))
-    else:
-        return base_point + interval
+    return base_point + ISO8601Interval(interval_string)
+
+
+@memoize
+def _get_offset_interval_string(offset_string):
+    """Return offset_string as a standard interval string.
+
+    Return None if offset_string is not an interval, e.g. a truncated point.
+    """
+    try:
+        return str(interval_parse(offset_string))
+    except ValueError:
+        return None
 
 
 def interval_parse(interval_string):
@@ -772,6 +1029,92 @@ def _point_parse(point_string):
     return SuiteSpecifics.point_parser.parse(point_string)
 
 
+class TestISO8601Point(unittest.TestCase):
+    """Test ISO8601Point comparison and subtraction."""
+
+    def test_cmp_sub(self):
+        """Integer keys agree with isodatetime."""
+        init(time_zone='Z')
+        point_strings = [
+            '19691231T2359Z', '19700101T0000Z', '20000229T1230Z',
+            '20000229T1330+01', '20000301T0000-0530', '20130101T0000Z',
+            '17000101T0000Z', '20991231T2345Z', '20000229T123001Z',
+            '20000229T123001.5Z']
+        for point_string in point_strings:
+            for other_string in point_strings:
+                point = ISO8601Point(point_string)
+                other = ISO8601Point(other_string)
+                self.assertEqual(
+                    cmp(point_parse(point_string),
+                        point_parse(other_string)),
+                    cmp(point, other))
+                self.assertEqual(
+                    str(point_parse(point_string) -
+                        point_parse(other_string)),
+                    str(point - other))
+        self.assertEqual(
+            ISO8601Point('20000229T1230Z'), ISO8601Point('20000229T1330+01'))
+        self.assertEqual(0, ISO8601Point('19700101T0000Z').get_key())
+        self.assertEqual(-60, ISO8601Point('19691231T2359Z').get_key())
+        self.assertIsNone(ISO8601Point('20000229T123001.5Z').get_key())
+
+    def test_gregorian_key(self):
+        """Keys of basic and extended formats agree with isodatetime."""
+        # (Parsed points are cached, so use different points without time
+        # zone for each assumed time zone.)
+        for i, time_zone in enumerate(['Z', '-03']):
+            init(time_zone=time_zone)
+            for point_string in [
+                    '20000229T1230Z', '20000229T123045+01', '19000301T00-0230',
+                    '1500022%dT0000' % (i + 7), '1500030%dT0000' % (i + 1),
+                    '00010101T0000Z',
+                    '2000-02-29T12:30Z',
+                    '2000-02-29T12-01:30', '2000-02-29T12:30:45+01:00',
+                    '20000229T1230Z'.replace('T', 'T00')]:
+                try:
+                    key = ISO8601Point._get_parsed_key(point_string)
+                except ValueError:
+                    key = None
+                self.assertEqual(
+                    key, ISO8601Point._get_gregorian_key(point_string),
+                    point_string)
+        # Assumed time zone not in integers, leave it to isodatetime
+        init(time_zone='+0530')
+        self.assertIsNone(ISO8601Point._get_gregorian_key('15000301T0000'))
+        self.assertIsNotNone(
+            ISO8601Point._get_gregorian_key('15000301T0000Z'))
+        init(time_zone='Z')
+
+    def test_standardise(self):
+        """The key is reset on standardise."""
+        init(time_zone='Z')
+        point = ISO8601Point('20000101T00Z')
+        self.assertEqual(946684800, point.get_key())
+        point.value = '20000101T01Z'
+        point.standardise()
+        self.assertEqual(946688400, point.get_key())
+
+    def test_memoize(self):
+        """The least recently used item is evicted."""
+        global MEMOIZE_LIMIT
+        calls = []
+
+        @memoize
+        def _square(num):
+            calls.append(num)
+            return num * num
+
+        limit = MEMOIZE_LIMIT
+        MEMOIZE_LIMIT = 3
+        try:
+            for num in [1, 2, 3, 1, 4, 1, 3, 2]:
+                self.assertEqual(num * num, _square(num))
+        finally:
+            MEMOIZE_LIMIT = limit
+        # 2 evicted by 4, 4 evicted by 2
+        self.assertEqual([1, 2, 3, 4, 2], calls)
+
+
 class TestISO8601Sequence(unittest.TestCase):
     """Contains unit tests for the ISO8601Sequence class."""
 
@@ -1275,6 +1618,56 @@ class TestISO8601Sequence(unittest.TestCase):
         self.assertFalse(
             sequence.is_on_sequence(ISO8601Point('20100809T0005')))
 
+    def test_cached_points(self):
+        """Test lookups in cached points against iteration of recurrence."""
+        init(time_zone='Z')
+        points = []
+        point = ISO8601Point('19991231T0000Z')
+        for _ in range(24 * 20):
+            points.append(point)
+            point += ISO8601Interval('PT1H')
+        # Queries forward, backward, and jumping to and fro
+        queries = points[::7] + points[::-11] + points[50:55] + points[-20:]
+        max_cached_points = ISO8601Sequence._MAX_CACHED_POINTS
+        ISO8601Sequence._MAX_CACHED_POINTS = 10
+        try:
+            for spec in [
+                    'PT1H', 'PT7H', 'R/19991130T05Z/P1M', 'PT1H!PT6H',
+                    'PT3H!(20000105T03Z, T12)', 'R5/T06', 'R1/20000110T00Z',
+                    'R10/P1D/20000115T00Z']:
+                self._test_cached_points(spec, queries)
+        finally:
+            ISO8601Sequence._MAX_CACHED_POINTS = max_cached_points
+
+    def _test_cached_points(self, spec, queries):
+        """Helper for test_cached_points."""
+        sequence = ISO8601Sequence(spec, '20000101T00Z', '20000201T00Z')
+        expected = []
+        is_complete = True
+        for iso_point in sequence.recurrence:
+            point = ISO8601Point(str(iso_point))
+            if point > queries[-1]:
+                is_complete = False
+                break
+            if point not in sequence.exclusions:
+                expected.append(point)
+        expected.append(None)  # compares greater than any point
+        for point in queries:
+            index = bisect_left(expected, point)
+            is_on_sequence = expected[index] == point
+            self.assertEqual(is_on_sequence, sequence.is_on_sequence(point))
+            if is_complete or expected[index] is not None:
+                self.assertEqual(
+                    expected[index], sequence.get_first_point(point))
+            if is_on_sequence:
+                index += 1
+            if is_complete or expected[index] is not None:
+                self.assertEqual(
+                    expected[index], sequence.get_next_point(point))
+            if not is_on_sequence:
+                self.assertEqual(
+                    expected[index - 1] if index else None,
+                    sequence.get_nearest_prev_point(point))
 
 if __name__ == '__main__':
     unittest.main()
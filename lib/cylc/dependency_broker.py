@@ -0,0 +1,136 @@
+#!/usr/bin/env python2
+
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2018 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Incremental brokering of task outputs to task prerequisites.
+
+Each task proxy in the (main) task pool is both a publisher of outputs and a
+subscriber to the outputs of other tasks, via its prerequisites. The broker
+keeps a reverse index from each output key (name, point string, message) to
+the task proxies with prerequisites on it, so that newly completed outputs can
+be delivered to their subscribers only, rather than negotiating across the
+whole pool.
+
+Output delivery is deferred: outputs are "put" as they are completed (e.g. by
+TaskEventsManager.process_message), then delivered on the next call to
+"process", in the dependency negotiation phase of the main loop.
+"""
+
+
+class DependencyBroker(object):
+    """Deliver task outputs to the prerequisites that depend on them.
+
+    Attributes:
+        .publishers (dict):
+            Task proxies in the pool by (name, point string).
+        .subscribers (dict):
+            Sets of task proxies by prerequisite output key,
+            (name, point string, message).
+    """
+
+    def __init__(self):
+        self.publishers = {}
+        self.subscribers = {}
+        # Task proxies with newly completed outputs, by (name, point string)
+        self._put_outputs = {}
+        # Task proxies with newly added or reset prerequisites
+        self._put_prereqs = set()
+
+    def add_task(self, itask):
+        """Add a task proxy as a publisher and a subscriber.
+
+        Its completed outputs are delivered to existing subscribers, and its
+        prerequisites are matched against existing publishers, on the next
+        call to "process".
+        """
+        key = (itask.tdef.name, str(itask.point))
+        self.publishers[key] = itask
+        for out_key in self._get_prereq_keys(itask):
+            self.subscribers.setdefault(out_key, set()).add(itask)
+        self._put_outputs[key] = itask
+        self._put_prereqs.add(itask)
+
+    def remove_task(self, itask):
+        """Remove a task proxy, e.g. on removal from the pool."""
+        key = (itask.tdef.name, str(itask.point))
+        if self.publishers.get(key) is itask:
+            del self.publishers[key]
+        if self._put_outputs.get(key) is itask:
+            del self._put_outputs[key]
+        self._put_prereqs.discard(itask)
+        for out_key in self._get_prereq_keys(itask):
+            try:
+                itasks = self.subscribers[out_key]
+                itasks.discard(itask)
+            except KeyError:
+                continue
+            if not itasks:
+                del self.subscribers[out_key]
+
+    def put_outputs(self, itask):
+        """Notify completion of outputs of a task proxy.
+
+        The outputs are delivered to subscribers on the next "process".
+        """
+        key = (itask.tdef.name, str(itask.point))
+        if self.publishers.get(key) is itask:
+            self._put_outputs[key] = itask
+
+    def put_prerequisites(self, itask):
+        """Notify reset of prerequisites of a task proxy.
+
+        E.g. on reset to waiting, which unsets prerequisites. They are matched
+        against existing publishers on the next "process".
+        """
+        if self.publishers.get((itask.tdef.name, str(itask.point))) is itask:
+            self._put_prereqs.add(itask)
+
+    def process(self):
+        """Deliver outputs put since the last call to their subscribers.
+
+        Return the number of task proxies with any newly satisfied
+        prerequisite.
+        """
+        deliveries = {}
+        for (name, point_str), itask in self._put_outputs.items():
+            for message in itask.state.outputs.get_completed():
+                out_key = (name, point_str, message)
+                for sub_itask in self.subscribers.get(out_key, ()):
+                    deliveries.setdefault(sub_itask, set()).add(out_key)
+        self._put_outputs.clear()
+        for itask in self._put_prereqs:
+            for out_key in self._get_prereq_keys(itask):
+                pub_itask = self.publishers.get(out_key[0:2])
+                if (pub_itask is not None and
+                        pub_itask.state.outputs.is_completed(out_key[2])):
+                    deliveries.setdefault(itask, set()).add(out_key)
+        self._put_prereqs.clear()
+        for itask, out_keys in deliveries.items():
+            # Try to satisfy itask if not already satisfied.
+            if itask.state.prerequisites_are_not_all_satisfied():
+                itask.state.satisfy_me(out_keys)
+        return len(deliveries)
+
+    @staticmethod
+    def _get_prereq_keys(itask):
+        """Return the output keys of the (suicide) prerequisites of itask."""
+        keys = set()
+        for prereqs in [
+                itask.state.prerequisites,
+                itask.state.suicide_prerequisites]:
+            for prereq in prereqs:
+                keys.update(prereq.messages)
+        return keys
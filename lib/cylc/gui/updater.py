@@ -58,6 +58,8 @@ class Updater(threading.Thread):
         self.cfg = app.cfg
         self.info_bar = app.info_bar
         self.full_mode = True
+        # Summary revision, for requesting changes since the last update.
+        self.revision = 0
 
         self.err_log_lines = []
         self.task_list = []
@@ -68,6 +70,9 @@ class Updater(threading.Thread):
         self.full_fam_state_summary = {}
         self.all_families = {}
         self.global_summary = {}
+        # Unfiltered task and family summaries, for applying changes.
+        self.suite_task_summary = {}
+        self.suite_fam_summary = {}
         self.ancestors = {}
         self.ancestors_pruned = {}
         self.descendants = {}
@@ -109,6 +114,7 @@ class Updater(threading.Thread):
         if cylc.flags.debug:
             sys.stderr.write("%s NOT CONNECTED\n" % get_current_time_string())
         self.full_mode = True
+        self.revision = 0
         self.connected = False
         self.set_status(SUITE_STATUS_STOPPED)
         self.update_interval += 1.0
@@ -120,6 +126,8 @@ class Updater(threading.Thread):
         self.full_fam_state_summary = {}
         self.all_families = {}
         self.global_summary = {}
+        self.suite_task_summary = {}
+        self.suite_fam_summary = {}
         self.cfg.port = None
         self.client = None
 
@@ -239,7 +247,8 @@ class Updater(threading.Thread):
                 self.cfg.suite, self.cfg.owner, self.cfg.host, self.cfg.port,
                 self.cfg.comms_timeout, self.cfg.my_uuid)
         try:
-            my_state = self.client.get_latest_state(full_mode=self.full_mode)
+            my_state = self.client.get_latest_state(
+                full_mode=self.full_mode, revision=self.revision)
         except ClientError:
             # Bad credential, suite not running, starting up or just stopped?
             if cylc.flags.debug:
@@ -287,8 +296,13 @@ class Updater(threading.Thread):
             self.all_families = list(self.descendants)
             is_updated = True
         if 'summary' in my_state and my_state['summary'][0]:
-            self._update_state_summary(my_state)
+            self._update_state_summary(my_state['summary'])
             is_updated = True
+        elif 'summary_delta' in my_state:
+            self._update_state_summary(
+                self._apply_state_summary_delta(my_state['summary_delta']))
+            is_updated = True
+        self.revision = my_state.get('revision', 0)
         if self.status in [SUITE_STATUS_INITIALISING, SUITE_STATUS_STOPPING]:
             gobject.idle_add(self.info_bar.prog_bar_start, self.status)
         elif self.is_reloading:
@@ -321,9 +335,26 @@ class Updater(threading.Thread):
             self.info_bar.set_log, "\n".join(self.err_log_lines),
             my_state['err_size'])
 
-    def _update_state_summary(self, my_state):
+    def _apply_state_summary_delta(self, delta):
+        """Apply changes since the last update to the suite summary.
+
+        Return the new (global, task, family) summary.
+        """
+        states = dict(self.suite_task_summary)
+        states.update(delta['tasks'])
+        for task_id in delta['removed_tasks']:
+            states.pop(task_id, None)
+        fam_states = dict(self.suite_fam_summary)
+        fam_states.update(delta['families'])
+        for fam_id in delta['removed_families']:
+            fam_states.pop(fam_id, None)
+        return delta['global'], states, fam_states
+
+    def _update_state_summary(self, summary):
         """Display suite summary."""
-        glbl, states, fam_states = my_state['summary']
+        glbl, states, fam_states = summary
+        self.suite_task_summary = states
+        self.suite_fam_summary = fam_states
         self.mode = glbl['run_mode']
 
         if self.cfg.use_defn_order:
@@ -0,0 +1,161 @@
+#!/usr/bin/env python2
+
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2018 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Plan batches of task job submission by (host, owner).
+
+Task jobs for a (host, owner) are submitted in batches, each batch by a
+"cylc jobs-submit" command in the process pool. The batch size, and the
+number of commands for the (host, owner) allowed to run at the same time,
+adapt to the time taken by previous commands, so that a slow or unresponsive
+host cannot take over the process pool while jobs for other hosts wait.
+"""
+
+
+class JobSubmitPlanner(object):
+    """Adaptive batch sizes and limits of job submission by (host, owner).
+
+    A command is expected to complete within a fraction (TARGET_FRACTION) of
+    the process pool timeout. After each command:
+    * If it has timed out, the batch size of its (host, owner) is halved, and
+      only 1 command at a time is allowed.
+    * Otherwise, the batch size is set to the number of jobs expected to be
+      submitted in the target time, based on the mean time per job of recent
+      commands. One more command at a time is allowed if the command was
+      quicker than the target time, one fewer if it was slower.
+
+    Attributes:
+        .auths (dict):
+            {(host, owner): [batch size, limit, mean time per job], ...}
+        .pool_size (int):
+            Size of the process pool, the maximum limit.
+        .timeout (float):
+            Process pool timeout in seconds.
+    """
+
+    BATCH_SIZE_INIT = 100
+    BATCH_SIZE_MAX = 500
+    TARGET_FRACTION = 0.25
+    # Weight of the latest command in the mean time per job
+    WEIGHT = 0.5
+
+    def __init__(self, pool_size, timeout):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.auths = {}
+
+    def get_batches(self, host, owner, itasks):
+        """Split itasks for (host, owner) into batches.
+
+        Return a list of (list of task proxies) sorted by task ID.
+        """
+        batch_size = self._get_auth(host, owner)[0]
+        itasks = sorted(itasks, key=lambda itask: itask.identity)
+        return [
+            itasks[i:i + batch_size]
+            for i in range(0, len(itasks), batch_size)]
+
+    def get_limit(self, host, owner):
+        """Return the number of commands allowed to run for (host, owner)."""
+        return self._get_auth(host, owner)[1]
+
+    def put_result(self, host, owner, n_jobs, elapsed):
+        """Adjust batch size and limit after a command for (host, owner).
+
+        n_jobs is the number of jobs in the command, and elapsed is the time
+        taken by the command in seconds.
+        """
+        auth = self._get_auth(host, owner)
+        batch_size, limit, job_time = auth
+        target = self.timeout * self.TARGET_FRACTION
+        if elapsed >= self.timeout:
+            auth[0] = max(1, batch_size // 2)
+            auth[1] = 1
+            return
+        latest_job_time = float(elapsed) / max(1, n_jobs)
+        if job_time is None:
+            job_time = latest_job_time
+        else:
+            job_time = (
+                self.WEIGHT * latest_job_time + (1 - self.WEIGHT) * job_time)
+        auth[2] = job_time
+        if job_time > 0:
+            auth[0] = max(1, min(self.BATCH_SIZE_MAX, int(target / job_time)))
+        if elapsed > target:
+            auth[1] = max(1, limit - 1)
+        else:
+            auth[1] = min(self.pool_size, limit + 1)
+
+    def _get_auth(self, host, owner):
+        """Return [batch size, limit, mean time per job] of (host, owner)."""
+        try:
+            return self.auths[(host, owner)]
+        except KeyError:
+            auth = [self.BATCH_SIZE_INIT, self.pool_size, None]
+            self.auths[(host, owner)] = auth
+            return auth
+
+
+if __name__ == "__main__":
+    import unittest
+
+    class _TaskProxy(object):
+        """Mock task proxy."""
+
+        def __init__(self, identity):
+            self.identity = identity
+
+    class TestJobSubmitPlanner(unittest.TestCase):
+        """Test JobSubmitPlanner."""
+
+        def test_get_batches(self):
+            """Batches are split by batch size, in task ID order."""
+            planner = JobSubmitPlanner(4, 100.0)
+            planner.BATCH_SIZE_INIT = 2
+            itasks = [_TaskProxy('t%d.1' % i) for i in (3, 1, 2)]
+            self.assertEqual(
+                [['t1.1', 't2.1'], ['t3.1']],
+                [[itask.identity for itask in batch]
+                 for batch in planner.get_batches('h', 'u', itasks)])
+
+        def test_put_result_timeout(self):
+            """A timed out host is throttled."""
+            planner = JobSubmitPlanner(4, 100.0)
+            self.assertEqual(4, planner.get_limit('slow', None))
+            planner.put_result('slow', None, 100, 100.0)
+            self.assertEqual([50, 1, None], planner.auths[('slow', None)])
+            planner.put_result('slow', None, 50, 100.0)
+            self.assertEqual([25, 1, None], planner.auths[('slow', None)])
+            # Other hosts are not affected
+            self.assertEqual(4, planner.get_limit('fast', None))
+
+        def test_put_result_adapt(self):
+            """Batch size and limit adapt to time taken."""
+            planner = JobSubmitPlanner(4, 100.0)
+            # 1 second per job, 25 seconds target
+            planner.put_result('h', None, 10, 10.0)
+            self.assertEqual([25, 4, 1.0], planner.auths[('h', None)])
+            # 2 seconds per job, slower than target
+            planner.put_result('h', None, 25, 75.0)
+            self.assertEqual([12, 3, 2.0], planner.auths[('h', None)])
+            # Very quick jobs
+            for _ in range(20):
+                planner.put_result('h', None, 10, 0.001)
+            self.assertEqual(
+                [JobSubmitPlanner.BATCH_SIZE_MAX, 4],
+                planner.auths[('h', None)][0:2])
+
+    unittest.main()
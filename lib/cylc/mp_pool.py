@@ -17,10 +17,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Manage queueing and pooling of subprocesses for the suite server program."""
 
+from errno import EINTR
 import os
 import sys
 import time
+import traceback
+from StringIO import StringIO
 from pipes import quote
+from select import select, error as SelectError
 from signal import SIGKILL
 from subprocess import Popen, PIPE
 from tempfile import TemporaryFile
@@ -46,7 +50,9 @@ def get_func(func_name, src_dir):
     if func_name in _XTRIG_FUNCS:
         return _XTRIG_FUNCS[func_name]
     # First look in <src-dir>/lib/python.
-    sys.path.insert(0, os.path.join(src_dir, 'lib', 'python'))
+    src_lib_dir = os.path.join(src_dir, 'lib', 'python')
+    if src_lib_dir not in sys.path:
+        sys.path.insert(0, src_lib_dir)
     mod_name = func_name
     try:
         mod_by_name = __import__(mod_name, fromlist=[mod_name])
@@ -89,6 +95,43 @@ def run_function(func_name, json_args, json_kwargs, src_dir):
     sys.stdout.write(json.dumps(res))
 
 
+def run_function_worker():
+    """Run Python functions on requests from STDIN until end of file.
+
+    Each request is a line of JSON [func_name, json_args, json_kwargs,
+    src_dir], as the arguments of "run_function". Write a line of JSON
+    [ret_code, out, err] to STDOUT in response to each, where "out" is what
+    "run_function" would write to STDOUT, and "err" is anything written to
+    STDOUT or STDERR by the function.
+
+    Functions and their modules are imported once, and remain loaded for
+    subsequent requests.
+    """
+    orig_stdout = sys.stdout
+    orig_stderr = sys.stderr
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        ret_code = 0
+        out = ''
+        sys.stdout = sys.stderr = StringIO()
+        try:
+            func_name, json_args, json_kwargs, src_dir = json.loads(line)
+            func = get_func(str(func_name), src_dir)
+            res = func(*json.loads(json_args), **json.loads(json_kwargs))
+            out = json.dumps(res)
+        except Exception:
+            traceback.print_exc()
+            ret_code = 1
+        finally:
+            err = sys.stdout.getvalue()
+            sys.stdout = orig_stdout
+            sys.stderr = orig_stderr
+        sys.stdout.write(json.dumps([ret_code, out, err]) + '\n')
+        sys.stdout.flush()
+
+
 class SuiteProcContext(object):
     """Represent the context of a command to run.
 
@@ -104,6 +147,11 @@ class SuiteProcContext(object):
                     Specify extra environment variables for command.
                 err (str):
                     Default STDERR content.
+                limit (int):
+                    Maximum number of commands with the same limit_key to
+                    run at the same time.
+                limit_key (object):
+                    Key to group commands for the limit, e.g. (host, owner).
                 out (str):
                     Default STDOUT content.
                 ret_code (int):
@@ -122,6 +170,8 @@ class SuiteProcContext(object):
             Return code of the command.
         .timestamp (str):
             Time string of latest update.
+        .time_start (float):
+            Time (seconds since epoch) when the command was started.
         .proc_pool_timeout (float):
             command execution timeout.
     """
@@ -140,6 +190,7 @@ class SuiteProcContext(object):
         self.err = cmd_kwargs.get('err')
         self.ret_code = cmd_kwargs.get('ret_code')
         self.out = cmd_kwargs.get('out')
+        self.time_start = None
 
     def update_cmd(self):
         pass
@@ -191,6 +242,8 @@ class SuiteFuncContext(SuiteProcContext):
             function call interval (how often to check the external trigger)
         .ret_val (bool, dict)
             function return: (satisfied?, result to pass to trigger tasks)
+        .suite_source_dir (str):
+            suite source directory, to find local xtrigger modules
     """
 
     def __init__(self, label, func_name, func_args, func_kwargs, intvl):
@@ -201,11 +254,13 @@ class SuiteFuncContext(SuiteProcContext):
         self.func_args = func_args
         self.intvl = float(intvl)
         self.ret_val = (False, None)  # (satisfied, broadcast)
+        self.suite_source_dir = None
         super(SuiteFuncContext, self).__init__(
             'xtrigger-func', cmd=[], shell=False)
 
     def update_command(self, suite_source_dir):
         """Update the function wrap command after changes."""
+        self.suite_source_dir = suite_source_dir
         self.cmd = ['cylc-function-run', self.func_name,
                     json.dumps(self.func_args),
                     json.dumps(self.func_kwargs),
@@ -219,6 +274,83 @@ class SuiteFuncContext(SuiteProcContext):
         return "%s(%s)" % (self.func_name, ", ".join([str(a) for a in args]))
 
 
+class SuiteFuncWorker(object):
+    """A long-lived process to run functions, one call at a time.
+
+    The process runs "cylc function-run --worker", so a function and its
+    module are imported once, instead of once per call.
+
+    Attributes:
+        .chunks (list):
+            Output received for the current call.
+        .is_eof (boolean):
+            Has the process closed its STDOUT, i.e. exited?
+        .item (list):
+            [ctx, callback, callback_args] of the current call, or None if
+            the worker is idle.
+        .proc (subprocess.Popen):
+            The worker process.
+    """
+
+    CMD = ['cylc-function-run', '--worker']
+
+    def __init__(self):
+        self.proc = Popen(
+            self.CMD, stdin=PIPE, stdout=PIPE,
+            # Execute command as a process group leader,
+            # so we can use "os.killpg" to kill the whole group.
+            preexec_fn=os.setpgrp)
+        LOG.debug(self.CMD)
+        self.chunks = []
+        self.is_eof = False
+        self.item = None
+
+    def get_response(self):
+        """Return [ret_code, out, err] of the current call, if complete.
+
+        Return None if the response has not been fully received.
+        """
+        response = ''.join(self.chunks)
+        if not response.endswith('\n'):
+            return None
+        ret_code, out, err = json.loads(response)
+        return [ret_code, out.encode('utf-8'), err.encode('utf-8')]
+
+    def kill(self):
+        """Kill the process, and return its return code."""
+        try:
+            os.killpg(self.proc.pid, SIGKILL)
+        except OSError:
+            pass  # Already exited
+        return self.stop()
+
+    def put(self, item):
+        """Send the call in item [ctx, callback, callback_args] to process."""
+        ctx = item[0]
+        self.chunks = []
+        self.item = item
+        try:
+            self.proc.stdin.write(json.dumps([
+                ctx.func_name,
+                json.dumps(ctx.func_args),
+                json.dumps(ctx.func_kwargs),
+                ctx.suite_source_dir]) + '\n')
+            self.proc.stdin.flush()
+        except IOError:
+            # Process has gone away
+            self.is_eof = True
+
+    def stop(self):
+        """Close pipes to make the process exit, and return its return code.
+        """
+        for pipe in self.proc.stdin, self.proc.stdout:
+            try:
+                pipe.close()
+            except IOError:
+                pass
+        return self.proc.wait()
+
+
 class SuiteProcPool(object):
     """Manage queueing and pooling of subprocesses.
 
@@ -231,7 +363,9 @@ class SuiteProcPool(object):
     """
 
     ERR_SUITE_STOPPING = 'suite stopping, command not run'
+    EXIT_POLL_INTERVAL = 0.1
     JOBS_SUBMIT = 'jobs-submit'
+    PIPE_READ_SIZE = 65536
     RET_CODE_SUITE_STOPPING = 999
 
     def __init__(self, size=None):
@@ -245,6 +379,12 @@ class SuiteProcPool(object):
         self.stopping_lock = RLock()
         self.queuings = deque()
         self.runnings = []
+        # Output chunks by file descriptor of child process STDOUT and STDERR
+        # pipes, drained as output arrives so children do not block on them.
+        self.pipe_chunks = {}
+        self.pipe_eof_chunks = {}
+        # Long-lived processes to run xtrigger functions
+        self.func_workers = []
 
     def close(self):
         """Close pool."""
@@ -253,7 +393,9 @@ class SuiteProcPool(object):
 
     def is_not_done(self):
         """Return True if queuings or runnings not empty."""
-        return self.queuings or self.runnings
+        return (
+            self.queuings or self.runnings or
+            any(worker.item is not None for worker in self.func_workers))
 
     def _is_stopping(self):
         """Return True if .stopping is True."""
@@ -265,12 +407,67 @@ class SuiteProcPool(object):
     def _proc_exit(self, proc, err_xtra, ctx, callback, callback_args):
         """Get ret_code, out, err of exited command, and call its callback."""
         ctx.ret_code = proc.wait()
-        ctx.out, err = proc.communicate()
-        ctx.err = err + err_xtra
+        ctx.out = self._read_pipe_to_end(proc.stdout)
+        ctx.err = self._read_pipe_to_end(proc.stderr) + err_xtra
         self._run_command_exit(ctx, callback, callback_args)
 
+    def _read_pipe_to_end(self, pipe):
+        """Return all output of a child process pipe, and close it."""
+        fileno = pipe.fileno()
+        if fileno in self.pipe_eof_chunks:
+            chunks = self.pipe_eof_chunks.pop(fileno)
+        else:
+            chunks = self.pipe_chunks.pop(fileno, [])
+            while True:
+                data = os.read(fileno, self.PIPE_READ_SIZE)
+                if not data:
+                    break
+                chunks.append(data)
+        pipe.close()
+        return ''.join(chunks)
+
+    def _read_pipes(self, timeout=0.0):
+        """Read available output from the pipes of child processes.
+
+        Wait up to timeout seconds for some output. Return True if a pipe has
+        reached end of file, i.e. its child process has probably exited, or if
+        a function worker has probably completed its call.
+        """
+        worker_of_filenos = dict(
+            (worker.proc.stdout.fileno(), worker)
+            for worker in self.func_workers
+            if worker.item is not None and not worker.is_eof)
+        if not self.pipe_chunks and not worker_of_filenos:
+            return False
+        try:
+            filenos = select(
+                list(self.pipe_chunks) + list(worker_of_filenos), [], [],
+                timeout)[0]
+        except SelectError as exc:
+            if exc.args[0] == EINTR:
+                return False
+            raise
+        is_done = False
+        for fileno in filenos:
+            data = os.read(fileno, self.PIPE_READ_SIZE)
+            if fileno in worker_of_filenos:
+                worker = worker_of_filenos[fileno]
+                if data:
+                    worker.chunks.append(data)
+                else:
+                    worker.is_eof = True
+                if not data or data.endswith('\n'):
+                    is_done = True
+            elif data:
+                self.pipe_chunks[fileno].append(data)
+            else:
+                self.pipe_eof_chunks[fileno] = self.pipe_chunks.pop(fileno)
+                is_done = True
+        return is_done
+
     def process(self):
         """Process done child processes and submit more."""
+        self._read_pipes()
         # Handle child processes that are done
         runnings = []
         for proc, ctx, callback, callback_args in self.runnings:
@@ -292,19 +489,104 @@ class SuiteProcPool(object):
 
         # Update list of running items
         self.runnings[:] = runnings
+        self._process_func_workers()
         # Create more child processes, if items in queue and space in pool
         stopping = self._is_stopping()
-        while self.queuings and len(self.runnings) < self.size:
+        limit_counts = {}
+        for _, ctx, _, _ in self.runnings:
+            limit_key = ctx.cmd_kwargs.get('limit_key')
+            if limit_key is not None:
+                limit_counts.setdefault(limit_key, 0)
+                limit_counts[limit_key] += 1
+        limiteds = []
+        n_busy_workers = len(
+            [worker for worker in self.func_workers if worker.item])
+        while (self.queuings and
+                len(self.runnings) + n_busy_workers < self.size):
             ctx, callback, callback_args = self.queuings.popleft()
+            limit_key = ctx.cmd_kwargs.get('limit_key')
             if stopping and ctx.cmd_key == self.JOBS_SUBMIT:
                 ctx.err = self.ERR_SUITE_STOPPING
                 ctx.ret_code = self.RET_CODE_SUITE_STOPPING
                 self._run_command_exit(ctx)
+            elif (limit_key is not None and
+                    limit_counts.get(limit_key, 0) >= ctx.cmd_kwargs['limit']):
+                # Leave it in the queue for now, run others in the meantime
+                limiteds.append([ctx, callback, callback_args])
+            elif isinstance(ctx, SuiteFuncContext):
+                if self._put_func_worker(ctx, callback, callback_args):
+                    n_busy_workers += 1
             else:
                 proc = self._run_command_init(ctx, callback, callback_args)
                 if proc is not None:
-                    ctx.timeout = time.time() + self.proc_pool_timeout
+                    if limit_key is not None:
+                        limit_counts.setdefault(limit_key, 0)
+                        limit_counts[limit_key] += 1
+                    ctx.time_start = time.time()
+                    ctx.timeout = ctx.time_start + self.proc_pool_timeout
                     self.runnings.append([proc, ctx, callback, callback_args])
+                    for pipe in proc.stdout, proc.stderr:
+                        self.pipe_chunks[pipe.fileno()] = []
+        self.queuings.extendleft(reversed(limiteds))
+
+    def _process_func_workers(self):
+        """Handle function calls that are done, and stop idle workers if
+        the pool is closed."""
+        now = time.time()
+        func_workers = []
+        dones = []
+        for worker in self.func_workers:
+            if worker.item is None:
+                if self.closed or worker.proc.poll() is not None:
+                    worker.stop()
+                else:
+                    func_workers.append(worker)
+                continue
+            ctx = worker.item[0]
+            response = worker.get_response()
+            if response is not None:
+                ctx.ret_code, ctx.out, ctx.err = response
+                dones.append(worker.item)
+                worker.item = None
+                func_workers.append(worker)
+            elif worker.is_eof or now >= ctx.timeout:
+                ctx.out = ''
+                if worker.is_eof:
+                    ctx.err = 'function worker exited'
+                else:
+                    ctx.err = 'killed on timeout (%s)' % (
+                        self.proc_pool_timeout)
+                ctx.ret_code = worker.kill()
+                dones.append(worker.item)
+            else:
+                func_workers.append(worker)
+        self.func_workers[:] = func_workers
+        for ctx, callback, callback_args in dones:
+            self._run_command_exit(ctx, callback, callback_args)
+
+    def _put_func_worker(self, ctx, callback, callback_args):
+        """Run function call in ctx on an idle worker, start one if needed.
+
+        Return True if the call is sent to a worker.
+        """
+        for worker in self.func_workers:
+            if worker.item is None:
+                break
+        else:
+            try:
+                worker = SuiteFuncWorker()
+            except OSError as exc:
+                exc.filename = SuiteFuncWorker.CMD[0]
+                LOG.exception(exc)
+                ctx.ret_code = 1
+                ctx.err = str(exc)
+                self._run_command_exit(ctx, callback, callback_args)
+                return False
+            self.func_workers.append(worker)
+        ctx.time_start = time.time()
+        ctx.timeout = ctx.time_start + self.proc_pool_timeout
+        worker.put([ctx, callback, callback_args])
+        return True
 
     def put_command(self, ctx, callback=None, callback_args=None):
         """Queue a new shell command to execute.
@@ -341,6 +623,35 @@ class SuiteProcPool(object):
             ctx.ret_code = proc.wait()
             cls._run_command_exit(ctx)
 
+    def sleep(self, timeout):
+        """Sleep for up to timeout seconds.
+
+        Return early if a child process has probably exited, or if a function
+        call has probably completed, so that it can be handled by the next
+        "process" without delay.
+        """
+        end_time = time.time() + timeout
+        while True:
+            timeout = end_time - time.time()
+            if timeout <= 0.0 or any(
+                    worker.item is not None and worker.is_eof
+                    for worker in self.func_workers):
+                return
+            if self.pipe_eof_chunks:
+                # A child process has closed its pipes, but may not have
+                # exited yet, check again in a short while.
+                if any(value[0].poll() is not None
+                       for value in self.runnings):
+                    return
+                timeout = min(timeout, self.EXIT_POLL_INTERVAL)
+            if self.pipe_chunks or any(
+                    worker.item is not None and not worker.is_eof
+                    for worker in self.func_workers):
+                if self._read_pipes(timeout):
+                    return
+            else:
+                time.sleep(timeout)
+
     def set_stopping(self):
         """Stop job submission."""
         with self.stopping_lock:
@@ -360,6 +671,13 @@ class SuiteProcPool(object):
             proc = value[0]
             if proc:
                 os.killpg(proc.pid, SIGKILL)
+        for worker in self.func_workers:
+            if worker.item is not None:
+                try:
+                    os.killpg(worker.proc.pid, SIGKILL)
+                except OSError:
+                    pass  # Already exited
+                worker.is_eof = True
         # Wait for child processes
         self.process()
 
@@ -409,3 +727,153 @@ class SuiteProcPool(object):
             if not callback_args:
                 callback_args = []
             callback(ctx, *callback_args)
+
+
+if __name__ == "__main__":
+    import unittest
+
+    class TestSuiteProcPool(unittest.TestCase):
+        """Test SuiteProcPool."""
+
+        def _run_pool(self, pool, timeout=1.0):
+            """Process pool until done, return time taken."""
+            time0 = time.time()
+            pool.process()
+            while pool.is_not_done():
+                pool.sleep(timeout)
+                pool.process()
+            return time.time() - time0
+
+        def test_large_output(self):
+            """Command with output larger than a pipe buffer completes."""
+            pool = SuiteProcPool(size=1)
+            ctxs = []
+            pool.put_command(
+                SuiteProcContext(
+                    'large-output',
+                    'head -c 1000000 /dev/zero; echo oops >&2', shell=True),
+                ctxs.append)
+            self._run_pool(pool)
+            self.assertEqual(1, len(ctxs))
+            self.assertEqual(0, ctxs[0].ret_code)
+            self.assertEqual(1000000, len(ctxs[0].out))
+            self.assertEqual('oops\n', ctxs[0].err)
+            self.assertEqual({}, pool.pipe_chunks)
+            self.assertEqual({}, pool.pipe_eof_chunks)
+
+        def test_sleep_wakes_on_exit(self):
+            """Pool sleep returns early when a command exits."""
+            pool = SuiteProcPool(size=2)
+            ctxs = []
+            for cmd in ['sleep 0.5; echo hello', 'exit 1']:
+                pool.put_command(
+                    SuiteProcContext('sleep', cmd, shell=True), ctxs.append)
+            self.assertTrue(self._run_pool(pool, timeout=30.0) < 15.0)
+            self.assertEqual(
+                [(0, 'hello\n'), (1, '')],
+                sorted((ctx.ret_code, ctx.out) for ctx in ctxs))
+
+        def test_limit(self):
+            """Commands with the same limit_key are limited."""
+            pool = SuiteProcPool(size=3)
+            ctxs = []
+            for name, limit_key in [
+                    ('a1', 'a'), ('a2', 'a'), ('b1', 'b'), ('c1', None)]:
+                pool.put_command(
+                    SuiteProcContext(
+                        name, 'sleep 0.2', shell=True,
+                        limit_key=limit_key, limit=1),
+                    ctxs.append)
+            pool.process()
+            self.assertEqual(
+                ['a1', 'b1', 'c1'],
+                sorted(ctx.cmd_key for _, ctx, _, _ in pool.runnings))
+            self.assertEqual(
+                ['a2'], [ctx.cmd_key for ctx, _, _ in pool.queuings])
+            self._run_pool(pool)
+            self.assertEqual('a2', ctxs[-1].cmd_key)
+
+    class TestSuiteFuncWorker(unittest.TestCase):
+        """Test running functions in SuiteFuncWorker via SuiteProcPool."""
+
+        FUNC_SRC = (
+            'import time\n'
+            'N_CALLS = [0]\n'
+            'def counter(delay=0):\n'
+            '    print "counting"\n'
+            '    time.sleep(delay)\n'
+            '    N_CALLS[0] += 1\n'
+            '    return N_CALLS[0]\n')
+
+        def setUp(self):
+            from tempfile import mkdtemp
+            self.src_dir = mkdtemp()
+            os.makedirs(os.path.join(self.src_dir, 'lib', 'python'))
+            with open(os.path.join(
+                    self.src_dir, 'lib', 'python', 'counter.py'), 'w') as handle:
+                handle.write(self.FUNC_SRC)
+
+        def tearDown(self):
+            from shutil import rmtree
+            rmtree(self.src_dir)
+
+        def _get_ctx(self, func_name='counter', delay=0):
+            """Return a new function context."""
+            ctx = SuiteFuncContext(
+                'label', func_name, [], {'delay': delay}, 10.0)
+            ctx.update_command(self.src_dir)
+            return ctx
+
+        def _run_pool(self, pool):
+            """Process pool until done."""
+            pool.process()
+            while pool.is_not_done():
+                pool.sleep(1.0)
+                pool.process()
+
+        def test_worker_reuse(self):
+            """Function module is imported once by a long-lived worker."""
+            pool = SuiteProcPool(size=2)
+            ctxs = []
+            for _ in range(3):
+                pool.put_command(self._get_ctx(), ctxs.append)
+                self._run_pool(pool)
+            self.assertEqual(
+                [(0, '1'), (0, '2'), (0, '3')],
+                [(ctx.ret_code, ctx.out) for ctx in ctxs])
+            self.assertEqual('counting\n', ctxs[0].err)
+            self.assertEqual(1, len(pool.func_workers))
+            pool.close()
+            pool.process()
+            self.assertEqual([], pool.func_workers)
+
+        def test_worker_bad_func(self):
+            """A bad function call does not stop the worker."""
+            pool = SuiteProcPool(size=1)
+            ctxs = []
+            pool.put_command(self._get_ctx('no_such_func'), ctxs.append)
+            pool.put_command(self._get_ctx(), ctxs.append)
+            self._run_pool(pool)
+            self.assertEqual(1, ctxs[0].ret_code)
+            self.assertEqual('', ctxs[0].out)
+            self.assertIn('ImportError', ctxs[0].err)
+            self.assertEqual((0, '1'), (ctxs[1].ret_code, ctxs[1].out))
+            self.assertEqual(1, len(pool.func_workers))
+            pool.terminate()
+
+        def test_worker_timeout(self):
+            """A function call is killed on timeout with its worker."""
+            pool = SuiteProcPool(size=2)
+            pool.proc_pool_timeout = 1.0
+            ctxs = []
+            pool.put_command(self._get_ctx(delay=60), ctxs.append)
+            pool.put_command(self._get_ctx(), ctxs.append)
+            self._run_pool(pool)
+            self.assertEqual(
+                [(0, '1', 'counting\n'),
+                 (-9, '', 'killed on timeout (1.0)')],
+                [(ctx.ret_code, ctx.out, ctx.err) for ctx in ctxs])
+            self.assertEqual(1, len(pool.func_workers))
+            pool.terminate()
+
+    unittest.main()
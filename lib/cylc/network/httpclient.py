@@ -178,6 +178,13 @@ class SuiteRuntimeServiceClient(object):
         return self.COMPAT_MAP[name].get(
             self.comms1.get(self.srv_files_mgr.KEY_API), default)
 
+    def _get_api(self):
+        """Return API version of suite, from its contact file."""
+        try:
+            return int(self.comms1.get(self.srv_files_mgr.KEY_API))
+        except (TypeError, ValueError):
+            return 0
+
     def clear_broadcast(self, payload):
         """Clear broadcast runtime task settings."""
         return self._call_server(
@@ -198,8 +205,13 @@ class SuiteRuntimeServiceClient(object):
             self._compat('get_info', default='') + command,
             method=self.METHOD_GET, **kwargs)
 
-    def get_latest_state(self, full_mode=False):
-        """Return latest state of the suite (for the GUI)."""
+    def get_latest_state(self, full_mode=False, revision=None):
+        """Return latest state of the suite (for the GUI).
+
+        If revision is set and the suite supports it, the result will contain
+        the summary revision, and may contain changes to the summary since the
+        given revision ("summary_delta"), instead of the whole summary.
+        """
         self._load_contact_info()
         if self.comms1.get(self.srv_files_mgr.KEY_API) == 0:
             # Basic compat for pre-7.5.0 suites
@@ -217,6 +229,11 @@ class SuiteRuntimeServiceClient(object):
                 'err_content': '',
                 'err_size': 0,
                 'mean_main_loop_interval': 5.0}
+        elif revision is not None and self._get_api() >= 3:
+            return self._call_server(
+                'get_latest_state',
+                method=self.METHOD_GET, full_mode=full_mode,
+                revision=revision)
         else:
             return self._call_server(
                 'get_latest_state',
@@ -252,6 +269,9 @@ class SuiteRuntimeServiceClient(object):
     def put_messages(self, payload):
         """Send task messages to suite server program.
 
+        Retry on failure, according to the task messaging settings of the
+        suite.
+
         Arguments:
             payload (dict):
                 task_job (str): Task job as "CYCLE/TASK_NAME/SUBMIT_NUM".
@@ -265,25 +285,8 @@ class SuiteRuntimeServiceClient(object):
             self.srv_files_mgr.KEY_TASK_MSG_MAX_TRIES,
             self.MSG_MAX_TRIES))
         for i in range(1, max_tries + 1):  # 1..max_tries inclusive
-            orig_timeout = self.timeout
-            if self.timeout is None:
-                self.timeout = self.MSG_TIMEOUT
             try:
-                func_name = self._compat('put_messages')
-                if func_name == 'put_messages':
-                    results = self._call_server(func_name, payload=payload)
-                elif func_name == 'put_message':  # API 1, 7.5.0 compat
-                    cycle, name = payload['task_job'].split('/')[0:2]
-                    for severity, message in payload['messages']:
-                        results.append(self._call_server(
-                            func_name, task_id='%s.%s' % (name, cycle),
-                            severity=severity, message=message))
-                else:  # API 0, pre-7.5.0 compat, priority instead of severity
-                    cycle, name = payload['task_job'].split('/')[0:2]
-                    for severity, message in payload['messages']:
-                        results.append(self._call_server(
-                            func_name, task_id='%s.%s' % (name, cycle),
-                            priority=severity, message=message))
+                results = self.put_messages_once(payload)
             except ClientInfoError:
                 # Contact info file not found, suite probably not running.
                 # Don't bother with retry, suite restart will poll any way.
@@ -298,11 +301,7 @@ class SuiteRuntimeServiceClient(object):
                         "   retry in %s seconds, timeout is %s\n" % (
                             retry_intvl, self.timeout))
                     sleep(retry_intvl)
-                    # Reset in case contact info or passphrase change
-                    self.comms1 = {}
-                    self.host = None
-                    self.port = None
-                    self.auth = None
+                    self.reset_contact_info()
             else:
                 if i > 1:
                     # Continue to write to STDERR, so users can easily see that
@@ -311,13 +310,69 @@ class SuiteRuntimeServiceClient(object):
                         "%s INFO - Send message: try %s of %s succeeded\n" % (
                             get_current_time_string(), i, max_tries))
                 return results
-            finally:
-                self.timeout = orig_timeout
+
+    def put_messages_once(self, payload):
+        """Send task messages to suite server program, without retry.
+
+        Arguments are the same as "put_messages". Raise ClientError on
+        failure.
+        """
+        orig_timeout = self.timeout
+        if self.timeout is None:
+            self.timeout = self.MSG_TIMEOUT
+        try:
+            func_name = self._compat('put_messages')
+            if func_name == 'put_messages':
+                return self._call_server(func_name, payload=payload)
+            results = []
+            if func_name == 'put_message':  # API 1, 7.5.0 compat
+                cycle, name = payload['task_job'].split('/')[0:2]
+                for severity, message in payload['messages']:
+                    results.append(self._call_server(
+                        func_name, task_id='%s.%s' % (name, cycle),
+                        severity=severity, message=message))
+            else:  # API 0, pre-7.5.0 compat, priority instead of severity
+                cycle, name = payload['task_job'].split('/')[0:2]
+                for severity, message in payload['messages']:
+                    results.append(self._call_server(
+                        func_name, task_id='%s.%s' % (name, cycle),
+                        priority=severity, message=message))
+            return results
+        finally:
+            self.timeout = orig_timeout
 
     def reset(self):
         """Compat method, does nothing."""
         pass
 
+    def put_messages_bulk(self, payloads):
+        """Send task messages of many task jobs to suite, without retry.
+
+        Arguments:
+            payloads (list): List of payloads of "put_messages".
+
+        Send them in one request if the suite supports it, otherwise send
+        them one by one. Raise ClientError on failure.
+        """
+        self._load_contact_info()
+        if self._get_api() < 4:  # pre-bulk API compat
+            return [self.put_messages_once(payload) for payload in payloads]
+        orig_timeout = self.timeout
+        if self.timeout is None:
+            self.timeout = self.MSG_TIMEOUT
+        try:
+            return self._call_server(
+                'put_messages_bulk', payload={'records': payloads})
+        finally:
+            self.timeout = orig_timeout
+
+    def reset_contact_info(self):
+        """Forget contact info, in case contact info or passphrase change."""
+        self.comms1 = {}
+        self.host = None
+        self.port = None
+        self.auth = None
+
     def signout(self):
         """Tell server to forget this client."""
         return self._call_server('signout')
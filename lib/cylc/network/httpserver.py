@@ -49,7 +49,7 @@ from cylc.wallclock import RE_DATE_TIME_FORMAT_EXTENDED
 class HTTPServer(object):
     """HTTP(S) server by cherrypy, for serving suite runtime API."""
 
-    API = 2
+    API = 4
     LOG_CONNECT_DENIED_TMPL = "[client-connect] DENIED %s@%s:%s %s"
 
     def __init__(self, suite):
@@ -312,11 +312,13 @@ class SuiteRuntimeService(object):
 
     @cherrypy.expose
     @cherrypy.tools.json_out()
-    def get_latest_state(self, full_mode=False):
+    def get_latest_state(self, full_mode=False, revision=None):
         """Return latest suite state (suitable for a GUI update)."""
         client_info = self._check_access_priv_and_report(PRIV_FULL_READ)
         full_mode = self._literal_eval('full_mode', full_mode)
-        return self.schd.info_get_latest_state(client_info, full_mode)
+        revision = self._literal_eval('revision', revision)
+        return self.schd.info_get_latest_state(
+            client_info, full_mode, revision)
 
     @cherrypy.expose
     @cherrypy.tools.json_out()
@@ -515,7 +517,7 @@ class SuiteRuntimeService(object):
         if match:
             message, event_time = match.groups()
         self.schd.message_queue.put(
-            (task_id, event_time, severity, message))
+            [(task_id, event_time, severity, message)])
         return (True, 'Message queued')
 
     @cherrypy.expose
@@ -536,11 +538,33 @@ class SuiteRuntimeService(object):
             cherrypy.request.json.get("event_time", event_time))
         messages = utf8_enforce(
             cherrypy.request.json.get("messages", messages))
-        for severity, message in messages:
-            self.schd.message_queue.put(
-                (task_job, event_time, severity, message))
+        self.schd.message_queue.put([
+            (task_job, event_time, severity, message)
+            for severity, message in messages])
         return (True, 'Messages queued: %d' % len(messages))
 
+    @cherrypy.expose
+    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_out()
+    def put_messages_bulk(self, records=None):
+        """Put task messages of many task jobs in queue in one go.
+
+        Arguments:
+            records (list): List of dict in the form {"task_job": ...,
+                "event_time": ..., "messages": ...}, with values as the
+                arguments of "put_messages".
+        """
+        self._check_access_priv_and_report(PRIV_FULL_CONTROL, log_info=False)
+        records = utf8_enforce(cherrypy.request.json.get("records", records))
+        items = []
+        for record in records:
+            for severity, message in record["messages"]:
+                items.append((
+                    record["task_job"], record["event_time"], severity,
+                    message))
+        self.schd.message_queue.put(items)
+        return (True, 'Messages queued: %d' % len(items))
+
     @cherrypy.expose
     @cherrypy.tools.json_out()
     def reload_suite(self):
@@ -22,7 +22,6 @@ import math
 
 from cylc.conditional_simplifier import ConditionalSimplifier
 from cylc.cycling.loader import get_point
-from cylc.suite_logging import ERR
 
 
 class TriggerExpressionError(Exception):
@@ -33,24 +32,130 @@ class TriggerExpressionError(Exception):
         return repr(self.msg)
 
 
+class Condition(object):
+    """A compiled logical trigger expression.
+
+    A boolean circuit over the messages of a prerequisite, which are
+    represented by their bits in an integer mask. It is compiled once per
+    graph dependency, and shared by the prerequisites of all task proxies
+    generated from the dependency.
+
+    Attributes:
+        .is_or (bool):
+            True for an OR node, False for an AND node.
+        .mask (int):
+            Bits of the messages directly under this node.
+        .children (tuple):
+            Sub-conditions (Condition) of this node.
+        .simplified (dict):
+            Cache of simplified conditions {dropped mask: Condition, ...}.
+    """
+
+    __slots__ = ['is_or', 'mask', 'children', 'simplified']
+
+    def __init__(self, is_or, mask, children):
+        self.is_or = is_or
+        self.mask = mask
+        self.children = tuple(children)
+        self.simplified = {}
+
+    def is_satisfied(self, sat_mask):
+        """Return True if condition is satisfied by messages in sat_mask.
+
+        Short-circuit on the messages directly under each node first.
+        """
+        if self.is_or:
+            return bool(sat_mask & self.mask) or any(
+                child.is_satisfied(sat_mask) for child in self.children)
+        return (sat_mask & self.mask) == self.mask and all(
+            child.is_satisfied(sat_mask) for child in self.children)
+
+    def simplify(self, dropped_mask):
+        """Return this condition with the messages in dropped_mask removed.
+
+        Return None if nothing is left. A removed message does not count in
+        the expression at all, as in ConditionalSimplifier.
+        """
+        if not dropped_mask:
+            return self
+        try:
+            return self.simplified[dropped_mask]
+        except KeyError:
+            pass
+        mask = self.mask & ~dropped_mask
+        children = []
+        for child in self.children:
+            child = child.simplify(dropped_mask)
+            if child is not None:
+                children.append(child)
+        if not mask and not children:
+            ret = None
+        elif not mask and len(children) == 1:
+            ret = children[0]
+        else:
+            ret = Condition(self.is_or, mask, children)
+        self.simplified[dropped_mask] = ret
+        return ret
+
+    @classmethod
+    def get_and(cls, items):
+        """Return an AND condition of items (bit indices or Condition)."""
+        return cls._get_node(False, items)
+
+    @classmethod
+    def get_or(cls, items):
+        """Return an OR condition of items (bit indices or Condition)."""
+        return cls._get_node(True, items)
+
+    @classmethod
+    def _get_node(cls, is_or, items):
+        """Return a node of items, flattening nodes of the same type."""
+        mask = 0
+        children = []
+        for item in items:
+            if item is None:
+                continue
+            elif not isinstance(item, Condition):
+                mask |= 1 << item
+            elif item.is_or == is_or:
+                mask |= item.mask
+                children.extend(item.children)
+            elif not item.children and bin(item.mask).count('1') == 1:
+                # Node with a single message
+                mask |= item.mask
+            else:
+                children.append(item)
+        if not mask and not children:
+            return None
+        if not mask and len(children) == 1:
+            return children[0]
+        return cls(is_or, mask, children)
+
+
 class Prerequisite(object):
-    """The concrete result of an abstract logical trigger expression."""
+    """The concrete result of an abstract logical trigger expression.
+
+    Each message of a prerequisite is represented by a bit, in the order in
+    which the messages are added. The satisfaction state is held in integer
+    masks, and evaluated against a compiled Condition.
+
+    A prerequisite generated from a graph dependency does not hold its
+    messages, which are resolved from the dependency at its cycle point on
+    demand.
+    """
 
     # Memory optimization - constrain possible attributes to this list.
-    __slots__ = ["SATISFIED_TEMPLATE", "MESSAGE_TEMPLATE",
-                 "satisfied", "_all_satisfied",
-                 "target_point_strings", "start_point",
-                 "pre_initial_messages", "conditional_expression", "point"]
+    __slots__ = ["point", "start_point", "_dependency", "_messages",
+                 "_condition", "_dropped", "_satisfied", "_overridden",
+                 "_all_satisfied"]
 
-    # Extracts T from "foo.T succeeded" etc.
-    SATISFIED_TEMPLATE = 'bool(self.satisfied[("%s", "%s", "%s")])'
     MESSAGE_TEMPLATE = '%s.%s %s'
 
     DEP_STATE_SATISFIED = 'satisfied naturally'
     DEP_STATE_OVERRIDDEN = 'force satisfied'
     DEP_STATE_UNSATISFIED = False
 
-    def __init__(self, point, start_point=None):
+    def __init__(self, point, start_point=None, dependency=None):
         # The cycle point to which this prerequisite belongs.
         # cylc.cycling.PointBase
         self.point = point
@@ -59,20 +164,26 @@ class Prerequisite(object):
         # cylc.cycling.PointBase
         self.start_point = start_point
 
-        # List of cycle point strings that this prerequiste depends on.
-        self.target_point_strings = []
+        # The graph dependency that generates the messages, or None if
+        # messages are added with "add".
+        # cylc.task_trigger.Dependency
+        self._dependency = dependency
 
-        # Dictionary of messages pertaining to this prerequisite.
-        # {('task name', 'point string', 'output'): DEP_STATE_X, ...}
-        self.satisfied = {}
+        # List of added messages, bit i of each mask below represents
+        # messages[i]. None if messages are generated by the dependency.
+        # [('task name', 'point string', 'output'), ...]
+        self._messages = None
+        if dependency is None:
+            self._messages = []
 
-        # Messages pertaining to pre-initial dependencies.
-        # ['task name', 'point string' ,'output']
-        self.pre_initial_messages = []
+        # Compiled condition, None if no messages left to satisfy.
+        self._condition = None
 
-        # Expression present only when conditions are used.
-        # 'foo.1 failed & bar.1 succeeded'
-        self.conditional_expression = None
+        # Masks of messages that are: dropped by pre-initial simplification,
+        # satisfied naturally, force satisfied.
+        self._dropped = 0
+        self._satisfied = 0
+        self._overridden = 0
 
         # The cashed state of this prerequisite:
         # * `None` (no cached state)
@@ -80,9 +191,42 @@ class Prerequisite(object):
         # * `False` (prerequisite unsatisfied).
         self._all_satisfied = None
 
+    @property
+    def messages(self):
+        """Return a list of messages pertaining to this prerequisite.
+
+        [('task name', 'point string', 'output'), ...]
+        """
+        if self._messages is None:
+            return self._dependency.get_messages(self.point)
+        return self._messages
+
+    @property
+    def satisfied(self):
+        """Return a dict of messages pertaining to this prerequisite.
+
+        {('task name', 'point string', 'output'): DEP_STATE_X, ...}
+        """
+        ret = {}
+        messages = self.messages
+        for i, message in enumerate(messages):
+            bit = 1 << i
+            if self._satisfied & bit:
+                ret[message] = self.DEP_STATE_SATISFIED
+            elif self._overridden & bit:
+                ret[message] = self.DEP_STATE_OVERRIDDEN
+            else:
+                ret[message] = self.DEP_STATE_UNSATISFIED
+        for i, message in enumerate(messages):
+            if self._dropped & (1 << i):
+                ret.pop(message, None)
+        return ret
+
     def add(self, name, point, output, pre_initial=False):
         """Register an output with this prerequisite.
 
+        Only for a prerequisite not generated from a graph dependency.
+
         Args:
             name (str): The name of the task to which the output pertains.
             point (str/cylc.cycling.PointBase): The cycle point at which this
@@ -91,16 +235,26 @@ class Prerequisite(object):
             pre_initial (bool): Set this output as a pre-initial dependency.
 
         """
-        message = (name, str(point), output)
-
         # Add a new prerequisite message in an UNSATISFIED state.
-        self.satisfied[message] = self.DEP_STATE_UNSATISFIED
+        self._messages.append((name, str(point), output))
         if self._all_satisfied is not None:
             self._all_satisfied = False
-        if point and str(point) not in self.target_point_strings:
-            self.target_point_strings.append(str(point))
-        if pre_initial and message not in self.pre_initial_messages:
-            self.pre_initial_messages.append(message)
+        if isinstance(point, basestring) and self.start_point:
+            point = get_point(point)
+        self.drop_pre_initial(len(self._messages) - 1, point, pre_initial)
+
+    def drop_pre_initial(self, index, point, pre_initial=False):
+        """Drop message at index, if it is pre-initial.
+
+        Drop pre-initial and pre warm-start dependence, i.e. if pre_initial
+        is set, or if point of the message is before the start point but
+        the point of this prerequisite is not.
+        """
+        if pre_initial or (
+                self.start_point and point and
+                point < self.start_point and
+                self.point >= self.start_point):
+            self._dropped |= 1 << index
 
     def get_raw_conditional_expression(self):
         """Return a representation of this prereq as a string.
@@ -108,53 +262,32 @@ class Prerequisite(object):
         Returns None if this prerequisite is not a conditional one.
 
         """
-        expr = self.conditional_expression
-        if not expr:
+        if self._dependency is None or not self._dependency.is_conditional():
             return None
-        for message in self.satisfied:
-            expr = expr.replace(self.SATISFIED_TEMPLATE % message,
-                                self.MESSAGE_TEMPLATE % message)
+        expr = self._dependency.get_expression(self.point)
+        if self._dropped:
+            expr = ConditionalSimplifier(expr, [
+                self.MESSAGE_TEMPLATE % message
+                for i, message in enumerate(self.messages)
+                if self._dropped & (1 << i)]).get_cleaned()
         return expr
 
-    def set_condition(self, expr):
-        """Set the conditional expression for this prerequisite.
+    def set_condition(self, condition=None):
+        """Set the condition for this prerequisite.
+
+        Args:
+            condition (Condition): The compiled trigger expression, over the
+                messages in order. Default is to AND all messages.
 
         Resets the cached state (self._all_satisfied).
 
         """
-
-        drop_these = []
         self._all_satisfied = None
-
-        if self.pre_initial_messages:
-            for message in self.pre_initial_messages:
-                drop_these.append(message)
-
-        # Needed to drop pre warm-start dependence:
-        for message in self.satisfied:
-            if message in drop_these:
-                continue
-            if self.start_point:
-                if message[1]:  # Cycle point.
-                    if (get_point(message[1]) < self.start_point and
-                            self.point >= self.start_point):
-                        # Drop if outside of relevant point range.
-                        drop_these.append(message)
-
-        for message in drop_these:
-            if message in self.satisfied:
-                self.satisfied.pop(message)
-
-        if '|' in expr:
-            if drop_these:
-                simpler = ConditionalSimplifier(
-                    expr, [self.MESSAGE_TEMPLATE % m for m in drop_these])
-                expr = simpler.get_cleaned()
-            # Make a Python expression so we can eval() the logic.
-            for message in self.satisfied:
-                expr = expr.replace(self.MESSAGE_TEMPLATE % message,
-                                    self.SATISFIED_TEMPLATE % message)
-            self.conditional_expression = expr
+        if condition is None:
+            condition = Condition.get_and(range(len(self.messages)))
+        if condition is not None:
+            condition = condition.simplify(self._dropped)
+        self._condition = condition
 
     def is_satisfied(self):
         """Return True if prerequisite is satisfied.
@@ -162,37 +295,12 @@ class Prerequisite(object):
         Return cached state if present, else evaluate the prerequisite.
 
         """
-        if self._all_satisfied is not None:
-            return self._all_satisfied
-        else:
-            # No cached value.
-            if not self.satisfied:
-                # No prerequisites left after pre-initial simplification.
-                return True
-            if self.conditional_expression:
-                # Trigger expression with at least one '|': use eval.
-                self._all_satisfied = self._conditional_is_satisfied()
-            else:
-                self._all_satisfied = all(self.satisfied.values())
-            return self._all_satisfied
-
-    def _conditional_is_satisfied(self):
-        """Evaluate the prerequisite's condition expression.
-
-        Does not cache the result.
-
-        """
-        try:
-            res = eval(self.conditional_expression)
-        except (SyntaxError, ValueError) as exc:
-            err_msg = str(exc)
-            if str(exc).find("unexpected EOF") != -1:
-                err_msg += ("\n(?could be unmatched parentheses in the graph "
-                            "string?)")
-            ERR.error(err_msg)
-            raise TriggerExpressionError(
-                '"%s"' % self.get_raw_conditional_expression())
-        return res
+        if self._all_satisfied is None:
+            self._all_satisfied = (
+                self._condition is None or
+                self._condition.is_satisfied(
+                    self._satisfied | self._overridden))
+        return self._all_satisfied
 
     def satisfy_me(self, all_task_outputs):
         """Evaluate pre-requisite against known outputs.
@@ -200,35 +308,39 @@ class Prerequisite(object):
         Updates cache with the evaluation result.
 
         """
-        relevant_messages = all_task_outputs & set(self.satisfied)
-        for message in relevant_messages:
-            self.satisfied[message] = self.DEP_STATE_SATISFIED
-            if self.conditional_expression is None:
-                self._all_satisfied = all(self.satisfied.values())
-            else:
-                self._all_satisfied = self._conditional_is_satisfied()
+        relevant_messages = set()
+        for i, message in enumerate(self.messages):
+            bit = 1 << i
+            if message in all_task_outputs and not self._dropped & bit:
+                relevant_messages.add(message)
+                self._satisfied |= bit
+                self._overridden &= ~bit
+        # Satisfying more messages can only change an unsatisfied state.
+        if relevant_messages and not self._all_satisfied:
+            self._all_satisfied = None
         return relevant_messages
 
     def dump(self):
         """ Return an array of strings representing each message and its state.
         """
         res = []
-        if self.conditional_expression:
-            temp = self.get_raw_conditional_expression()
+        satisfied = self.satisfied
+        temp = self.get_raw_conditional_expression()
+        if temp is not None:
             messages = []
-            num_length = int(math.ceil(float(len(self.satisfied)) / float(10)))
-            for ind, message_tuple in enumerate(sorted(self.satisfied)):
+            num_length = int(math.ceil(float(len(satisfied)) / float(10)))
+            for ind, message_tuple in enumerate(sorted(satisfied)):
                 message = self.MESSAGE_TEMPLATE % message_tuple
                 char = '%.{0}d'.format(num_length) % ind
                 messages.append(['\t%s = %s' % (char, message),
-                                 bool(self.satisfied[message_tuple])])
+                                 bool(satisfied[message_tuple])])
                 temp = temp.replace(message, char)
             temp = temp.replace('|', ' | ')
             temp = temp.replace('&', ' & ')
             res.append([temp, self.is_satisfied()])
             res.extend(messages)
-        elif self.satisfied:
-            for message, val in self.satisfied.items():
+        elif satisfied:
+            for message, val in satisfied.items():
                 res.append([self.MESSAGE_TEMPLATE % message, val])
         # (Else trigger wiped out by pre-initial simplification.)
         return res
@@ -239,13 +351,9 @@ class Prerequisite(object):
         State can be overridden by calling `self.satisfy_me`.
 
         """
-        for message in self.satisfied:
-            if not self.satisfied[message]:
-                self.satisfied[message] = self.DEP_STATE_OVERRIDDEN
-        if self.conditional_expression is None:
-            self._all_satisfied = True
-        else:
-            self._all_satisfied = self._conditional_is_satisfied()
+        self._overridden = (
+            ((1 << len(self.messages)) - 1) & ~self._satisfied)
+        self._all_satisfied = True
 
     def set_not_satisfied(self):
         """Force this prerequiste into the un-satisfied state.
@@ -253,19 +361,18 @@ class Prerequisite(object):
         State can be overridden by calling `self.satisfy_me`.
 
         """
-        for message in self.satisfied:
-            self.satisfied[message] = self.DEP_STATE_UNSATISFIED
-        if not self.satisfied:
-            self._all_satisfied = True
-        elif self.conditional_expression is None:
-            self._all_satisfied = False
-        else:
-            self._all_satisfied = self._conditional_is_satisfied()
+        self._satisfied = 0
+        self._overridden = 0
+        self._all_satisfied = self._condition is None
 
     def get_target_points(self):
         """Return a list of cycle points target by each prerequisite,
         including each component of conditionals."""
-        return [get_point(p) for p in self.target_point_strings]
+        point_strings = []
+        for _, point_string, _ in self.messages:
+            if point_string not in point_strings:
+                point_strings.append(point_string)
+        return [get_point(p) for p in point_strings]
 
     def get_resolved_dependencies(self):
         """Return a list of satisfied dependencies.
@@ -276,3 +383,142 @@ class Prerequisite(object):
         return ['%s.%s' % (name, point) for
                 (name, point, _), satisfied in self.satisfied.items() if
                 satisfied == self.DEP_STATE_SATISFIED]
+
+
+if __name__ == "__main__":
+    import unittest
+
+    from cylc.cycling.integer import IntegerPoint
+
+    class _Dependency(object):
+        """Mock conditional Dependency, with messages at point 1."""
+
+        def __init__(self, expr, names):
+            self.expr = expr
+            self.names = names
+
+        def get_messages(self, _):
+            return [(name, '1', 'succeeded') for name in self.names]
+
+        def get_expression(self, _):
+            return self.expr
+
+        @staticmethod
+        def is_conditional():
+            return True
+
+    class TestCondition(unittest.TestCase):
+        """Test Condition."""
+
+        def test_is_satisfied(self):
+            """(0 | 1) & (2 | 3 & 4)"""
+            cond = Condition.get_and([
+                Condition.get_or([0, 1]),
+                Condition.get_or([2, Condition.get_and([3, 4])])])
+            for sat_mask, expected in [
+                    (0b00000, False), (0b00101, True), (0b00110, True),
+                    (0b00011, False), (0b01001, False), (0b11001, True),
+                    (0b11000, False)]:
+                self.assertEqual(expected, cond.is_satisfied(sat_mask))
+
+        def test_get_node_flatten(self):
+            """Nodes of the same type are flattened."""
+            cond = Condition.get_or([0, Condition.get_or([1, 2]), None])
+            self.assertTrue(cond.is_or)
+            self.assertEqual(0b111, cond.mask)
+            self.assertEqual((), cond.children)
+            self.assertIsNone(Condition.get_and([]))
+            self.assertEqual(
+                0b1, Condition.get_or([Condition.get_and([0])]).mask)
+
+        def test_simplify(self):
+            """Dropped messages are removed."""
+            cond = Condition.get_or([0, Condition.get_and([1, 2])])
+            self.assertIs(cond, cond.simplify(0))
+            simple = cond.simplify(0b001)
+            self.assertFalse(simple.is_or)
+            self.assertEqual(0b110, simple.mask)
+            self.assertIs(simple, cond.simplify(0b001))  # cached
+            self.assertEqual(0b001, cond.simplify(0b110).mask)
+            self.assertIsNone(cond.simplify(0b111))
+
+    class TestPrerequisite(unittest.TestCase):
+        """Test Prerequisite."""
+
+        def test_and(self):
+            """Messages all required by default."""
+            preq = Prerequisite(IntegerPoint(1))
+            preq.add('a', IntegerPoint(1), 'succeeded')
+            preq.add('b', IntegerPoint(1), 'succeeded')
+            preq.set_condition()
+            self.assertFalse(preq.is_satisfied())
+            self.assertEqual(
+                set([('a', '1', 'succeeded')]),
+                preq.satisfy_me(set([('a', '1', 'succeeded')])))
+            self.assertFalse(preq.is_satisfied())
+            preq.satisfy_me(set([('b', '1', 'succeeded')]))
+            self.assertTrue(preq.is_satisfied())
+            self.assertEqual(['a.1', 'b.1'],
+                             sorted(preq.get_resolved_dependencies()))
+
+        def test_conditional(self):
+            """a | b & c"""
+            preq = Prerequisite(IntegerPoint(1), dependency=_Dependency(
+                'a.1 succeeded|b.1 succeeded&c.1 succeeded', ['a', 'b', 'c']))
+            preq.set_condition(
+                Condition.get_or([0, Condition.get_and([1, 2])]))
+            preq.satisfy_me(set([('b', '1', 'succeeded')]))
+            self.assertFalse(preq.is_satisfied())
+            self.assertEqual(
+                [['0 | 1 & 2', False],
+                 ['\t0 = a.1 succeeded', False],
+                 ['\t1 = b.1 succeeded', True],
+                 ['\t2 = c.1 succeeded', False]],
+                preq.dump())
+            preq.satisfy_me(set([('a', '1', 'succeeded')]))
+            self.assertTrue(preq.is_satisfied())
+
+        def test_set_satisfied(self):
+            """Force (un)satisfy."""
+            preq = Prerequisite(IntegerPoint(1))
+            preq.add('a', IntegerPoint(1), 'succeeded')
+            preq.add('b', IntegerPoint(1), 'succeeded')
+            preq.set_condition()
+            preq.satisfy_me(set([('a', '1', 'succeeded')]))
+            preq.set_satisfied()
+            self.assertTrue(preq.is_satisfied())
+            self.assertEqual(
+                {('a', '1', 'succeeded'): Prerequisite.DEP_STATE_SATISFIED,
+                 ('b', '1', 'succeeded'): Prerequisite.DEP_STATE_OVERRIDDEN},
+                preq.satisfied)
+            self.assertEqual(['a.1'], preq.get_resolved_dependencies())
+            preq.set_not_satisfied()
+            self.assertFalse(preq.is_satisfied())
+
+        def test_pre_initial(self):
+            """Pre-initial messages are dropped."""
+            preq = Prerequisite(IntegerPoint(1), IntegerPoint(1))
+            preq.add('a', IntegerPoint(0), 'succeeded')
+            preq.add('b', IntegerPoint(1), 'succeeded', pre_initial=True)
+            preq.set_condition()
+            self.assertTrue(preq.is_satisfied())
+            self.assertEqual({}, preq.satisfied)
+            self.assertEqual([], preq.dump())
+            self.assertEqual(set(), preq.satisfy_me(
+                set([('a', '0', 'succeeded')])))
+
+        def test_pre_initial_conditional(self):
+            """a | b, with a dropped."""
+            preq = Prerequisite(
+                IntegerPoint(1), IntegerPoint(1),
+                _Dependency('a.1 succeeded|b.1 succeeded', ['a', 'b']))
+            preq.drop_pre_initial(0, IntegerPoint(0))
+            preq.drop_pre_initial(1, IntegerPoint(1))
+            preq.set_condition(Condition.get_or([0, 1]))
+            self.assertEqual('(b.1 succeeded)',
+                             preq.get_raw_conditional_expression())
+            self.assertFalse(preq.is_satisfied())
+            preq.satisfy_me(set([('b', '1', 'succeeded')]))
+            self.assertTrue(preq.is_satisfied())
+
+    unittest.main()
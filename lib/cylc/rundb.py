@@ -18,6 +18,7 @@
 """Provide data access object for the suite runtime database."""
 
 import json
+import os
 import sqlite3
 import sys
 import traceback
@@ -318,16 +319,23 @@ class CylcSuiteDAO(object):
         ],
     }
 
-    def __init__(self, db_file_name=None, is_public=False):
+    def __init__(self, db_file_name=None, is_public=False,
+                 is_persistent=False):
         """Initialise object.
 
         db_file_name - Path to the database file
         is_public - If True, allow retries, etc
+        is_persistent - If True, keep the connection open between calls to
+                        "execute_queued_items", and (for the private database)
+                        use the write-ahead log journal mode
 
         """
         self.db_file_name = db_file_name
         self.is_public = is_public
+        self.is_persistent = is_persistent
         self.conn = None
+        # (device, inode) of the database file of a persistent connection
+        self.conn_file_id = None
         self.n_tries = 0
 
         self.tables = {}
@@ -372,18 +380,81 @@ class CylcSuiteDAO(object):
     def close(self):
         """Explicitly close the connection."""
         if self.conn is not None:
+            try:
+                if self.is_persistent and not self.is_public:
+                    # Checkpoint the write-ahead log into the database file,
+                    # and leave it in the default journal mode for other
+                    # readers.
+                    self.conn.execute("PRAGMA journal_mode=DELETE")
+            except sqlite3.Error:
+                pass
             try:
                 self.conn.close()
             except sqlite3.Error:
                 pass
             self.conn = None
+            self.conn_file_id = None
 
     def connect(self):
         """Connect to the database."""
         if self.conn is None:
             self.conn = sqlite3.connect(self.db_file_name, self.CONN_TIMEOUT)
+            if self.is_persistent:
+                self._setup_persistent_conn()
         return self.conn
 
+    def _setup_persistent_conn(self):
+        """Helper for "self.connect".
+
+        Tune a persistent connection, and remember the identity of its
+        database file for "self.is_conn_alive". The private database uses the
+        write-ahead log journal mode, so commits do not rewrite the database
+        file or sync a rollback journal. The public database is read by other
+        processes (possibly on other hosts), so it stays in the default
+        rollback journal mode - which is reset in case the file is a copy of
+        the private database.
+        """
+        try:
+            if self.is_public:
+                self.conn.execute("PRAGMA journal_mode=DELETE")
+            else:
+                self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error:
+            if not self.is_public:
+                raise
+        try:
+            stat = os.stat(self.db_file_name)
+        except OSError:
+            self.conn_file_id = None
+        else:
+            self.conn_file_id = (stat.st_dev, stat.st_ino)
+
+    def is_conn_alive(self):
+        """Return True if the database file of the connection still exists.
+
+        A persistent connection keeps working after its database file is
+        removed (e.g. with the suite run directory), or replaced. This check
+        allows the connection to be closed, so a reconnection will either fail
+        or write to the new file.
+        """
+        if self.conn is None:
+            return False
+        try:
+            stat = os.stat(self.db_file_name)
+        except OSError:
+            return False
+        return (stat.st_dev, stat.st_ino) == self.conn_file_id
+
+    def checkpoint_wal(self):
+        """Checkpoint the write-ahead log of a persistent connection.
+
+        Ensure that the database file itself is up to date, e.g. before it is
+        copied.
+        """
+        if self.conn is not None and self.is_persistent:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     def create_tables(self):
         """Create tables."""
         names = []
@@ -400,6 +471,11 @@ class CylcSuiteDAO(object):
 
     def execute_queued_items(self):
         """Execute queued items for each table."""
+        if (self.is_persistent and self.conn is not None and
+                not self.is_conn_alive()):
+            # E.g. the suite run directory is removed, a forced reconnection
+            # to the private database will ensure that the suite dies.
+            self.close()
         try:
             for table in self.tables.values():
                 # DELETE statements may have varying number of WHERE args so we
@@ -432,6 +508,9 @@ class CylcSuiteDAO(object):
                     self.conn.rollback()
                 except sqlite3.Error:
                     pass
+            if self.is_persistent:
+                # Reconnect on the next attempt.
+                self.close()
             return
         else:
             # Clear the queues
@@ -448,8 +527,10 @@ class CylcSuiteDAO(object):
         finally:
             # Note: This is not strictly necessary. However, if the suite run
             # directory is removed, a forced reconnection to the private
-            # database will ensure that the suite dies.
-            self.close()
+            # database will ensure that the suite dies. (A persistent
+            # connection is checked on the next call instead.)
+            if not self.is_persistent:
+                self.close()
 
     def _execute_stmt(self, stmt, stmt_args_list):
         """Helper for "self.execute_queued_items".
@@ -204,7 +204,8 @@ class Scheduler(object):
 
         self.suite_db_mgr = SuiteDatabaseManager(
             self.suite_srv_files_mgr.get_suite_srv_dir(self.suite),  # pri_d
-            os.path.join(self.suite_run_dir, 'log'))                 # pub_d
+            os.path.join(self.suite_run_dir, 'log'),                 # pub_d
+            glbl_cfg().get(['cylc', 'database persistent connection']))
         self.broadcast_mgr = BroadcastMgr(self.suite_db_mgr)
         self.xtrigger_mgr = XtriggerManager(
             self.suite, self.owner, self.broadcast_mgr, self.suite_run_dir,
@@ -337,6 +338,7 @@ conditions; see `cylc conditions`.
             # copied to the public database.
             pri_dao.take_checkpoints("restart")
             pri_dao.execute_queued_items()
+            pri_dao.close()
         else:
             self.configure_contact()
 
@@ -448,22 +450,33 @@ conditions; see `cylc conditions`.
                 continue
 
     def load_tasks_for_restart(self):
-        """Load tasks for restart."""
+        """Load tasks for restart.
+
+        Log the time taken by each phase of the load.
+        """
+        phase_times = [(None, time())]
         self.suite_db_mgr.pri_dao.select_suite_params(
             self._load_suite_params_2, self.options.checkpoint)
         if self.cli_start_point_string:
             self.start_point = self.cli_start_point_string
+        phase_times.append(('suite parameters', time()))
         self.suite_db_mgr.pri_dao.select_broadcast_states(
             self.broadcast_mgr.load_db_broadcast_states,
             self.options.checkpoint)
+        phase_times.append(('broadcast states', time()))
         self.suite_db_mgr.pri_dao.select_task_job_run_times(
             self._load_task_run_times)
+        phase_times.append(('task run times', time()))
         self.suite_db_mgr.pri_dao.select_task_pool_for_restart(
             self.pool.load_db_task_pool_for_restart, self.options.checkpoint)
+        phase_times.append((
+            'task proxies (%d)' % len(self.pool.get_rh_tasks()), time()))
         self.suite_db_mgr.pri_dao.select_task_action_timers(
             self.pool.load_db_task_action_timers)
+        phase_times.append(('task action timers', time()))
         self.suite_db_mgr.pri_dao.select_xtriggers_for_restart(
             self.xtrigger_mgr.load_xtrigger_for_restart)
+        phase_times.append(('xtriggers', time()))
 
         # Re-initialise run directory for user@host for each submitted and
         # running tasks.
@@ -478,10 +491,18 @@ conditions; see `cylc conditions`.
                         host, owner) is not None:
                     auths.remove((host, owner))
             if auths:
-                sleep(1.0)
+                self.proc_pool.sleep(1.0)
                 # Remote init is done via process pool
                 self.proc_pool.process()
+        phase_times.append(('remote init', time()))
         self.command_poll_tasks()
+        phase_times.append(('job polls', time()))
+        LOG.info('LOADED in %.1fs: %s' % (
+            phase_times[-1][1] - phase_times[0][1],
+            ', '.join(
+                '%s %.1fs' % (label, phase_time - prev_phase_time)
+                for (_, prev_phase_time), (label, phase_time) in zip(
+                    phase_times, phase_times[1:]))))
 
     def _load_suite_params_2(self, row_idx, row):
         """Load previous initial/final cycle point."""
@@ -540,13 +561,15 @@ conditions; see `cylc conditions`.
     def process_queued_task_messages(self):
         """Handle incoming task messages for each task proxy."""
         messages = {}
+        # Each item in the queue is a list of messages queued in one go
+        queued_items = []
         while self.message_queue.qsize():
             try:
-                task_job, event_time, severity, message = (
-                    self.message_queue.get(block=False))
+                queued_items.extend(self.message_queue.get(block=False))
             except Empty:
                 break
             self.message_queue.task_done()
+        for task_job, event_time, severity, message in queued_items:
             if '/' in task_job:  # cycle/task-name/submit-num
                 cycle, task_name, submit_num = task_job.split('/', 2)
                 task_id = TaskID.get(task_name, cycle)
@@ -554,16 +577,21 @@ conditions; see `cylc conditions`.
             else:  # back compat: task-name.cycle
                 task_id = task_job
                 submit_num = None
-            messages.setdefault(task_id, [])
-            messages[task_id].append(
-                (submit_num, event_time, severity, message))
+            message_items = messages.setdefault(task_id, [])
+            # Coalesce repeats of a job status message in this batch, e.g.
+            # from retries by the job, to process it only once.
+            if (message in self.task_events_mgr.JOB_STATUS_MESSAGES and
+                    any(item[0] == submit_num and item[3] == message
+                        for item in message_items)):
+                continue
+            message_items.append((submit_num, event_time, severity, message))
         # Note on to_poll_tasks: If an incoming message is going to cause a
         # reverse change to task state, it is desirable to confirm this by
         # polling.
         to_poll_tasks = []
-        for itask in self.pool.get_tasks():
-            message_items = messages.get(itask.identity)
-            if message_items is None:
+        for task_id, message_items in messages.items():
+            itask = self.pool.get_task_by_id(task_id, incl_runahead=False)
+            if itask is None:
                 continue
             should_poll = False
             for submit_num, event_time, severity, message in message_items:
@@ -676,22 +704,31 @@ conditions; see `cylc conditions`.
                 results[name] = {}
         return results
 
-    def info_get_latest_state(self, client_info, full_mode):
+    def info_get_latest_state(self, client_info, full_mode, revision=None):
         """Return latest suite state (suitable for a GUI update).
 
         If previous update time is set, return only information since previous
         update time. Otherwise, return full information required to populate
         the GUI tree and LED views.
 
+        If revision is set, return the summary revision, and return changes
+        to the summary since the given revision, if possible, instead of the
+        whole summary.
+
         Args:
             client_info (dict): store 'prev_time', 'prev_err_size'.
             full_mode (bool): force full update
+            revision (int): summary revision last seen by client, or None
 
         Return:
             (dict):
                 cylc_version (str): version of cylc running this suite
                 full_mode (bool): is this returning a full update?
                 summary (tuple): (global_summary, task_summary, family_summary)
+                summary_delta (dict):
+                    changes to summary since revision, see
+                    StateSummaryMgr.get_state_summary_delta
+                revision (int): summary revision, if revision is set
                 ancestors (dict): first parent ancestors
                 ancestors_pruned (dict):
                     first parent ancestors, without non-task namespaces
@@ -711,11 +748,25 @@ conditions; see `cylc conditions`.
         if full_mode:
             client_info['prev_time'] = None
             client_info['prev_err_size'] = None
+        # Changes to the summary only depend on the client's revision.
+        summary_full_mode = full_mode
         prev_time = client_info.get('prev_time')
         if prev_time is None:
             full_mode = True
             ret['full_mode'] = True
-        if full_mode or (
+        if revision is not None:
+            delta = None
+            if not summary_full_mode:
+                delta = self.state_summary_mgr.get_state_summary_delta(
+                    revision)
+            if delta is None:
+                ret['revision'], ret['summary'] = (
+                    self.state_summary_mgr.get_revision_state_summary())
+            else:
+                ret['revision'] = delta['revision']
+                if delta['revision'] != revision:
+                    ret['summary_delta'] = delta
+        elif full_mode or (
                 self.state_summary_mgr.update_time and
                 prev_time < self.state_summary_mgr.update_time):
             ret['summary'] = self.state_summary_mgr.get_state_summary()
@@ -846,6 +897,7 @@ conditions; see `cylc conditions`.
             for itask in itasks:
                 if itask.state.status in TASK_STATUSES_ACTIVE:
                     itask.state.reset_state(TASK_STATUS_FAILED)
+                    self.task_events_mgr.dep_broker.put_outputs(itask)
             return len(bad_items)
         self.task_job_mgr.kill_task_jobs(self.suite, itasks)
         return len(bad_items)
@@ -981,6 +1033,8 @@ conditions; see `cylc conditions`.
             mgr.KEY_SUITE_RUN_DIR_ON_SUITE_HOST: self.suite_run_dir,
             mgr.KEY_TASK_MSG_MAX_TRIES: str(glbl_cfg().get(
                 ['task messaging', 'maximum number of tries'])),
+            mgr.KEY_TASK_MSG_RELAY: str(glbl_cfg().get(
+                ['task messaging', 'relay'])),
             mgr.KEY_TASK_MSG_RETRY_INTVL: str(float(glbl_cfg().get(
                 ['task messaging', 'retry interval']))),
             mgr.KEY_TASK_MSG_TIMEOUT: str(float(glbl_cfg().get(
@@ -1277,7 +1331,7 @@ conditions; see `cylc conditions`.
             self.check_suite_inactive()
         # check submission and execution timeout and polling timers
         if self.run_mode != 'simulation':
-            self.task_job_mgr.check_task_jobs(self.suite, self.pool)
+            self.task_job_mgr.check_task_jobs(self.suite)
 
     def suite_shutdown(self):
         """Determines if the suite can be shutdown yet."""
@@ -1315,7 +1369,8 @@ conditions; see `cylc conditions`.
                     "Waiting for the command process pool to empty" +
                     " for shutdown")
                 while self.proc_pool.is_not_done():
-                    sleep(self.INTERVAL_STOP_PROCESS_POOL_EMPTY)
+                    self.proc_pool.sleep(
+                        self.INTERVAL_STOP_PROCESS_POOL_EMPTY)
                     if stop_process_pool_empty_msg:
                         LOG.info(stop_process_pool_empty_msg)
                         stop_process_pool_empty_msg = None
@@ -1432,6 +1487,7 @@ conditions; see `cylc conditions`.
 
             # Sleep a bit for things to catch up.
             # Quick sleep if there are items pending in process pool.
+            # The process pool wakes up early when a command exits.
             # (Should probably use quick sleep logic for other queues?)
             elapsed = time() - tinit
             quick_mode = self.proc_pool.is_not_done()
@@ -1441,13 +1497,26 @@ conditions; see `cylc conditions`.
                 # Still yield control to other threads by sleep(0.0)
                 sleep(0.0)
             elif quick_mode:
-                sleep(self.INTERVAL_MAIN_LOOP_QUICK - elapsed)
+                self.proc_pool.sleep(self.get_main_loop_sleep(
+                    self.INTERVAL_MAIN_LOOP_QUICK - elapsed))
             else:
-                sleep(self.INTERVAL_MAIN_LOOP - elapsed)
+                self.proc_pool.sleep(self.get_main_loop_sleep(
+                    self.INTERVAL_MAIN_LOOP - elapsed))
             # Record latest main loop interval
             self.main_loop_intervals.append(time() - tinit)
             # END MAIN LOOP
 
+    def get_main_loop_sleep(self, interval):
+        """Return time to sleep, up to interval, before the next loop.
+
+        Wake up earlier if a task timer is due before the end of interval.
+        """
+        now = time()
+        next_time = self.task_events_mgr.get_next_timer_time()
+        if next_time is not None and now < next_time < now + interval:
+            return next_time - now
+        return interval
+
     def update_state_summary(self):
         """Update state summary, e.g. for GUI."""
         self.state_summary_mgr.update(self)
@@ -1519,10 +1588,8 @@ conditions; see `cylc conditions`.
             self.xtrigger_mgr.pflag = False  # reset
         # Old-style external triggers.
         self.broadcast_mgr.add_ext_triggers(self.ext_trigger_queue)
-        for itask in self.pool.get_tasks():
-            if (itask.state.external_triggers and
-                    self.broadcast_mgr.match_ext_trigger(itask)):
-                process = True
+        if self.pool.match_ext_triggers(self.broadcast_mgr):
+            process = True
 
         if self.task_events_mgr.pflag:
             # This flag is turned on by commands that change task state
@@ -1534,18 +1601,9 @@ conditions; see `cylc conditions`.
             process = True
             self.task_job_mgr.task_remote_mgr.ready = False  # reset
 
-        broadcast_mgr = self.task_events_mgr.broadcast_mgr
-        broadcast_mgr.add_ext_triggers(self.ext_trigger_queue)
-        now = time()
-        for itask in self.pool.get_tasks():
-            # External trigger matching and task expiry must be done
-            # regardless, so they need to be in separate "if ..." blocks.
-            if broadcast_mgr.match_ext_trigger(itask):
-                process = True
-            if self.pool.set_expired_task(itask, now):
-                process = True
-            if itask.is_ready(now):
-                process = True
+        # Only tasks that may have changed since the last check.
+        if self.pool.check_ready_tasks(time()):
+            process = True
         if self.run_mode == 'simulation' and self.pool.sim_time_check(
                 self.message_queue):
             process = True
@@ -1587,7 +1645,7 @@ conditions; see `cylc conditions`.
             self.pool.warn_stop_orphans()
             try:
                 self.suite_db_mgr.put_task_event_timers(self.task_events_mgr)
-                self.suite_db_mgr.put_task_pool(self.pool)
+                self.suite_db_mgr.put_task_pool(self.pool, is_snapshot=True)
             except Exception as exc:
                 ERR.error(str(exc))
 
@@ -1700,7 +1758,7 @@ conditions; see `cylc conditions`.
                 return n_warnings + 1
             else:
                 self.proc_pool.process()
-                sleep(self.INTERVAL_MAIN_LOOP_QUICK)
+                self.proc_pool.sleep(self.INTERVAL_MAIN_LOOP_QUICK)
 
     def command_reset_task_states(self, items, state=None, outputs=None):
         """Reset the state of tasks."""
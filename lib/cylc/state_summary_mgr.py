@@ -17,6 +17,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Manage suite state summary for client, e.g. GUI."""
 
+from collections import deque
 from time import time
 
 import cylc.flags
@@ -31,8 +32,27 @@ from cylc.task_state_prop import extract_group_state
 
 
 class StateSummaryMgr(object):
-    """Manage suite state summary for client, e.g. GUI."""
-
+    """Manage suite state summary for client, e.g. GUI.
+
+    The summary is updated incrementally. Only task proxies with a changed
+    state summary since the last update (or added to or removed from the
+    pool) are applied, and family states are only recomputed for the first
+    parent ancestors of these tasks, at their cycle points.
+
+    The IDs of tasks and families changed in each of the last
+    MAX_DELTA_REVISIONS revisions are kept, so clients can be sent only the
+    changes since the revision they last saw.
+
+    Attributes:
+        .revision (int):
+            Incremented on each update with any change to the summary. It
+            starts from the time in milliseconds, so a revision from a
+            previous run of the suite is never mistaken for a current one.
+        .update_time (float):
+            Time (seconds since epoch) of the latest update with changes.
+    """
+
+    MAX_DELTA_REVISIONS = 100
     TIME_FIELDS = ['submitted_time', 'started_time', 'finished_time']
 
     def __init__(self):
@@ -40,75 +60,162 @@ class StateSummaryMgr(object):
         self.global_summary = {}
         self.family_summary = {}
         self.update_time = None
+        self.revision = int(time() * 1000)
         self.state_count_totals = {}
         self.state_count_cycles = {}
+        # Working copies of the above, updated in place.
+        self._config = None
+        self._task_summary = {}
+        self._family_summary = {}
+        self._state_count_totals = {}
+        self._state_count_cycles = {}
+        # {point_string: {family: {state: count}}}
+        self._fam_state_counts = {}
+        self._suite_urls = {}
+        # (revision, task IDs, family IDs) of changes in recent revisions,
+        # and the oldest revision changes can be computed from.
+        self._deltas = deque(maxlen=self.MAX_DELTA_REVISIONS)
+        self._delta_base = self.revision
+        # (revision, delta base, deltas, global, task, family summary),
+        # published together for access from other threads.
+        self._revision_summary = (self.revision, self.revision, (), {}, {}, {})
 
     def update(self, schd):
-        """Update."""
-        self.update_time = time()
+        """Update summary from the task pool, and return the revision."""
+        is_reset = schd.config is not self._config
+        if is_reset:
+            # New or reloaded suite configuration, start again.
+            self._reset(schd.config)
+        changed_fams = set()
+        changed_ids = set()
+        task_summary = self._task_summary
+        ancestors_dict = self._config.get_first_parent_ancestors()
+        ids = set()
+        for itask, state in self._get_tasks_iter(schd):
+            ids.add(itask.identity)
+            ts = self._get_task_summary_copy(itask, state)
+            prev_ts = task_summary.get(itask.identity)
+            if ts == prev_ts:
+                continue
+            changed_ids.add(itask.identity)
+            task_summary[itask.identity] = ts
+            prev_state = None
+            if prev_ts is not None:
+                prev_state = prev_ts['state']
+            if state != prev_state:
+                self._put_state_count(
+                    ancestors_dict, ts['name'], ts['label'], prev_state,
+                    state, changed_fams)
+        for id_ in set(task_summary) - ids:
+            changed_ids.add(id_)
+            ts = task_summary.pop(id_)
+            self._put_state_count(
+                ancestors_dict, ts['name'], ts['label'], ts['state'], None,
+                changed_fams)
+        changed_f_ids = set()
+        for fam, point_string in changed_fams:
+            if self._update_family(fam, point_string):
+                changed_f_ids.add(TaskID.get(fam, point_string))
+
+        global_summary = self._get_global_summary(schd)
+        prev_global_summary = dict(self.global_summary)
+        prev_global_summary.pop('last_updated', None)
+        if is_reset or changed_ids or changed_f_ids or (
+                global_summary != prev_global_summary):
+            self.revision += 1
+            self.update_time = time()
+            if len(self._deltas) == self._deltas.maxlen:
+                # Oldest revision is about to drop off
+                self._delta_base = self._deltas[0][0]
+            self._deltas.append((self.revision, changed_ids, changed_f_ids))
+        global_summary['last_updated'] = self.update_time
+        # Replace the originals (atomic update, for access from other threads).
+        self.task_summary = dict(task_summary)
+        self.global_summary = global_summary
+        self.family_summary = dict(self._family_summary)
+        self.state_count_totals = dict(self._state_count_totals)
+        self.state_count_cycles = dict(
+            (point_string, dict(count))
+            for point_string, count in self._state_count_cycles.items())
+        self._revision_summary = (
+            self.revision, self._delta_base, tuple(self._deltas),
+            self.global_summary, self.task_summary, self.family_summary)
+        return self.revision
+
+    def _reset(self, config):
+        """Reset working copies of summary for a new suite configuration."""
+        self._config = config
+        # Changes before this cannot be computed from the working copies.
+        self._deltas.clear()
+        self._delta_base = self.revision + 1
+        self._task_summary.clear()
+        self._family_summary.clear()
+        self._state_count_totals.clear()
+        self._state_count_cycles.clear()
+        self._fam_state_counts.clear()
+        # Extract suite and task URLs from config.
+        self._suite_urls = dict(
+            (i, j['meta']['URL']) for (i, j) in config.cfg['runtime'].items())
+        self._suite_urls['suite'] = config.cfg['meta']['URL']
+
+    def _put_state_count(
+            self, ancestors_dict, name, point_string, prev_state, state,
+            changed_fams):
+        """Move a task from prev_state to state in the state counts.
+
+        A None state means the task is not (or no longer) in the pool.
+        Families of the task at point_string are added to changed_fams.
+        """
+        cycle_counts = self._state_count_cycles.setdefault(point_string, {})
+        fam_counts = self._fam_state_counts.setdefault(point_string, {})
+        counts_list = [cycle_counts, self._state_count_totals]
+        for fam in ancestors_dict.get(name, []):
+            if fam == name:
+                continue
+            counts_list.append(fam_counts.setdefault(fam, {}))
+            changed_fams.add((fam, point_string))
+        for counts in counts_list:
+            if prev_state is not None:
+                counts[prev_state] -= 1
+                if not counts[prev_state]:
+                    del counts[prev_state]
+            if state is not None:
+                counts.setdefault(state, 0)
+                counts[state] += 1
+        if not cycle_counts:
+            del self._state_count_cycles[point_string]
+
+    def _update_family(self, fam, point_string):
+        """Recompute the summary of a family at a cycle point.
+
+        Return True if the family summary has changed.
+        """
+        f_id = TaskID.get(fam, point_string)
+        fam_counts = self._fam_state_counts[point_string]
+        state = extract_group_state(fam_counts[fam])
+        if not fam_counts[fam]:
+            del fam_counts[fam]
+            if not fam_counts:
+                del self._fam_state_counts[point_string]
+        if state is None:
+            return self._family_summary.pop(f_id, None) is not None
+        prev_fs = self._family_summary.get(f_id)
+        if prev_fs is not None and prev_fs['state'] == state:
+            return False
+        try:
+            famcfg = self._config.cfg['runtime'][fam]['meta']
+        except KeyError:
+            famcfg = {}
+        self._family_summary[f_id] = {'name': fam,
+                                      'description': famcfg.get('description'),
+                                      'title': famcfg.get('title'),
+                                      'label': point_string,
+                                      'state': state}
+        return True
+
+    def _get_global_summary(self, schd):
+        """Return the global summary, without the last update time."""
         global_summary = {}
-        family_summary = {}
-
-        task_summary, task_states = self._get_tasks_info(schd)
-
-        all_states = []
-        ancestors_dict = schd.config.get_first_parent_ancestors()
-
-        # Compute state_counts (total, and per cycle).
-        state_count_totals = {}
-        state_count_cycles = {}
-
-        for point_string, c_task_states in task_states.items():
-            # For each cycle point, construct a family state tree
-            # based on the first-parent single-inheritance tree
-
-            c_fam_task_states = {}
-
-            count = {}
-
-            for key in c_task_states:
-                state = c_task_states[key]
-                if state is None:
-                    continue
-                try:
-                    count[state] += 1
-                except KeyError:
-                    count[state] = 1
-
-                all_states.append(state)
-                for parent in ancestors_dict.get(key, []):
-                    if parent == key:
-                        continue
-                    c_fam_task_states.setdefault(parent, set([]))
-                    c_fam_task_states[parent].add(state)
-
-            state_count_cycles[point_string] = count
-
-            for fam, child_states in c_fam_task_states.items():
-                f_id = TaskID.get(fam, point_string)
-                state = extract_group_state(child_states)
-                if state is None:
-                    continue
-                try:
-                    famcfg = schd.config.cfg['runtime'][fam]['meta']
-                except KeyError:
-                    famcfg = {}
-                description = famcfg.get('description')
-                title = famcfg.get('title')
-                family_summary[f_id] = {'name': fam,
-                                        'description': description,
-                                        'title': title,
-                                        'label': point_string,
-                                        'state': state}
-
-        state_count_totals = {}
-        for point_string, count in state_count_cycles.items():
-            for state, state_count in count.items():
-                state_count_totals.setdefault(state, 0)
-                state_count_totals[state] += state_count
-
-        all_states.sort()
-
         for key, value in (
                 ('oldest cycle point string', schd.pool.get_min_point()),
                 ('newest cycle point string', schd.pool.get_max_point()),
@@ -122,18 +229,16 @@ class StateSummaryMgr(object):
             global_summary['time zone info'] = TIME_ZONE_UTC_INFO
         else:
             global_summary['time zone info'] = TIME_ZONE_LOCAL_INFO
-        global_summary['last_updated'] = self.update_time
         global_summary['run_mode'] = schd.run_mode
+        all_states = []
+        for state, count in sorted(self._state_count_totals.items()):
+            all_states.extend([state] * count)
         global_summary['states'] = all_states
         global_summary['namespace definition order'] = (
-            schd.config.ns_defn_order)
+            self._config.ns_defn_order)
         global_summary['reloading'] = schd.pool.do_reload
-        global_summary['state totals'] = state_count_totals
-        # Extract suite and task URLs from config.
-        global_summary['suite_urls'] = dict(
-            (i, j['meta']['URL'])
-            for (i, j) in schd.config.cfg['runtime'].items())
-        global_summary['suite_urls']['suite'] = schd.config.cfg['meta']['URL']
+        global_summary['state totals'] = dict(self._state_count_totals)
+        global_summary['suite_urls'] = self._suite_urls
 
         # Construct a suite status string for use by monitoring clients.
         if schd.pool.is_held:
@@ -157,42 +262,81 @@ class StateSummaryMgr(object):
                 SUITE_STATUS_RUNNING_TO_STOP % schd.final_point)
         else:
             global_summary['status_string'] = SUITE_STATUS_RUNNING
-
-        # Replace the originals (atomic update, for access from other threads).
-        self.task_summary = task_summary
-        self.global_summary = global_summary
-        self.family_summary = family_summary
-        self.state_count_totals = state_count_totals
-        self.state_count_cycles = state_count_cycles
+        return global_summary
 
     @staticmethod
-    def _get_tasks_info(schd):
-        """Retrieve task summary info and states."""
+    def _get_tasks_iter(schd):
+        """Yield (itask, state) for each task in the pool and runahead pool.
+        """
+        for itask in schd.pool.get_tasks():
+            yield itask, itask.state.status
+        for itask in schd.pool.get_rh_tasks():
+            yield itask, TASK_STATUS_RUNAHEAD
 
-        task_summary = {}
-        task_states = {}
-
-        for task in schd.pool.get_tasks():
-            ts = task.get_state_summary()
-            task_summary[task.identity] = ts
-            name, point_string = TaskID.split(task.identity)
-            task_states.setdefault(point_string, {})
-            task_states[point_string][name] = ts['state']
-
-        for task in schd.pool.get_rh_tasks():
-            ts = task.get_state_summary()
-            ts['state'] = TASK_STATUS_RUNAHEAD
-            task_summary[task.identity] = ts
-            name, point_string = TaskID.split(task.identity)
-            task_states.setdefault(point_string, {})
-            task_states[point_string][name] = ts['state']
-
-        return task_summary, task_states
+    @staticmethod
+    def _get_task_summary_copy(itask, state):
+        """Return a copy of the state summary of a task proxy.
+
+        The copy can be compared with, and will not be changed with, the
+        summary of a later update.
+        """
+        ts = dict(itask.get_state_summary())
+        ts['state'] = state
+        ts['job_hosts'] = dict(ts['job_hosts'])
+        ts['logfiles'] = list(ts['logfiles'])
+        return ts
 
     def get_state_summary(self):
         """Return the global, task, and family summary data structures."""
         return (self.global_summary, self.task_summary, self.family_summary)
 
+    def get_revision_state_summary(self):
+        """Return (revision, (global, task, family summary))."""
+        revision, _, _, global_summary, task_summary, family_summary = (
+            self._revision_summary)
+        return revision, (global_summary, task_summary, family_summary)
+
+    def get_state_summary_delta(self, revision):
+        """Return changes to the summary since revision.
+
+        Return None if the changes are not available, e.g. if revision is too
+        old, or is from before a reload. Otherwise return a dict containing:
+            revision (int): the current revision
+            global (dict): the global summary
+            tasks (dict): summaries of added or changed tasks
+            families (dict): summaries of added or changed families
+            removed_tasks (list): IDs of removed tasks
+            removed_families (list): IDs of removed families
+        (Removed IDs may include tasks and families added and removed since
+        revision.)
+        """
+        (cur_revision, delta_base, deltas, global_summary, task_summary,
+         family_summary) = self._revision_summary
+        if revision < delta_base or revision > cur_revision:
+            return None
+        ret = {
+            'revision': cur_revision,
+            'global': global_summary,
+            'tasks': {},
+            'families': {},
+            'removed_tasks': [],
+            'removed_families': []}
+        task_ids = set()
+        f_ids = set()
+        for delta_revision, delta_task_ids, delta_f_ids in deltas:
+            if delta_revision > revision:
+                task_ids.update(delta_task_ids)
+                f_ids.update(delta_f_ids)
+        for items, summary, key, removed_key in [
+                (task_ids, task_summary, 'tasks', 'removed_tasks'),
+                (f_ids, family_summary, 'families', 'removed_families')]:
+            for id_ in items:
+                try:
+                    ret[key][id_] = summary[id_]
+                except KeyError:
+                    ret[removed_key].append(id_)
+        return ret
+
     def get_state_totals(self):
         """Return dict of count per state and dict of state count per cycle."""
         return (self.state_count_totals, self.state_count_cycles)
@@ -30,6 +30,7 @@ import json
 from shutil import copy, rmtree
 from subprocess import call
 from tempfile import mkstemp
+from time import time
 
 from cylc.broadcast_report import get_broadcast_change_iter
 import cylc.flags
@@ -55,7 +56,11 @@ class SuiteDatabaseManager(object):
     TABLE_TASK_TIMEOUT_TIMERS = CylcSuiteDAO.TABLE_TASK_TIMEOUT_TIMERS
     TABLE_XTRIGGERS = CylcSuiteDAO.TABLE_XTRIGGERS
 
-    def __init__(self, pri_d=None, pub_d=None):
+    # Interval (seconds) between full rewrites of the task_pool table
+    TASK_POOL_SNAPSHOT_INTERVAL = 600.0
+
+    def __init__(self, pri_d=None, pub_d=None, is_persistent=False):
+        self.is_persistent = is_persistent
         self.pri_path = None
         if pri_d:
             self.pri_path = os.path.join(pri_d, CylcSuiteDAO.DB_FILE_BASE_NAME)
@@ -86,6 +91,10 @@ class SuiteDatabaseManager(object):
             self.TABLE_TASK_TIMEOUT_TIMERS: [],
             self.TABLE_XTRIGGERS: []}
         self.db_updates_map = {}
+        # Last written task pool rows:
+        # {(cycle, name): (task_pool row, timeout, {ctx_key: timer row})}
+        self.task_pool_rows = {}
+        self.task_pool_snapshot_time = None
 
     def checkpoint(self, name):
         """Checkpoint the task pool, etc."""
@@ -98,6 +107,7 @@ class SuiteDatabaseManager(object):
 
         """
         temp_pub_db_file_name = None
+        self.pri_dao.checkpoint_wal()
         self.pub_dao.close()
         try:
             self.pub_dao.conn = None  # reset connection
@@ -116,7 +126,7 @@ class SuiteDatabaseManager(object):
 
     def get_pri_dao(self):
         """Return the primary DAO."""
-        return CylcSuiteDAO(self.pri_path)
+        return CylcSuiteDAO(self.pri_path, is_persistent=self.is_persistent)
 
     @staticmethod
     def _namedtuple2json(obj):
@@ -148,7 +158,8 @@ class SuiteDatabaseManager(object):
                 rmtree(self.pri_path, ignore_errors=True)
         self.pri_dao = self.get_pri_dao()
         os.chmod(self.pri_path, 0600)
-        self.pub_dao = CylcSuiteDAO(self.pub_path, is_public=True)
+        self.pub_dao = CylcSuiteDAO(
+            self.pub_path, is_public=True, is_persistent=self.is_persistent)
         self.copy_pri_to_pub()
         pub_db_path_symlink = os.path.join(
             os.path.dirname(os.path.dirname(self.pub_path)),
@@ -323,52 +334,76 @@ class SuiteDatabaseManager(object):
                 "signature": sig,
                 "results": json.dumps(res)})
 
-    def put_task_pool(self, pool):
+    def put_task_pool(self, pool, is_snapshot=False):
         """Put statements to update the task_pool table in runtime database.
 
-        Update the task_pool table and the task_action_timers table.
-        Queue delete (everything) statements to wipe the tables, and queue the
-        relevant insert statements for the current tasks in the pool.
+        Update the task_pool table, the task_timeout_timers table and the task
+        rows of the task_action_timers table. Only rows of tasks that have
+        changed since the last call are inserted (or replaced), and rows of
+        tasks that have left the pool are deleted.
+
+        If is_snapshot is True, or TASK_POOL_SNAPSHOT_INTERVAL has passed
+        since the last snapshot, queue delete (everything) statements to wipe
+        the tables, and queue insert statements for all the current tasks in
+        the pool.
         """
-        self.db_deletes_map[self.TABLE_TASK_POOL].append({})
-        # No need to do:
-        # self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append({})
-        # Should already be done by self.put_task_event_timers above.
-        self.db_deletes_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({})
+        now = time()
+        if (self.task_pool_snapshot_time is None or
+                now > (self.task_pool_snapshot_time +
+                       self.TASK_POOL_SNAPSHOT_INTERVAL) or
+                self.db_deletes_map[self.TABLE_TASK_POOL] or
+                self.db_inserts_map[self.TABLE_TASK_POOL]):
+            # (Statements from the last call not yet executed - a snapshot
+            # ensures that they cannot be applied in the wrong order.)
+            is_snapshot = True
+        if is_snapshot:
+            self.task_pool_snapshot_time = now
+            self.db_deletes_map[self.TABLE_TASK_POOL].append({})
+            self.db_deletes_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({})
+        # The task_action_timers table is wiped by put_task_event_timers when
+        # there are event timers, in which case all task timers are re-added.
+        timers_wiped = (
+            {} in self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS])
+        prev_rows = self.task_pool_rows
+        self.task_pool_rows = {}
         for itask in pool.get_all_tasks():
-            self.db_inserts_map[self.TABLE_TASK_POOL].append({
-                "name": itask.tdef.name,
-                "cycle": str(itask.point),
-                "spawned": int(itask.has_spawned),
-                "status": itask.state.status,
-                "hold_swap": itask.state.hold_swap})
-            if itask.timeout is not None:
+            cycle = str(itask.point)
+            name = itask.tdef.name
+            pool_row = (
+                int(itask.has_spawned), itask.state.status,
+                itask.state.hold_swap)
+            timer_rows = self._get_task_timer_rows(itask)
+            prev_pool_row, prev_timeout, prev_timer_rows = prev_rows.pop(
+                (cycle, name), (None, None, {}))
+            self.task_pool_rows[(cycle, name)] = (
+                pool_row, itask.timeout, timer_rows)
+            if is_snapshot or pool_row != prev_pool_row:
+                self.db_inserts_map[self.TABLE_TASK_POOL].append({
+                    "name": name,
+                    "cycle": cycle,
+                    "spawned": pool_row[0],
+                    "status": pool_row[1],
+                    "hold_swap": pool_row[2]})
+            if itask.timeout is not None and (
+                    is_snapshot or itask.timeout != prev_timeout):
                 self.db_inserts_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
+                    "name": name,
+                    "cycle": cycle,
                     "timeout": itask.timeout})
-            if itask.poll_timer is not None:
-                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "ctx_key": json.dumps("poll_timer"),
-                    "ctx": self._namedtuple2json(itask.poll_timer.ctx),
-                    "delays": json.dumps(itask.poll_timer.delays),
-                    "num": itask.poll_timer.num,
-                    "delay": itask.poll_timer.delay,
-                    "timeout": itask.poll_timer.timeout})
-            for ctx_key_1, timer in itask.try_timers.items():
-                if timer is None:
-                    continue
-                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "ctx_key": json.dumps(("try_timers", ctx_key_1)),
-                    "ctx": self._namedtuple2json(timer.ctx),
-                    "delays": json.dumps(timer.delays),
-                    "num": timer.num,
-                    "delay": timer.delay,
-                    "timeout": timer.timeout})
+            elif (itask.timeout is None and prev_timeout is not None and
+                    not is_snapshot):
+                self.db_deletes_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({
+                    "name": name,
+                    "cycle": cycle})
+            for ctx_key, timer_row in timer_rows.items():
+                if (is_snapshot or timers_wiped or
+                        timer_row != prev_timer_rows.get(ctx_key)):
+                    self._put_insert_task_timer(
+                        cycle, name, ctx_key, timer_row)
+            if not timers_wiped:
+                for ctx_key in set(prev_timer_rows) - set(timer_rows):
+                    self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append(
+                        {"name": name, "cycle": cycle, "ctx_key": ctx_key})
             if itask.state.time_updated:
                 set_args = {
                     "time_updated": itask.state.time_updated,
@@ -376,13 +411,25 @@ class SuiteDatabaseManager(object):
                     "try_num": itask.get_try_num(),
                     "status": itask.state.status}
                 where_args = {
-                    "cycle": str(itask.point),
-                    "name": itask.tdef.name,
+                    "cycle": cycle,
+                    "name": name,
                 }
                 self.db_updates_map.setdefault(self.TABLE_TASK_STATES, [])
                 self.db_updates_map[self.TABLE_TASK_STATES].append(
                     (set_args, where_args))
                 itask.state.time_updated = None
+        # Tasks that have left the pool
+        for (cycle, name), (_, timeout, timer_rows) in prev_rows.items():
+            where_args = {"name": name, "cycle": cycle}
+            if not is_snapshot:
+                self.db_deletes_map[self.TABLE_TASK_POOL].append(where_args)
+                if timeout is not None:
+                    self.db_deletes_map[
+                        self.TABLE_TASK_TIMEOUT_TIMERS].append(where_args)
+            if not timers_wiped:
+                for ctx_key in timer_rows:
+                    self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append(
+                        {"name": name, "cycle": cycle, "ctx_key": ctx_key})
 
         self.db_inserts_map[self.TABLE_CHECKPOINT_ID].append({
             # id = -1 for latest
@@ -390,6 +437,40 @@ class SuiteDatabaseManager(object):
             "time": get_current_time_string(),
             "event": CylcSuiteDAO.CHECKPOINT_LATEST_EVENT})
 
+    @staticmethod
+    def _get_task_timer_rows(itask):
+        """Return {ctx_key: row} for the poll and try timers of itask.
+
+        Each row is a tuple of the timer values, for comparison with the row
+        written last.
+        """
+        timers = []
+        if itask.poll_timer is not None:
+            timers.append((json.dumps("poll_timer"), itask.poll_timer))
+        for ctx_key_1, timer in itask.try_timers.items():
+            if timer is not None:
+                timers.append(
+                    (json.dumps(("try_timers", ctx_key_1)), timer))
+        rows = {}
+        for ctx_key, timer in timers:
+            rows[ctx_key] = (
+                timer.ctx, tuple(timer.delays), timer.num, timer.delay,
+                timer.timeout)
+        return rows
+
+    def _put_insert_task_timer(self, cycle, name, ctx_key, timer_row):
+        """Put INSERT statement for a task row of task_action_timers."""
+        ctx, delays, num, delay, timeout = timer_row
+        self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
+            "name": name,
+            "cycle": cycle,
+            "ctx_key": ctx_key,
+            "ctx": self._namedtuple2json(ctx),
+            "delays": json.dumps(list(delays)),
+            "num": num,
+            "delay": delay,
+            "timeout": timeout})
+
     def put_insert_task_events(self, itask, args):
         """Put INSERT statement for task_events table."""
         self._put_insert_task_x(CylcSuiteDAO.TABLE_TASK_EVENTS, itask, args)
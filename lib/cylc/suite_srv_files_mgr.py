@@ -50,6 +50,7 @@ class SuiteSrvFilesManager(object):
     FILE_BASE_SSL_CERT = "ssl.cert"
     FILE_BASE_SSL_PEM = "ssl.pem"
     FILE_BASE_SUITE_RC = "suite.rc"
+    FILE_BASE_SUITE_RC_CACHE = "suite.rc.cache"
     KEY_API = "CYLC_API"
     KEY_COMMS_PROTOCOL = "CYLC_COMMS_PROTOCOL"  # default (or none?)
     KEY_COMMS_PROTOCOL_2 = "CYLC_COMMS_PROTOCOL_2"  # indirect comms
@@ -62,6 +63,7 @@ class SuiteSrvFilesManager(object):
     KEY_SSH_USE_LOGIN_SHELL = "CYLC_SSH_USE_LOGIN_SHELL"
     KEY_SUITE_RUN_DIR_ON_SUITE_HOST = "CYLC_SUITE_RUN_DIR_ON_SUITE_HOST"
     KEY_TASK_MSG_MAX_TRIES = "CYLC_TASK_MSG_MAX_TRIES"
+    KEY_TASK_MSG_RELAY = "CYLC_TASK_MSG_RELAY"
     KEY_TASK_MSG_RETRY_INTVL = "CYLC_TASK_MSG_RETRY_INTVL"
     KEY_TASK_MSG_TIMEOUT = "CYLC_TASK_MSG_TIMEOUT"
     KEY_UUID = "CYLC_SUITE_UUID"
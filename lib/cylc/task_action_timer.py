@@ -18,6 +18,8 @@
 
 """Timer for task actions."""
 
+import heapq
+from itertools import count
 from time import time
 
 from cylc.wallclock import (
@@ -101,3 +103,86 @@ class TaskActionTimer(object):
     def unset_waiting(self):
         """Unset waiting flag after an action has completed."""
         self.is_waiting = False
+
+
+class TaskActionTimerQueue(object):
+    """Queue of keys (of task action timers) in order of due time.
+
+    This allows the main loop to look at the timers that are due, instead of
+    all the timers in the suite. A key can be put more than once with
+    different due times. Entries are not removed when a timer is reset or
+    removed, so callers should check the timer of each key returned by
+    "pop_due", and put it back with its new due time if necessary.
+    """
+
+    def __init__(self):
+        # Heap of (due time, sequence number, key), and
+        # set of (key, due time) to avoid pushing duplicates.
+        self._heap = []
+        self._entries = set()
+        self._seq = count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def get_next_due_time(self):
+        """Return the earliest due time, or None if queue is empty."""
+        if self._heap:
+            return self._heap[0][0]
+
+    def pop_due(self, now):
+        """Remove and return keys due at or before "now", in due order.
+
+        Each key is returned only once.
+        """
+        keys = []
+        seen = set()
+        while self._heap and self._heap[0][0] <= now:
+            due_time, _, key = heapq.heappop(self._heap)
+            self._entries.discard((key, due_time))
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+        return keys
+
+    def put(self, key, due_time):
+        """Put key to the queue with due_time (seconds since epoch)."""
+        entry = (key, due_time)
+        if entry not in self._entries:
+            self._entries.add(entry)
+            heapq.heappush(self._heap, (due_time, next(self._seq), key))
+
+
+if __name__ == "__main__":
+    import unittest
+
+    class TestTaskActionTimerQueue(unittest.TestCase):
+        """Test TaskActionTimerQueue."""
+
+        def test_pop_due(self):
+            """pop_due returns due keys only, in due order."""
+            queue = TaskActionTimerQueue()
+            self.assertEqual(None, queue.get_next_due_time())
+            queue.put('c', 30.0)
+            queue.put('a', 10.0)
+            queue.put('b', 20.0)
+            self.assertEqual(10.0, queue.get_next_due_time())
+            self.assertEqual([], queue.pop_due(5.0))
+            self.assertEqual(['a', 'b'], queue.pop_due(20.0))
+            self.assertEqual(30.0, queue.get_next_due_time())
+            self.assertEqual(['c'], queue.pop_due(40.0))
+            self.assertEqual(0, len(queue))
+
+        def test_put_duplicates(self):
+            """A key is queued once per due time, and popped once."""
+            queue = TaskActionTimerQueue()
+            queue.put('a', 10.0)
+            queue.put('a', 10.0)
+            self.assertEqual(1, len(queue))
+            queue.put('a', 15.0)
+            self.assertEqual(2, len(queue))
+            self.assertEqual(['a'], queue.pop_due(20.0))
+            queue.put('a', 10.0)
+            self.assertEqual(['a'], queue.pop_due(20.0))
+
+    unittest.main()
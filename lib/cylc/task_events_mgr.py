@@ -39,14 +39,16 @@ from parsec.config import ItemNotFoundError
 
 from cylc.cfgspec.glbl_cfg import glbl_cfg
 import cylc.flags
+from cylc.dependency_broker import DependencyBroker
 from cylc.mp_pool import SuiteProcContext
 from cylc.suite_logging import ERR, LOG
 from cylc.hostuserutil import get_host, get_user
-from cylc.task_action_timer import TaskActionTimer
+from cylc.task_action_timer import TaskActionTimer, TaskActionTimerQueue
 from cylc.task_job_logs import (
     get_task_job_log, get_task_job_activity_log, JOB_LOG_OUT, JOB_LOG_ERR)
 from cylc.task_message import (
     ABORT_MESSAGE_PREFIX, FAIL_MESSAGE_PREFIX, VACATION_MESSAGE_PREFIX)
+from cylc.task_readiness import TaskReadiness
 from cylc.task_state import (
     TASK_STATUSES_ACTIVE,
     TASK_STATUS_READY, TASK_STATUS_SUBMITTED, TASK_STATUS_SUBMIT_RETRYING,
@@ -130,6 +132,11 @@ class TaskEventsManager(object):
         "DEBUG": DEBUG,
     }
     POLLED_FLAG = "(polled)"
+    # Messages that change the status of a job, processed once per job
+    # in a batch of incoming messages.
+    JOB_STATUS_MESSAGES = frozenset([
+        EVENT_FAILED, EVENT_STARTED, EVENT_SUBMITTED, EVENT_SUBMIT_FAILED,
+        EVENT_SUCCEEDED])
 
     def __init__(self, suite, proc_pool, suite_db_mgr, broadcast_mgr):
         self.suite = suite
@@ -142,6 +149,18 @@ class TaskEventsManager(object):
         self.mail_footer = None
         self.next_mail_time = None
         self.event_timers = {}
+        # Keys of event timers, and task proxies with job poll and timeout
+        # times, by due time, so only the timers due are looked at.
+        self._event_timer_queue = TaskActionTimerQueue()
+        self._job_timer_queue = TaskActionTimerQueue()
+        # Keys of mail event timers waiting for the next mail time.
+        self._mail_wait_keys = []
+        # Completed task outputs are put to the dependency broker, which
+        # delivers them to waiting prerequisites in the task pool.
+        self.dep_broker = DependencyBroker()
+        # Task proxies with incoming messages are put to the readiness
+        # tracker, which limits main loop readiness checks to them.
+        self.readiness = TaskReadiness()
         # Set pflag = True to stimulate task dependency negotiation whenever a
         # task changes state in such a way that others could be affected. The
         # flag should only be turned off again after use in
@@ -200,6 +219,51 @@ class TaskEventsManager(object):
         else:
             return can_poll
 
+    def get_job_timer_tasks(self, now):
+        """Return task proxies in the task pool with job timers due.
+
+        These are tasks with a poll time or a submission/execution timeout at
+        or before "now". Use "put_job_timers" to queue their next times.
+        """
+        itasks = []
+        for itask in self._job_timer_queue.pop_due(now):
+            if self.readiness.itasks.get(itask.identity) is itask:
+                itasks.append(itask)
+        return itasks
+
+    def get_next_timer_time(self):
+        """Return the earliest due time of all task timers.
+
+        This covers event handler, job poll, job timeout, and (via the
+        readiness tracker) clock trigger, expiry and retry times. Return None
+        if there is no timer.
+        """
+        due_times = [
+            due_time for due_time in [
+                self._event_timer_queue.get_next_due_time(),
+                self._job_timer_queue.get_next_due_time(),
+                self.readiness.get_next_wake_time()]
+            if due_time is not None]
+        if due_times:
+            return min(due_times)
+
+    def put_event_timer(self, id_key, timer):
+        """Add an event handler timer, e.g. on set up or on restart."""
+        self.event_timers[id_key] = timer
+        self._event_timer_queue.put(id_key, timer.timeout or 0.0)
+
+    def put_job_timers(self, itask):
+        """Queue the next poll time and timeout of a task's job, if any.
+
+        Simulation mode jobs are not polled, so they are ignored.
+        """
+        if itask.tdef.run_mode == 'simulation':
+            return
+        if itask.poll_timer is not None and itask.poll_timer.timeout:
+            self._job_timer_queue.put(itask, itask.poll_timer.timeout)
+        if itask.timeout is not None:
+            self._job_timer_queue.put(itask, itask.timeout)
+
     def get_host_conf(self, itask, key, default=None, skey="remote"):
         """Return a host setting from suite then global configuration."""
         overrides = self.broadcast_mgr.get_broadcast(itask.identity)
@@ -222,9 +286,19 @@ class TaskEventsManager(object):
         """
         ctx_groups = {}
         now = time()
-        for id_key, timer in self.event_timers.copy().items():
+        id_keys = self._event_timer_queue.pop_due(now)
+        if self._mail_wait_keys and (
+                schd_ctx.stop_mode or
+                self.next_mail_time is None or
+                self.next_mail_time <= now):
+            id_keys += [
+                id_key for id_key in self._mail_wait_keys
+                if id_key not in id_keys]
+            self._mail_wait_keys = []
+        for id_key in id_keys:
             key1, point, name, submit_num = id_key
-            if timer.is_waiting:
+            timer = self.event_timers.get(id_key)
+            if timer is None or timer.is_waiting:
                 continue
             # Set timer if timeout is None.
             if not timer.is_timeout_set():
@@ -244,7 +318,10 @@ class TaskEventsManager(object):
                         point, name, submit_num, key1,
                         timer.delay_timeout_as_str()))
             # Ready to run?
-            if not timer.is_delay_done() or (
+            if not timer.is_delay_done():
+                self._event_timer_queue.put(id_key, timer.timeout)
+                continue
+            if (
                 # Avoid flooding user's mail box with mail notification.
                 # Group together as many notifications as possible within a
                 # given interval.
@@ -253,6 +330,8 @@ class TaskEventsManager(object):
                 self.next_mail_time is not None and
                 self.next_mail_time > now
             ):
+                if id_key not in self._mail_wait_keys:
+                    self._mail_wait_keys.append(id_key)
                 continue
 
             timer.set_waiting()
@@ -346,6 +425,8 @@ class TaskEventsManager(object):
         # Satisfy my output, if possible, and record the result.
         an_output_was_satisfied = itask.state.outputs.set_msg_trg_completion(
             message=message, is_completed=True)
+        self.dep_broker.put_outputs(itask)
+        self.readiness.put(itask)
 
         if message == TASK_OUTPUT_STARTED:
             if (flag == self.INCOMING_FLAG
@@ -440,7 +521,7 @@ class TaskEventsManager(object):
         if ctx.ret_code == 0:
             del self.event_timers[id_key]
         else:
-            self.event_timers[id_key].unset_waiting()
+            self._unset_event_timer_waiting(id_key)
 
     def _db_events_insert(self, itask, event="", message=""):
         """Record an event to the DB."""
@@ -514,11 +595,16 @@ class TaskEventsManager(object):
                     log_task_job_activity(
                         log_ctx, schd_ctx.suite, point, name, submit_num)
                 else:
-                    self.event_timers[id_key].unset_waiting()
+                    self._unset_event_timer_waiting(id_key)
             except KeyError:
                 if cylc.flags.debug:
                     ERR.debug(traceback.format_exc())
 
+    def _unset_event_timer_waiting(self, id_key):
+        """Re-queue an event timer after its action has failed."""
+        self.event_timers[id_key].unset_waiting()
+        self._event_timer_queue.put(id_key, 0.0)
+
     def _get_events_conf(self, itask, key, default=None):
         """Return an events setting from suite then global configuration."""
         for getter in [
@@ -596,7 +682,7 @@ class TaskEventsManager(object):
                     for fname, exist_ok in sorted(fname_oks.items()):
                         if not exist_ok:
                             log_ctx.err += " %s" % fname
-                    self.event_timers[id_key].unset_waiting()
+                    self._unset_event_timer_waiting(id_key)
                 log_task_job_activity(
                     log_ctx, schd_ctx.suite, point, name, submit_num)
             except KeyError:
@@ -769,14 +855,14 @@ class TaskEventsManager(object):
             itask, "retrieve job logs retry delays")
         if not retry_delays:
             retry_delays = [0]
-        self.event_timers[id_key] = TaskActionTimer(
+        self.put_event_timer(id_key, TaskActionTimer(
             TaskJobLogsRetrieveContext(
                 self.HANDLER_JOB_LOGS_RETRIEVE,  # key
                 self.HANDLER_JOB_LOGS_RETRIEVE,  # ctx_type
                 user_at_host,
                 self.get_host_conf(itask, "retrieve job logs max size"),
             ),
-            retry_delays)
+            retry_delays))
 
     def _setup_event_mail(self, itask, event):
         """Set up task event notification, by email."""
@@ -789,7 +875,7 @@ class TaskEventsManager(object):
         retry_delays = self._get_events_conf(itask, "mail retry delays")
         if not retry_delays:
             retry_delays = [0]
-        self.event_timers[id_key] = TaskActionTimer(
+        self.put_event_timer(id_key, TaskActionTimer(
             TaskEventMailContext(
                 self.HANDLER_MAIL,  # key
                 self.HANDLER_MAIL,  # ctx_type
@@ -801,7 +887,7 @@ class TaskEventsManager(object):
                 self._get_events_conf(itask, "mail to", get_user()),  # mail_to
                 self._get_events_conf(itask, "mail smtp"),  # mail_smtp
             ),
-            retry_delays)
+            retry_delays))
 
     def _setup_custom_event_handlers(self, itask, event, message):
         """Set up custom task event handlers."""
@@ -881,7 +967,8 @@ class TaskEventsManager(object):
                 cmd = "%s '%s' '%s' '%s' '%s'" % (
                     handler, event, self.suite, itask.identity, message)
             LOG.debug("Queueing %s handler: %s" % (event, cmd), itask=itask)
-            self.event_timers[id_key] = (
+            self.put_event_timer(
+                id_key,
                 TaskActionTimer(
                     CustomTaskEventHandlerContext(
                         key1,
@@ -963,3 +1050,4 @@ class TaskEventsManager(object):
         LOG.info(message, itask=itask)
         # Set next poll time
         self.check_poll_time(itask)
+        self.put_job_timers(itask)
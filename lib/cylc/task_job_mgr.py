@@ -33,14 +33,13 @@ from shutil import rmtree
 from time import time
 import traceback
 
-from parsec.util import pdeepcopy, poverride
-
 from cylc.batch_sys_manager import BatchSysManager, JobPollContext
 from cylc.cfgspec.glbl_cfg import glbl_cfg
 from cylc.envvar import expandvars
 import cylc.flags
 from cylc.hostuserutil import is_remote_host, is_remote_user
 from cylc.job_file import JobFileWriter
+from cylc.job_submit_planner import JobSubmitPlanner
 from cylc.task_job_logs import (
     JOB_LOG_JOB, get_task_job_log, get_task_job_job_log,
     get_task_job_activity_log, get_task_job_id, NN)
@@ -91,15 +90,21 @@ class TaskJobManager(object):
         self.suite_srv_files_mgr = suite_srv_files_mgr
         self.task_remote_mgr = TaskRemoteMgr(
             suite, proc_pool, suite_srv_files_mgr)
+        self.job_submit_planner = JobSubmitPlanner(
+            proc_pool.size, proc_pool.proc_pool_timeout)
+        # {(host, owner): (ctx, itasks, job_log_dirs), ...} of the latest
+        # "jobs-poll" command of each (host, owner), to add to until started.
+        self.jobs_poll_queued = {}
 
-    def check_task_jobs(self, suite, task_pool):
+    def check_task_jobs(self, suite):
         """Check submission and execution timeout and polling timers.
 
         Poll tasks that have timed out and/or have reached next polling time.
+        Only tasks with a timer due are checked.
         """
         now = time()
         poll_tasks = set()
-        for itask in task_pool.get_tasks():
+        for itask in self.task_events_mgr.get_job_timer_tasks(now):
             if self.task_events_mgr.check_job_time(itask, now):
                 poll_tasks.add(itask)
                 if itask.poll_timer.delay is not None:
@@ -107,6 +112,7 @@ class TaskJobManager(object):
                         'poll now, (next in %s)' % (
                             itask.poll_timer.delay_timeout_as_str()),
                         itask=itask)
+            self.task_events_mgr.put_job_timers(itask)
         if poll_tasks:
             self.poll_task_jobs(suite, poll_tasks)
 
@@ -274,33 +280,37 @@ class TaskJobManager(object):
             cmd.append('--')
             cmd.append(glbl_cfg().get_derived_host_item(
                 suite, 'suite job log directory', host, owner))
-            stdin_file_paths = []
-            job_log_dirs = []
-            for itask in sorted(itasks, key=lambda itask: itask.identity):
-                if remote_mode:
-                    stdin_file_paths.append(
-                        get_task_job_job_log(
-                            suite, itask.point, itask.tdef.name,
-                            itask.submit_num))
-                job_log_dirs.append(get_task_job_id(
-                    itask.point, itask.tdef.name, itask.submit_num))
-                # The job file is now (about to be) used: reset the file write
-                # flag so that subsequent manual retrigger will generate a new
-                # job file.
-                itask.local_job_file_path = None
-                itask.state.reset_state(TASK_STATUS_READY)
-                if itask.state.outputs.has_custom_triggers():
-                    self.suite_db_mgr.put_update_task_outputs(itask)
-            cmd += job_log_dirs
-            self.proc_pool.put_command(
-                SuiteProcContext(
-                    self.JOBS_SUBMIT,
-                    cmd,
-                    stdin_file_paths=stdin_file_paths,
-                    job_log_dirs=job_log_dirs,
-                    **kwargs
-                ),
-                self._submit_task_jobs_callback, [suite, itasks])
+            # Submit in batches, limited for each (host, owner)
+            for batch_itasks in self.job_submit_planner.get_batches(
+                    host, owner, itasks):
+                stdin_file_paths = []
+                job_log_dirs = []
+                for itask in batch_itasks:
+                    if remote_mode:
+                        stdin_file_paths.append(
+                            get_task_job_job_log(
+                                suite, itask.point, itask.tdef.name,
+                                itask.submit_num))
+                    job_log_dirs.append(get_task_job_id(
+                        itask.point, itask.tdef.name, itask.submit_num))
+                    # The job file is now (about to be) used: reset the file
+                    # write flag so that subsequent manual retrigger will
+                    # generate a new job file.
+                    itask.local_job_file_path = None
+                    itask.state.reset_state(TASK_STATUS_READY)
+                    if itask.state.outputs.has_custom_triggers():
+                        self.suite_db_mgr.put_update_task_outputs(itask)
+                self.proc_pool.put_command(
+                    SuiteProcContext(
+                        self.JOBS_SUBMIT,
+                        cmd + job_log_dirs,
+                        stdin_file_paths=stdin_file_paths,
+                        job_log_dirs=job_log_dirs,
+                        limit_key=(host, owner),
+                        limit=self.job_submit_planner.get_limit(host, owner),
+                        **kwargs
+                    ),
+                    self._submit_task_jobs_callback, [suite, batch_itasks])
         return done_tasks
 
     @staticmethod
@@ -499,6 +509,10 @@ class TaskJobManager(object):
 
     def _poll_task_jobs_callback(self, ctx, suite, itasks):
         """Callback when poll tasks command exits."""
+        for key, value in self.jobs_poll_queued.items():
+            if value[0] is ctx:
+                del self.jobs_poll_queued[key]
+                break
         self._manip_task_jobs_callback(
             ctx,
             suite,
@@ -601,6 +615,10 @@ class TaskJobManager(object):
         Group itasks with their user@host.
         Put a job command for each user@host to the multiprocess pool.
 
+        Only one "jobs-poll" command runs at a time for each user@host.
+        Jobs to poll while it runs are added to the next "jobs-poll" command
+        for the user@host in the queue, so a single batch system query is
+        shared by all the poll requests made in the meantime.
         """
         if not itasks:
             return
@@ -610,6 +628,9 @@ class TaskJobManager(object):
                 auth_itasks[(itask.task_host, itask.task_owner)] = []
             auth_itasks[(itask.task_host, itask.task_owner)].append(itask)
         for (host, owner), itasks in sorted(auth_itasks.items()):
+            if (cmd_key == self.JOBS_POLL and
+                    self._add_to_jobs_poll_queued(host, owner, itasks)):
+                continue
             cmd = ["cylc", cmd_key]
             if cylc.flags.debug:
                 cmd.append("--debug")
@@ -625,8 +646,35 @@ class TaskJobManager(object):
                 job_log_dirs.append(get_task_job_id(
                     itask.point, itask.tdef.name, itask.submit_num))
             cmd += job_log_dirs
-            self.proc_pool.put_command(
-                SuiteProcContext(cmd_key, cmd), callback, [suite, itasks])
+            if cmd_key == self.JOBS_POLL:
+                ctx = SuiteProcContext(
+                    cmd_key, cmd, limit_key=(cmd_key, host, owner), limit=1)
+                self.jobs_poll_queued[(host, owner)] = (
+                    ctx, itasks, job_log_dirs)
+            else:
+                ctx = SuiteProcContext(cmd_key, cmd)
+            self.proc_pool.put_command(ctx, callback, [suite, itasks])
+
+    def _add_to_jobs_poll_queued(self, host, owner, itasks):
+        """Add itasks to the queued "jobs-poll" command for (host, owner).
+
+        Return False if there is no such command that has not yet started.
+        """
+        try:
+            ctx, queued_itasks, job_log_dirs = self.jobs_poll_queued[
+                (host, owner)]
+        except KeyError:
+            return False
+        if ctx.time_start is not None:
+            return False
+        for itask in sorted(itasks, key=lambda itask: itask.identity):
+            job_log_dir = get_task_job_id(
+                itask.point, itask.tdef.name, itask.submit_num)
+            if job_log_dir not in job_log_dirs:
+                job_log_dirs.append(job_log_dir)
+                ctx.cmd.append(job_log_dir)
+                queued_itasks.append(itask)
+        return True
 
     @staticmethod
     def _set_retry_timers(itask, rtconfig=None):
@@ -663,6 +711,10 @@ class TaskJobManager(object):
 
     def _submit_task_jobs_callback(self, ctx, suite, itasks):
         """Callback when submit task jobs command exits."""
+        if ctx.time_start is not None:
+            host, owner = ctx.cmd_kwargs['limit_key']
+            self.job_submit_planner.put_result(
+                host, owner, len(itasks), time() - ctx.time_start)
         self._manip_task_jobs_callback(
             ctx,
             suite,
@@ -713,13 +765,8 @@ class TaskJobManager(object):
             return itask
 
         # Handle broadcasts
-        overrides = self.task_events_mgr.broadcast_mgr.get_broadcast(
-            itask.identity)
-        if overrides:
-            rtconfig = pdeepcopy(itask.tdef.rtconfig)
-            poverride(rtconfig, overrides, prepend=True)
-        else:
-            rtconfig = itask.tdef.rtconfig
+        rtconfig = self.task_events_mgr.broadcast_mgr.get_rtconfig(
+            itask.tdef, str(itask.point))
 
         # Determine task host settings now, just before job submission,
         # because dynamic host selection may be used.
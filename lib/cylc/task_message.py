@@ -30,6 +30,8 @@ import sys
 from cylc.cfgspec.glbl_cfg import glbl_cfg
 import cylc.flags
 from cylc.network.httpclient import SuiteRuntimeServiceClient, ClientInfoError
+from cylc.suite_srv_files_mgr import SuiteSrvFilesManager
+from cylc.task_message_relay import TaskMessageRelay
 from cylc.task_outputs import TASK_OUTPUT_STARTED, TASK_OUTPUT_SUCCEEDED
 from cylc.wallclock import get_current_time_string
 
@@ -73,12 +75,16 @@ def record_messages(suite, task_job, messages):
     # Write to job.status
     _append_job_status_file(suite, task_job, event_time, messages)
     # Send messages
-    client = SuiteRuntimeServiceClient(suite)
+    payload = {
+        'task_job': task_job,
+        'event_time': event_time,
+        'messages': messages}
     try:
-        client.put_messages({
-            'task_job': task_job,
-            'event_time': event_time,
-            'messages': messages})
+        comms1 = TaskMessageRelay.load_contact_file(suite)
+        if comms1.get(SuiteSrvFilesManager.KEY_TASK_MSG_RELAY) == str(True):
+            _put_relay_record(suite, payload, comms1)
+        else:
+            SuiteRuntimeServiceClient(suite).put_messages(payload)
     except ClientInfoError:
         # Backward communication not possible
         if cylc.flags.debug:
@@ -86,6 +92,26 @@ def record_messages(suite, task_job, messages):
             traceback.print_exc()
 
 
+def _put_relay_record(suite, payload, comms1):
+    """Send messages via the message relay of the suite on this host.
+
+    Wait for the relay for up to as long as direct sends would retry. If the
+    wait times out, the messages remain in the spool for the relay to retry.
+    """
+    timeout = (
+        int(comms1.get(
+            SuiteSrvFilesManager.KEY_TASK_MSG_MAX_TRIES,
+            SuiteRuntimeServiceClient.MSG_MAX_TRIES)) *
+        float(comms1.get(
+            SuiteSrvFilesManager.KEY_TASK_MSG_RETRY_INTVL,
+            SuiteRuntimeServiceClient.MSG_RETRY_INTVL)))
+    if not TaskMessageRelay(suite).put(payload, timeout):
+        sys.stderr.write(
+            "%s WARNING - Message not relayed in %s seconds,"
+            " left in spool for retry\n" % (
+                get_current_time_string(), timeout))
+
+
 def _append_job_status_file(suite, task_job, event_time, messages):
     """Write messages to job status file."""
     job_log_name = os.getenv('CYLC_TASK_LOG_ROOT')
@@ -0,0 +1,359 @@
+#!/usr/bin/env python2
+
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2018 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Relay task job messages to a suite via a spool directory.
+
+With "[task messaging]relay = True", each "cylc message" command writes its
+messages as a record file in a spool directory of the suite on the job host,
+and waits for the record to be consumed. A relay process, "cylc relay-messages
+SUITE", started on demand, sends the records of all jobs of the suite on the
+host to the suite over a single connection, many records per request. Records
+remain in the spool while the suite is unreachable. The relay exits when it has
+been idle for a while.
+"""
+
+from fcntl import flock, LOCK_EX, LOCK_NB, LOCK_UN
+import json
+import os
+from subprocess import Popen
+import sys
+from time import sleep, time
+
+from cylc.hostuserutil import get_host
+from cylc.network.httpclient import (
+    SuiteRuntimeServiceClient, ClientError, ClientInfoError,
+    ClientInfoUUIDError)
+from cylc.suite_srv_files_mgr import (
+    SuiteSrvFilesManager, SuiteServiceFileError)
+from cylc.wallclock import get_current_time_string
+
+
+class TaskMessageRelay(object):
+    """Spool of task job messages of a suite on a host, and its relay.
+
+    Attributes:
+        .suite (str):
+            Suite name.
+        .spool_dir (str):
+            Path to spool directory of the suite on this host.
+        .client (SuiteRuntimeServiceClient):
+            Client to send messages to suite, or None if not connected.
+        .lock_handle (file):
+            Handle of the lock file, if the relay lock is held.
+    """
+
+    DIR_BASE_SPOOL = 'message-spool'
+    FILE_BASE_LOCK = '.lock'
+    FILE_BASE_LOG = '.log'
+    PREFIX_TMP = '.tmp-'
+    SUFFIX_RECORD = '.json'
+    CMD = ['cylc', 'relay-messages']
+    # Relay exits after this many seconds without records
+    IDLE_TIMEOUT = 60.0
+    # Interval to check for new or consumed records
+    POLL_INTERVAL = 0.1
+    # Maximum number of records per request
+    MAX_BATCH_SIZE = 500
+    # Default interval to retry on send failure
+    RETRY_INTVL = SuiteRuntimeServiceClient.MSG_RETRY_INTVL
+
+    def __init__(self, suite):
+        self.suite = suite
+        self.spool_dir = os.path.join(
+            SuiteSrvFilesManager().get_suite_srv_dir(suite),
+            self.DIR_BASE_SPOOL, get_host())
+        self.client = None
+        self.lock_handle = None
+
+    @staticmethod
+    def load_contact_file(suite):
+        """Load and return the contact data of the suite, as a dict.
+
+        Raise ClientInfoError if the suite contact file cannot be loaded, or
+        ClientInfoUUIDError if the job belongs to a different run of the
+        suite, as a direct send would.
+        """
+        mgr = SuiteSrvFilesManager()
+        try:
+            data = mgr.load_contact_file(suite)
+        except (IOError, SuiteServiceFileError):
+            raise ClientInfoError(suite)
+        env_uuid = os.getenv(mgr.KEY_UUID)
+        if (env_uuid and os.getenv(mgr.KEY_NAME) == suite and
+                env_uuid != data.get(mgr.KEY_UUID)):
+            raise ClientInfoUUIDError(env_uuid, data.get(mgr.KEY_UUID))
+        return data
+
+    def put(self, payload, timeout=None):
+        """Write a record of task job messages to the spool.
+
+        Start the relay if it is not running. Wait until the record is
+        consumed or "timeout" seconds have elapsed. Return True if the record
+        is consumed.
+        """
+        self._make_spool_dir()
+        name = '%017.6f-%d%s' % (time(), os.getpid(), self.SUFFIX_RECORD)
+        tmp_path = os.path.join(self.spool_dir, self.PREFIX_TMP + name)
+        path = os.path.join(self.spool_dir, name)
+        with open(tmp_path, 'wb') as handle:
+            json.dump(payload, handle)
+        os.rename(tmp_path, path)
+        if not self.is_running():
+            self.start()
+        timeout_time = None
+        if timeout is not None:
+            timeout_time = time() + timeout
+        while os.path.exists(path):
+            if timeout_time is not None and time() > timeout_time:
+                return False
+            sleep(self.POLL_INTERVAL)
+        return True
+
+    def is_running(self):
+        """Return True if a relay holds the lock of the spool."""
+        if self.lock_handle is not None:
+            return True
+        if self._lock():
+            self._unlock()
+            return False
+        return True
+
+    def start(self):
+        """Start a relay process in the background."""
+        env = dict(os.environ)
+        # The relay serves jobs of any run of the suite
+        env.pop(SuiteSrvFilesManager.KEY_UUID, None)
+        handle = open(os.path.join(self.spool_dir, self.FILE_BASE_LOG), 'ab')
+        try:
+            Popen(
+                self.CMD + [self.suite],
+                stdin=open(os.devnull), stdout=handle, stderr=handle,
+                close_fds=True, preexec_fn=os.setsid, env=env)
+        finally:
+            handle.close()
+
+    def run(self):
+        """Relay records in the spool to the suite until idle.
+
+        Return immediately if another relay is running.
+        """
+        self._make_spool_dir()
+        if not self._lock():
+            return
+        idle_time = time() + self.IDLE_TIMEOUT
+        while True:
+            paths = self.get_records()
+            if paths:
+                self._relay(paths)
+                idle_time = time() + self.IDLE_TIMEOUT
+            elif time() > idle_time:
+                self._unlock()
+                # A job may have written a record after the last check,
+                # but before the lock is released.
+                if not self.get_records() or not self._lock():
+                    break
+                idle_time = time() + self.IDLE_TIMEOUT
+            else:
+                sleep(self.POLL_INTERVAL)
+
+    def get_records(self):
+        """Return paths to records in the spool, oldest first."""
+        try:
+            names = os.listdir(self.spool_dir)
+        except OSError:
+            return []
+        return [
+            os.path.join(self.spool_dir, name) for name in sorted(names)
+            if not name.startswith('.') and name.endswith(self.SUFFIX_RECORD)]
+
+    def _relay(self, paths):
+        """Send records at paths to suite, and remove the sent ones.
+
+        Send records in batches of up to MAX_BATCH_SIZE records per request.
+        """
+        for i in range(0, len(paths), self.MAX_BATCH_SIZE):
+            batch_paths = []
+            payloads = []
+            for path in paths[i:i + self.MAX_BATCH_SIZE]:
+                try:
+                    payloads.append(json.load(open(path)))
+                except (IOError, ValueError):
+                    # Bad or removed record
+                    self._remove(path)
+                else:
+                    batch_paths.append(path)
+            if not payloads:
+                continue
+            if self.client is None:
+                self.client = SuiteRuntimeServiceClient(self.suite)
+            try:
+                self.client.put_messages_bulk(payloads)
+            except ClientInfoError:
+                # Suite not running, a restart will poll the jobs anyway.
+                self._warn('suite not running, discard: %s' % payloads)
+                self.client = None
+            except ClientError as exc:
+                retry_intvl = float(self.client.comms1.get(
+                    SuiteSrvFilesManager.KEY_TASK_MSG_RETRY_INTVL,
+                    self.RETRY_INTVL))
+                self._warn('send failed, retry in %s seconds: %s' % (
+                    retry_intvl, exc))
+                self.client = None
+                sleep(retry_intvl)
+                return
+            for path in batch_paths:
+                self._remove(path)
+
+    def _make_spool_dir(self):
+        """Create the spool directory, if it does not exist."""
+        if not os.path.isdir(self.spool_dir):
+            try:
+                os.makedirs(self.spool_dir)
+            except OSError:
+                if not os.path.isdir(self.spool_dir):
+                    raise
+
+    @staticmethod
+    def _remove(path):
+        """Remove a record."""
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _warn(message):
+        """Write a warning message to STDERR."""
+        sys.stderr.write('%s WARNING - %s\n' % (
+            get_current_time_string(), message))
+
+    def _lock(self):
+        """Acquire relay lock of the spool. Return True on success."""
+        handle = open(os.path.join(self.spool_dir, self.FILE_BASE_LOCK), 'ab')
+        try:
+            flock(handle, LOCK_EX | LOCK_NB)
+        except IOError:
+            handle.close()
+            return False
+        self.lock_handle = handle
+        return True
+
+    def _unlock(self):
+        """Release relay lock of the spool."""
+        if self.lock_handle is not None:
+            flock(self.lock_handle, LOCK_UN)
+            self.lock_handle.close()
+            self.lock_handle = None
+
+
+if __name__ == "__main__":
+    import unittest
+    from shutil import rmtree
+    from tempfile import mkdtemp
+
+    class _SuiteRuntimeServiceClient(object):
+        """Mock client, fail on "bad" task jobs."""
+
+        sent = []
+
+        def __init__(self, suite):
+            self.suite = suite
+            self.comms1 = {}
+
+        def put_messages_bulk(self, payloads):
+            for payload in payloads:
+                if payload['task_job'] == 'bad':
+                    raise ClientError('bad', 'bad')
+                if payload['task_job'] == 'gone':
+                    raise ClientInfoError(self.suite)
+            self.sent.append(payloads)
+
+    SuiteRuntimeServiceClient = _SuiteRuntimeServiceClient
+
+    class TestTaskMessageRelay(unittest.TestCase):
+        """Test TaskMessageRelay."""
+
+        def setUp(self):
+            self.tmpdir = mkdtemp()
+            self.relay = TaskMessageRelay('foo')
+            self.relay.spool_dir = self.tmpdir
+            self.relay.IDLE_TIMEOUT = 0.0
+            self.relay.RETRY_INTVL = 0.0
+            self.relay.MAX_BATCH_SIZE = 2
+            _SuiteRuntimeServiceClient.sent = []
+
+        def tearDown(self):
+            rmtree(self.tmpdir)
+
+        def _write(self, name, payload):
+            """Write a record."""
+            with open(os.path.join(self.tmpdir, name), 'wb') as handle:
+                json.dump(payload, handle)
+
+        def test_run(self):
+            """Records are sent in order in batches and removed."""
+            self._write('2.json', {'task_job': '1/t2/01'})
+            self._write('1.json', {'task_job': '1/t1/01'})
+            self._write('.tmp-0.json', {'task_job': '1/t0/01'})
+            self._write('3.json', {'task_job': '1/t3/01'})
+            self._write('gone.json', {'task_job': 'gone'})
+            self._write('gone2.json', {'task_job': '1/t4/01'})
+            self.relay.run()
+            # Batch of "gone" is discarded
+            self.assertEqual(
+                [[{'task_job': '1/t1/01'}, {'task_job': '1/t2/01'}],
+                 [{'task_job': '1/t4/01'}]],
+                _SuiteRuntimeServiceClient.sent)
+            self.assertEqual([], self.relay.get_records())
+            self.assertFalse(self.relay.is_running())
+
+        def test_relay_fail(self):
+            """Records are retained on send failure."""
+            self._write('1.json', {'task_job': '1/t1/01'})
+            self._write('2.json', {'task_job': 'bad'})
+            self._write('3.json', {'task_job': '1/t3/01'})
+            self.relay.MAX_BATCH_SIZE = 1
+            self.relay._relay(self.relay.get_records())
+            self.assertEqual(
+                [[{'task_job': '1/t1/01'}]], _SuiteRuntimeServiceClient.sent)
+            self.assertEqual(
+                [os.path.join(self.tmpdir, name)
+                 for name in ('2.json', '3.json')],
+                self.relay.get_records())
+
+        def test_lock(self):
+            """Only one relay per spool."""
+            self.assertFalse(self.relay.is_running())
+            self.assertTrue(self.relay._lock())
+            other = TaskMessageRelay('foo')
+            other.spool_dir = self.tmpdir
+            self.assertTrue(other.is_running())
+            self.assertFalse(other._lock())
+            other.run()  # returns immediately
+            self.relay._unlock()
+            self.assertFalse(other.is_running())
+
+        def test_put_timeout(self):
+            """A record remains in the spool if not consumed."""
+            self.relay.lock_handle = True  # pretend relay is running
+            self.assertFalse(self.relay.put({'task_job': '1/t1/01'}, 0.0))
+            records = self.relay.get_records()
+            self.assertEqual(1, len(records))
+            self.assertEqual(
+                {'task_job': '1/t1/01'}, json.load(open(records[0])))
+
+    unittest.main()
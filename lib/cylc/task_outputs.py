@@ -34,10 +34,6 @@ _SORT_ORDERS = (
     TASK_OUTPUT_SUCCEEDED,
     TASK_OUTPUT_FAILED)
 
-_TRIGGER = 0
-_MESSAGE = 1
-_IS_COMPLETED = 2
-
 
 class TaskOutputs(object):
     """Task output message manager.
@@ -52,105 +48,96 @@ class TaskOutputs(object):
                 trigger1 = message 1
 
     Can search item by message string or by trigger string.
+
+    The outputs themselves are held in a template shared by all task proxies
+    of task definitions with the same custom outputs. Each task proxy only
+    holds the completion state of its outputs, in an integer bitmask.
     """
 
     # Memory optimization - constrain possible attributes to this list.
-    __slots__ = ["_by_message", "_by_trigger"]
+    __slots__ = ["_template", "_completed"]
+
+    # Shared templates {(custom output, ...): _TaskOutputsTemplate, ...}
+    _TEMPLATES = {}
 
     def __init__(self, tdef):
-        self._by_message = {}
-        self._by_trigger = {}
-        # Add standard outputs.
-        for output in _SORT_ORDERS:
-            self.add(output)
-        # Add custom message outputs.
-        for trigger, message in tdef.outputs:
-            self.add(message, trigger)
-
-    def add(self, message, trigger=None, is_completed=False):
-        """Add a new output message"""
-        if trigger is None:
-            trigger = message
-        self._by_message[message] = [trigger, message, is_completed]
-        self._by_trigger[trigger] = self._by_message[message]
+        key = tuple(tdef.outputs)
+        try:
+            self._template = self._TEMPLATES[key]
+        except KeyError:
+            self._template = _TaskOutputsTemplate(key)
+            self._TEMPLATES[key] = self._template
+        # Bit i is set if output i of the template is completed.
+        self._completed = 0
 
     def all_completed(self):
         """Return True if all all outputs completed."""
-        return all(val[_IS_COMPLETED] for val in self._by_message.values())
+        return self._completed & self._template.mask == self._template.mask
 
     def exists(self, message=None, trigger=None):
         """Return True if message/trigger is identified as an output."""
         try:
-            return self._get_item(message, trigger) is not None
+            return self._get_index(message, trigger) is not None
         except KeyError:
             return False
 
     def get_all(self):
         """Return an iterator for all outputs."""
-        return sorted(self._by_message.values(), cmp=self._sort_by_message)
+        return [
+            [trigger, message, bool(self._completed & (1 << i))]
+            for i, trigger, message in self._template.items]
 
     def get_completed(self):
         """Return all completed output messages."""
-        ret = []
-        for value in self.get_all():
-            if value[_IS_COMPLETED]:
-                ret.append(value[_MESSAGE])
-        return ret
+        return [
+            message for i, _, message in self._template.items
+            if self._completed & (1 << i)]
 
     def get_completed_customs(self):
         """Return all completed custom outputs.
 
         Return a list in this form: [(trigger1, message1), ...]
         """
-        ret = []
-        for value in self.get_all():
-            if value[_IS_COMPLETED] and value[_TRIGGER] not in _SORT_ORDERS:
-                ret.append((value[_TRIGGER], value[_MESSAGE]))
-        return ret
+        return [
+            (trigger, message) for i, trigger, message in self._template.items
+            if self._completed & (1 << i) and trigger not in _SORT_ORDERS]
 
     def has_custom_triggers(self):
         """Return True if it has any custom triggers."""
-        return any(key not in _SORT_ORDERS for key in self._by_trigger)
+        return self._template.has_custom_triggers
 
     def get_not_completed(self):
         """Return all not-completed output messages."""
-        ret = []
-        for value in self.get_all():
-            if not value[_IS_COMPLETED]:
-                ret.append(value[_MESSAGE])
-        return ret
+        return [
+            message for i, _, message in self._template.items
+            if not self._completed & (1 << i)]
 
     def is_completed(self, message=None, trigger=None):
         """Return True if output of message is completed."""
         try:
-            return self._get_item(message, trigger)[_IS_COMPLETED]
+            return bool(self._completed & (1 << self._get_index(
+                message, trigger)))
         except KeyError:
             return False
 
-    def remove(self, message=None, trigger=None):
-        """Remove an output by message, if it exists."""
-        try:
-            trigger, message = self._get_item(message, trigger)[:2]
-        except KeyError:
-            pass
-        else:
-            del self._by_message[message]
-            del self._by_trigger[trigger]
-
     def set_all_completed(self):
         """Set all outputs to complete."""
-        for value in self._by_message.values():
-            value[_IS_COMPLETED] = True
+        self._completed |= self._template.mask
 
     def set_all_incomplete(self):
         """Set all outputs to incomplete."""
-        for value in self._by_message.values():
-            value[_IS_COMPLETED] = False
+        self._completed &= ~self._template.mask
 
     def set_completion(self, message, is_completed):
         """Set output message completion status to is_completed (bool)."""
-        if message in self._by_message:
-            self._by_message[message][_IS_COMPLETED] = is_completed
+        try:
+            bit = 1 << self._template.by_message[message]
+        except KeyError:
+            return
+        if is_completed:
+            self._completed |= bit
+        else:
+            self._completed &= ~bit
 
     def set_msg_trg_completion(self, message=None, trigger=None,
                                is_completed=True):
@@ -161,40 +148,136 @@ class TaskOutputs(object):
 
         """
         try:
-            item = self._get_item(message, trigger)
-            old_is_completed = item[_IS_COMPLETED]
-            item[_IS_COMPLETED] = is_completed
+            bit = 1 << self._get_index(message, trigger)
         except KeyError:
             return None
+        old_is_completed = bool(self._completed & bit)
+        if is_completed:
+            self._completed |= bit
         else:
-            return bool(old_is_completed) != bool(is_completed)
+            self._completed &= ~bit
+        return old_is_completed != bool(is_completed)
 
-    def _get_item(self, message, trigger):
-        """Return self._by_trigger[trigger] or self._by_message[message].
+    def _get_index(self, message, trigger):
+        """Return index of output by trigger or by message.
 
         whichever is relevant.
         """
         if message is None:
-            return self._by_trigger[trigger]
+            return self._template.by_trigger[trigger]
         else:
-            return self._by_message[message]
+            return self._template.by_message[message]
+
+
+class _TaskOutputsTemplate(object):
+    """Outputs of task definitions with the same custom outputs.
+
+    Attributes:
+        .by_message (dict):
+            Index of each output by message.
+        .by_trigger (dict):
+            Index of each output by trigger.
+        .has_custom_triggers (bool):
+            True if there are any custom triggers.
+        .items (list):
+            Outputs as [(index, trigger, message), ...], sorted by message.
+        .mask (int):
+            Bits of all outputs.
+    """
+
+    __slots__ = [
+        "by_message", "by_trigger", "has_custom_triggers", "items", "mask"]
+
+    def __init__(self, custom_outputs):
+        self.by_message = {}
+        self.by_trigger = {}
+        outputs = []
+        # Standard outputs, then custom message outputs. A later output
+        # replaces an earlier one with the same message.
+        for trigger, message in (
+                [(output, output) for output in _SORT_ORDERS] +
+                list(custom_outputs)):
+            self.by_message[message] = len(outputs)
+            self.by_trigger[trigger] = len(outputs)
+            outputs.append((trigger, message))
+        self.has_custom_triggers = any(
+            key not in _SORT_ORDERS for key in self.by_trigger)
+        self.items = sorted(
+            [(i,) + outputs[i] for i in set(self.by_message.values())],
+            cmp=self._sort_by_message)
+        self.mask = 0
+        for i in self.by_message.values():
+            self.mask |= 1 << i
 
     @staticmethod
     def _sort_by_message(item1, item2):
-        """Compare by _MESSAGE."""
+        """Compare by message."""
         try:
-            idx1 = _SORT_ORDERS.index(item1[_MESSAGE])
+            idx1 = _SORT_ORDERS.index(item1[2])
         except ValueError:
             idx1 = None
         try:
-            idx2 = _SORT_ORDERS.index(item2[_MESSAGE])
+            idx2 = _SORT_ORDERS.index(item2[2])
         except ValueError:
             idx2 = None
         if idx1 is None and idx2 is None:
-            return cmp(item1[_MESSAGE], item2[_MESSAGE])
+            return cmp(item1[2], item2[2])
         elif idx1 is None:
             return 1
         elif idx2 is None:
             return -1
         else:
             return cmp(idx1, idx2)
+
+
+if __name__ == "__main__":
+    import unittest
+
+    class _TaskDef(object):
+        """Mock TaskDef, with custom outputs."""
+
+        def __init__(self, outputs):
+            self.outputs = outputs
+
+    class TestTaskOutputs(unittest.TestCase):
+        """Test TaskOutputs."""
+
+        def test_completion(self):
+            """Completion state is per instance, outputs are shared."""
+            tdef = _TaskDef([('greet', 'hello world')])
+            outputs1 = TaskOutputs(tdef)
+            outputs2 = TaskOutputs(_TaskDef(list(tdef.outputs)))
+            self.assertIs(outputs1._template, outputs2._template)
+            self.assertTrue(outputs1.has_custom_triggers())
+            self.assertTrue(outputs1.set_msg_trg_completion(trigger='greet'))
+            self.assertFalse(outputs1.set_msg_trg_completion(trigger='greet'))
+            self.assertIsNone(outputs1.set_msg_trg_completion(trigger='bye'))
+            outputs1.set_completion(TASK_OUTPUT_SUBMITTED, True)
+            self.assertTrue(outputs1.is_completed('hello world'))
+            self.assertFalse(outputs2.is_completed('hello world'))
+            self.assertEqual(
+                [TASK_OUTPUT_SUBMITTED, 'hello world'],
+                outputs1.get_completed())
+            self.assertEqual(
+                [('greet', 'hello world')], outputs1.get_completed_customs())
+            self.assertEqual(
+                [output for output in _SORT_ORDERS
+                 if output != TASK_OUTPUT_SUBMITTED],
+                outputs1.get_not_completed())
+            outputs1.set_all_completed()
+            self.assertTrue(outputs1.all_completed())
+            outputs1.set_all_incomplete()
+            self.assertEqual([], outputs1.get_completed())
+
+        def test_get_all(self):
+            """Outputs are sorted, standard outputs first."""
+            outputs = TaskOutputs(_TaskDef([('b', 'b'), ('a', 'a')]))
+            self.assertTrue(outputs.exists(trigger='a'))
+            self.assertFalse(outputs.exists('c'))
+            outputs.set_completion('a', True)
+            self.assertEqual(
+                [[output, output, False] for output in _SORT_ORDERS] +
+                [['a', 'a', True], ['b', 'b', False]],
+                outputs.get_all())
+
+    unittest.main()
@@ -36,6 +36,7 @@ import json
 from time import time
 
 from cylc.config import SuiteConfigError
+from cylc.cycle_point_index import CyclePointIndex
 from cylc.cycling.loader import get_point, standardise_point_string
 from cylc.suite_logging import LOG
 from cylc.task_action_timer import TaskActionTimer
@@ -46,7 +47,7 @@ from cylc.task_id import TaskID
 from cylc.task_job_logs import get_task_job_id
 from cylc.task_proxy import TaskProxy
 from cylc.task_state import (
-    TASK_STATUSES_ACTIVE, TASK_STATUSES_NOT_STALLED,
+    TASK_STATUSES_ACTIVE, TASK_STATUSES_FINISHED, TASK_STATUSES_NOT_STALLED,
     TASK_STATUS_HELD, TASK_STATUS_WAITING, TASK_STATUS_EXPIRED,
     TASK_STATUS_QUEUED, TASK_STATUS_READY, TASK_STATUS_SUBMITTED,
     TASK_STATUS_SUBMIT_FAILED, TASK_STATUS_SUBMIT_RETRYING,
@@ -69,6 +70,9 @@ class TaskPool(object):
     STOP_REQUEST_NOW = 'REQUEST(NOW)'
     STOP_REQUEST_NOW_NOW = 'REQUEST(NOW-NOW)'
 
+    # Log progress of loading task proxies for restart every N tasks.
+    LOAD_PROGRESS_TASKS = 10000
+
     def __init__(self, config, stop_point, suite_db_mgr, task_events_mgr,
                  proc_pool, xtrigger_mgr):
         self.config = config
@@ -77,6 +81,8 @@ class TaskPool(object):
         self.task_events_mgr = task_events_mgr
         self.proc_pool = proc_pool
         self.xtrigger_mgr = xtrigger_mgr
+        self.dep_broker = task_events_mgr.dep_broker
+        self.readiness = task_events_mgr.readiness
 
         self.do_reload = False
         self.custom_runahead_limit = self.config.get_custom_runahead_limit()
@@ -88,6 +94,17 @@ class TaskPool(object):
 
         self.pool = {}
         self.runahead_pool = {}
+        # Task proxies in self.pool and self.runahead_pool, by ID
+        self.itask_id_map = {}
+        # Sorted cycle points of tasks in self.pool and self.runahead_pool,
+        # and of unfinished tasks in either
+        self.pool_points = CyclePointIndex()
+        self.rhpool_points = CyclePointIndex()
+        self.unfinished_points = CyclePointIndex()
+        # Finished tasks in self.runahead_pool, to release immediately
+        self.rhpool_finished = set()
+        # (One bound method for the status listener of all task proxies.)
+        self._status_listener = self._update_task_status
         self.myq = {}
         self.queues = {}
         self.assign_queues()
@@ -214,9 +231,17 @@ class TaskPool(object):
             itask.state.set_held()
 
         # add to the runahead pool
-        self.runahead_pool.setdefault(itask.point, OrderedDict())
+        if itask.point not in self.runahead_pool:
+            self.runahead_pool[itask.point] = OrderedDict()
         self.runahead_pool[itask.point][itask.identity] = itask
+        self.itask_id_map[itask.identity] = itask
         self.rhpool_changed = True
+        self.rhpool_points.add(itask.point)
+        if itask.state.status in TASK_STATUSES_FINISHED:
+            self.rhpool_finished.add(itask)
+        else:
+            self.unfinished_points.add(itask.point)
+        itask.state.status_listener = self._status_listener
 
         # add row to "task_states" table
         if is_new and itask.submit_num == 0:
@@ -239,36 +264,17 @@ class TaskPool(object):
 
         # Any finished tasks can be released immediately (this can happen at
         # restart when all tasks are initially loaded into the runahead pool).
-        for itask_id_maps in self.runahead_pool.copy().values():
-            for itask in itask_id_maps.copy().values():
-                if itask.state.status in [TASK_STATUS_FAILED,
-                                          TASK_STATUS_SUCCEEDED,
-                                          TASK_STATUS_EXPIRED]:
-                    self.release_runahead_task(itask)
-                    released = True
+        for itask in sorted(
+                self.rhpool_finished, key=lambda itask: itask.identity):
+            self.release_runahead_task(itask)
+            released = True
 
         limit = self.max_num_active_cycle_points
 
-        points = []
-        for point, itasks in sorted(
-                self.get_tasks_by_point(incl_runahead=True).items()):
-            has_unfinished_itasks = False
-            for itask in itasks:
-                if itask.state.status not in [TASK_STATUS_FAILED,
-                                              TASK_STATUS_SUCCEEDED,
-                                              TASK_STATUS_EXPIRED]:
-                    has_unfinished_itasks = True
-                    break
-            if not points and not has_unfinished_itasks:
-                # We need to begin with an unfinished cycle point.
-                continue
-            points.append(point)
-
-        if not points:
-            return False
-
         # Get the earliest point with unfinished tasks.
-        runahead_base_point = min(points)
+        runahead_base_point = self.unfinished_points.get_first()
+        if runahead_base_point is None:
+            return released
 
         # Get all cycling points possible after the runahead base point.
         if (self._prev_runahead_base_point is not None and
@@ -284,15 +290,20 @@ class TaskPool(object):
                     if point is None:
                         break
                     sequence_points.append(point)
-            sequence_points = set(sequence_points)
+            sequence_points = sorted(set(sequence_points))
             self._prev_runahead_sequence_points = sequence_points
             self._prev_runahead_base_point = runahead_base_point
 
-        points = set(points).union(sequence_points)
-
         if self.custom_runahead_limit is None:
             # Calculate which tasks to release based on a maximum number of
             # active cycle points (active meaning non-finished tasks).
+            # The first "limit" points of the pools from the base point, and
+            # of the sequences, include the first "limit" points of all.
+            points = set(sequence_points[:limit])
+            points.update(
+                self.pool_points.get_points_from(runahead_base_point, limit))
+            points.update(
+                self.rhpool_points.get_points_from(runahead_base_point, limit))
             latest_allowed_point = sorted(points)[:limit][-1]
             if self.max_future_offset is not None:
                 # For the first N points, release their future trigger tasks.
@@ -317,11 +328,10 @@ class TaskPool(object):
         if self.stop_point and latest_allowed_point > self.stop_point:
             latest_allowed_point = self.stop_point
 
-        for point, itask_id_map in self.runahead_pool.copy().items():
-            if point <= latest_allowed_point:
-                for itask in itask_id_map.copy().values():
-                    self.release_runahead_task(itask)
-                    released = True
+        for point in self.rhpool_points.get_points_until(latest_allowed_point):
+            for itask in list(self.runahead_pool[point].values()):
+                self.release_runahead_task(itask)
+                released = True
         return released
 
     def load_db_task_pool_for_restart(self, row_idx, row):
@@ -341,6 +351,8 @@ class TaskPool(object):
         """
         if row_idx == 0:
             LOG.info("LOADING task proxies")
+        elif row_idx % self.LOAD_PROGRESS_TASKS == 0:
+            LOG.info("LOADING task proxies: %d loaded" % row_idx)
         (cycle, name, spawned, is_late, status, hold_swap, submit_num, _,
          user_at_host, time_submit, time_run, timeout,
          outputs_str) = row
@@ -457,6 +469,7 @@ class TaskPool(object):
                 return
             itask.poll_timer = TaskActionTimer(
                 ctx, delays, num, delay, timeout)
+            self.task_events_mgr.put_job_timers(itask)
         elif ctx_key[0] == "try_timers":
             itask = self.get_task_by_id(id_)
             if itask is None:
@@ -471,8 +484,8 @@ class TaskPool(object):
             if isinstance(key1, list):
                 key1 = tuple(key1)
             key = (key1, cycle, name, submit_num)
-            self.task_events_mgr.event_timers[key] = TaskActionTimer(
-                ctx, delays, num, delay, timeout)
+            self.task_events_mgr.put_event_timer(key, TaskActionTimer(
+                ctx, delays, num, delay, timeout))
         else:
             LOG.exception(
                 "%(id)s: skip action timer %(ctx_key)s" %
@@ -486,16 +499,23 @@ class TaskPool(object):
             queue = self.myq[itask.tdef.name]
         except KeyError:
             queue = self.config.Q_DEFAULT
-        self.queues.setdefault(queue, OrderedDict())
+        if queue not in self.queues:
+            self.queues[queue] = OrderedDict()
         self.queues[queue][itask.identity] = itask
         self.pool.setdefault(itask.point, {})
         self.pool[itask.point][itask.identity] = itask
         self.pool_changed = True
+        self.dep_broker.add_task(itask)
+        self.readiness.add_task(itask)
+        self.task_events_mgr.put_job_timers(itask)
         LOG.debug("released to the task pool", itask=itask)
         del self.runahead_pool[itask.point][itask.identity]
         if not self.runahead_pool[itask.point]:
             del self.runahead_pool[itask.point]
         self.rhpool_changed = True
+        self.rhpool_points.remove(itask.point)
+        self.rhpool_finished.discard(itask)
+        self.pool_points.add(itask.point)
         if itask.tdef.max_future_prereq_offset is not None:
             self.set_max_future_offset()
 
@@ -508,7 +528,11 @@ class TaskPool(object):
         else:
             if not self.runahead_pool[itask.point]:
                 del self.runahead_pool[itask.point]
+            del self.itask_id_map[itask.identity]
             self.rhpool_changed = True
+            self.rhpool_points.remove(itask.point)
+            self.rhpool_finished.discard(itask)
+            self._unindex_status(itask)
             return
 
         # remove from queue
@@ -517,7 +541,12 @@ class TaskPool(object):
         del self.pool[itask.point][itask.identity]
         if not self.pool[itask.point]:
             del self.pool[itask.point]
+        del self.itask_id_map[itask.identity]
         self.pool_changed = True
+        self.pool_points.remove(itask.point)
+        self._unindex_status(itask)
+        self.dep_broker.remove_task(itask)
+        self.readiness.remove_task(itask)
         msg = "task proxy removed"
         if reason:
             msg += " (%s)" % reason
@@ -526,6 +555,29 @@ class TaskPool(object):
             self.set_max_future_offset()
         del itask
 
+    def _unindex_status(self, itask):
+        """Unindex the status of a task proxy on removal from the pool."""
+        itask.state.status_listener = None
+        if itask.state.status not in TASK_STATUSES_FINISHED:
+            self.unfinished_points.remove(itask.point)
+
+    def _update_task_status(self, id_, prev_status, status):
+        """Update the indexes of unfinished tasks on change of task status.
+
+        This is the status listener of the task proxies in the pool.
+        """
+        is_finished = status in TASK_STATUSES_FINISHED
+        if is_finished == (prev_status in TASK_STATUSES_FINISHED):
+            return
+        itask = self.itask_id_map[id_]
+        if is_finished:
+            self.unfinished_points.remove(itask.point)
+            if id_ in self.runahead_pool.get(itask.point, {}):
+                self.rhpool_finished.add(itask)
+        else:
+            self.unfinished_points.add(itask.point)
+            self.rhpool_finished.discard(itask)
+
     def get_all_tasks(self):
         """Return a list of all task proxies."""
         return self.get_rh_tasks() + self.get_tasks()
@@ -562,16 +614,17 @@ class TaskPool(object):
             point_itasks[point].extend(itask_id_map.values())
         return point_itasks
 
-    def get_task_by_id(self, id_):
+    def get_task_by_id(self, id_, incl_runahead=True):
         """Return task by ID is in the runahead_pool or pool.
 
-        Return None if task does not exist.
+        Return None if task does not exist, or if it is in the runahead_pool
+        and incl_runahead is False.
         """
-        for itask_ids in self.queues.values() + self.runahead_pool.values():
-            try:
-                return itask_ids[id_]
-            except KeyError:
-                pass
+        itask = self.itask_id_map.get(id_)
+        if (itask is not None and not incl_runahead and
+                id_ not in self.pool.get(itask.point, {})):
+            return None
+        return itask
 
     def get_ready_tasks(self):
         """
@@ -657,27 +710,15 @@ class TaskPool(object):
 
     def get_min_point(self):
         """Return the minimum cycle point currently in the pool."""
-        cycles = self.pool.keys()
-        minc = None
-        if cycles:
-            minc = min(cycles)
-        return minc
+        return self.pool_points.get_first()
 
     def get_max_point(self):
         """Return the maximum cycle point currently in the pool."""
-        cycles = self.pool.keys()
-        maxc = None
-        if cycles:
-            maxc = max(cycles)
-        return maxc
+        return self.pool_points.get_last()
 
     def get_max_point_runahead(self):
         """Return the maximum cycle point currently in the runahead pool."""
-        cycles = self.runahead_pool.keys()
-        maxc = None
-        if cycles:
-            maxc = max(cycles)
-        return maxc
+        return self.rhpool_points.get_last()
 
     def set_max_future_offset(self):
         """Calculate the latest required future trigger offset."""
@@ -899,6 +940,9 @@ class TaskPool(object):
         itasks, bad_items = self.filter_task_proxies(items)
         for itask in itasks:
             itask.state.unset_held()
+            # Release to waiting unsets prerequisites.
+            self.dep_broker.put_prerequisites(itask)
+            self.readiness.put(itask)
         return len(bad_items)
 
     def hold_all_tasks(self):
@@ -934,19 +978,12 @@ class TaskPool(object):
         """Run time dependency negotiation.
 
         Tasks attempt to get their prerequisites satisfied by other tasks'
-        outputs. Brokered negotiation is O(n) in number of tasks.
+        outputs. Brokered negotiation is incremental: only outputs completed,
+        and prerequisites added or reset, since the last negotiation are
+        matched, via the reverse index of the dependency broker.
 
         """
-        all_task_outputs = set()
-        for itask in self.get_tasks():
-            for output in itask.state.outputs.get_completed():
-                all_task_outputs.add((itask.tdef.name,
-                                      str(itask.point),
-                                      output))
-        for itask in self.get_tasks():
-            # Try to satisfy itask if not already satisfied.
-            if itask.state.prerequisites_are_not_all_satisfied():
-                itask.state.satisfy_me(all_task_outputs)
+        self.dep_broker.process()
 
     def force_spawn(self, itask):
         """Spawn successor of itask."""
@@ -1078,6 +1115,8 @@ class TaskPool(object):
             if status and status != itask.state.status:
                 LOG.info("resetting state to %s" % status, itask=itask)
                 itask.state.reset_state(status)
+                if status == TASK_STATUS_WAITING:
+                    self.dep_broker.put_prerequisites(itask)
                 if status in [TASK_STATUS_FAILED, TASK_STATUS_SUCCEEDED]:
                     itask.set_summary_time('finished',
                                            get_current_time_string())
@@ -1114,6 +1153,8 @@ class TaskPool(object):
                                 "reset output to incomplete: %s" % output,
                                 itask=itask)
                 self.suite_db_mgr.put_update_task_outputs(itask)
+            self.dep_broker.put_outputs(itask)
+            self.readiness.put(itask)
         return len(bad_items)
 
     def remove_tasks(self, items, spawn=False):
@@ -1142,6 +1183,7 @@ class TaskPool(object):
             itask.manual_trigger = True
             if not itask.state.status == TASK_STATUS_QUEUED:
                 itask.state.reset_state(TASK_STATUS_READY)
+            self.readiness.put(itask)
         return n_warnings
 
     def check_auto_shutdown(self):
@@ -1182,16 +1224,73 @@ class TaskPool(object):
                         (itask.get_try_num() == 1 or
                          not conf['fail try 1 only'])):
                     message_queue.put(
-                        (job_d, now_str, 'CRITICAL', TASK_STATUS_FAILED))
+                        [(job_d, now_str, 'CRITICAL', TASK_STATUS_FAILED)])
                 else:
                     # Simulate message outputs.
+                    items = []
                     for msg in itask.tdef.rtconfig['outputs'].values():
-                        message_queue.put((job_d, now_str, 'INFO', msg))
-                    message_queue.put(
+                        items.append((job_d, now_str, 'INFO', msg))
+                    items.append(
                         (job_d, now_str, 'INFO', TASK_STATUS_SUCCEEDED))
+                    message_queue.put(items)
                 sim_task_state_changed = True
         return sim_task_state_changed
 
+    def match_ext_triggers(self, broadcast_mgr):
+        """Match queued external triggers to the tasks waiting on them.
+
+        Return True if any task has a newly satisfied external trigger.
+        """
+        has_changed = False
+        for itask in sorted(
+                self.readiness.get_ext_trigger_tasks(
+                    broadcast_mgr.ext_triggers),
+                key=lambda itask: (itask.point, itask.identity)):
+            if broadcast_mgr.match_ext_trigger(itask):
+                self.readiness.put_ext_triggers(itask)
+                has_changed = True
+        return has_changed
+
+    def check_ready_tasks(self, now):
+        """Check expiry and readiness of tasks that may have changed.
+
+        Only tasks released, messaged or commanded since the last check, or
+        with a clock trigger, expiry or retry time now past, are checked.
+        Future clock trigger, expiry and retry times of checked tasks are
+        put back to the readiness tracker.
+
+        Return True if any task has expired or is ready to run.
+        """
+        process = False
+        for itask in self.readiness.get_tasks_to_check(now):
+            # Task expiry and readiness must be checked regardless, so they
+            # need to be in separate "if ..." blocks.
+            if self.set_expired_task(itask, now):
+                process = True
+            if itask.is_ready(now):
+                process = True
+            for wake_time in self._get_wake_times(itask, now):
+                self.readiness.put_wake_time(itask, wake_time)
+        return process
+
+    @staticmethod
+    def _get_wake_times(itask, now):
+        """Return future clock trigger, expiry and retry times of itask."""
+        wake_times = []
+        if itask.state.status == TASK_STATUS_WAITING:
+            if itask.is_waiting_clock(now):
+                wake_times.append(itask.clock_trigger_time)
+            if itask.expire_time is not None and itask.expire_time >= now:
+                wake_times.append(itask.expire_time)
+        try:
+            timeout = itask.try_timers[itask.state.status].timeout
+        except KeyError:
+            pass
+        else:
+            if timeout is not None and timeout >= now:
+                wake_times.append(timeout)
+        return wake_times
+
     def set_expired_task(self, itask, now):
         """Check if task has expired. Set state and event handler if so.
 
@@ -1209,6 +1308,7 @@ class TaskPool(object):
             LOG.warning(msg, itask=itask)
             self.task_events_mgr.setup_event_handlers(itask, "expired", msg)
             itask.state.reset_state(TASK_STATUS_EXPIRED)
+            self.dep_broker.put_outputs(itask)
             return True
         return False
 
@@ -1333,7 +1433,17 @@ class TaskPool(object):
                         # point_str may be a glob
                         pass
                 tasks_found = False
-                for itask in self.get_all_tasks():
+                candidates = None
+                if not any(
+                        char in point_str + name_str for char in '*?['):
+                    # Look up a task by ID, unless name is a family name
+                    itask = self.itask_id_map.get(
+                        TaskID.get(name_str, point_str))
+                    if itask is not None:
+                        candidates = [itask]
+                if candidates is None:
+                    candidates = self.get_all_tasks()
+                for itask in candidates:
                     nss = itask.tdef.namespace_hierarchy
                     if (fnmatchcase(str(itask.point), point_str) and
                             (not status or itask.state.status == status) and
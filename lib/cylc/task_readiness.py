@@ -0,0 +1,128 @@
+#!/usr/bin/env python2
+
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2018 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Track which task proxies need a readiness check.
+
+A task proxy in the (main) task pool only needs to be checked for readiness
+(or expiry) when something has happened to it, e.g. it has been released to
+the pool, or has received a message or a command, or when one of its clock
+trigger, expiry or retry times falls due. The first case is recorded in a set
+of "dirty" task proxies, the second in a heap keyed by due time, so the main
+loop does not need to sweep the whole pool on each iteration.
+
+Task proxies waiting on old-style external triggers are also indexed by
+trigger message, so that queued external triggers are only matched against
+the task proxies that are waiting on them.
+"""
+
+from cylc.task_action_timer import TaskActionTimerQueue
+
+
+class TaskReadiness(object):
+    """Dirty set and wake time heap of task proxies in the task pool.
+
+    Attributes:
+        .ext_trigger_tasks (dict):
+            Sets of task proxies by unsatisfied external trigger message.
+        .itasks (dict):
+            Task proxies in the task pool by task ID.
+    """
+
+    def __init__(self):
+        self.itasks = {}
+        self.ext_trigger_tasks = {}
+        self._dirty = set()
+        self._wake_times = TaskActionTimerQueue()
+
+    def add_task(self, itask):
+        """Add a task proxy on release to the task pool.
+
+        The task proxy will be checked on the next "get_tasks_to_check".
+        """
+        self.itasks[itask.identity] = itask
+        for trig, satisfied in itask.state.external_triggers.items():
+            if not satisfied:
+                self.ext_trigger_tasks.setdefault(trig, set()).add(itask)
+        self._dirty.add(itask)
+
+    def remove_task(self, itask):
+        """Remove a task proxy, e.g. on removal from the task pool.
+
+        Its wake times, if any, are discarded lazily.
+        """
+        if self.itasks.get(itask.identity) is itask:
+            del self.itasks[itask.identity]
+        self._dirty.discard(itask)
+        self._remove_ext_triggers(itask, itask.state.external_triggers)
+
+    def put(self, itask):
+        """Mark a task proxy for a check on the next "get_tasks_to_check"."""
+        if self.itasks.get(itask.identity) is itask:
+            self._dirty.add(itask)
+
+    def put_wake_time(self, itask, wake_time):
+        """Check a task proxy when wake_time (seconds since epoch) is past."""
+        self._wake_times.put(itask, wake_time)
+
+    def get_next_wake_time(self):
+        """Return the earliest wake time, or None if there is none."""
+        return self._wake_times.get_next_due_time()
+
+    def get_tasks_to_check(self, now):
+        """Return (and reset) the set of task proxies to check.
+
+        These are the "dirty" task proxies, and task proxies with a wake time
+        at or before "now".
+        """
+        itasks = self._dirty
+        self._dirty = set()
+        for itask in self._wake_times.pop_due(now):
+            if self.itasks.get(itask.identity) is itask:
+                itasks.add(itask)
+        return itasks
+
+    def get_ext_trigger_tasks(self, ext_triggers):
+        """Return task proxies waiting on any of the queued ext_triggers.
+
+        ext_triggers -- a collection of (message, ID) items, e.g.
+        BroadcastMgr.ext_triggers.
+        """
+        itasks = set()
+        for message, _ in ext_triggers:
+            itasks.update(self.ext_trigger_tasks.get(message, ()))
+        return itasks
+
+    def put_ext_triggers(self, itask):
+        """Update index after the external triggers of itask are matched.
+
+        The task proxy is also marked for a check.
+        """
+        self._remove_ext_triggers(itask, [
+            trig for trig, satisfied in itask.state.external_triggers.items()
+            if satisfied])
+        self.put(itask)
+
+    def _remove_ext_triggers(self, itask, triggers):
+        """Remove itask from the index of the given external triggers."""
+        for trig in triggers:
+            try:
+                itasks = self.ext_trigger_tasks[trig]
+                itasks.discard(itask)
+            except KeyError:
+                continue
+            if not itasks:
+                del self.ext_trigger_tasks[trig]
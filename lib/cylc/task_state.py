@@ -116,6 +116,13 @@ TASK_STATUSES_FINAL = set([
     TASK_STATUS_SUBMIT_FAILED,
 ])
 
+# Task statuses of finished tasks, which do not hold back the runahead limit.
+TASK_STATUSES_FINISHED = set([
+    TASK_STATUS_EXPIRED,
+    TASK_STATUS_SUCCEEDED,
+    TASK_STATUS_FAILED,
+])
+
 # Task statuses that are never active.
 # For tasks that have never been submitted, but excluding:
 # - expired: which is effectively the "succeeded" final state.
@@ -187,13 +194,17 @@ class TaskState(object):
     __slots__ = ["identity", "status", "hold_swap",
                  "_is_satisfied", "_suicide_is_satisfied", "prerequisites",
                  "suicide_prerequisites", "external_triggers", "outputs",
-                 "xtriggers", "xclock", "kill_failed", "time_updated"]
+                 "xtriggers", "xclock", "kill_failed", "time_updated",
+                 "status_listener"]
 
     def __init__(self, tdef, point, status, hold_swap):
         self.identity = TaskID.get(tdef.name, str(point))
         self.status = status
         self.hold_swap = hold_swap
         self.time_updated = None
+        # Called as status_listener(identity, prev_status, status) on change
+        # of status, e.g. by the task pool to index unfinished tasks.
+        self.status_listener = None
 
         self._is_satisfied = None
         self._suicide_is_satisfied = None
@@ -404,6 +415,8 @@ class TaskState(object):
         self.status = status
         self.time_updated = get_current_time_string()
         flags.iflag = True
+        if self.status_listener is not None and self.status != prev_status:
+            self.status_listener(self.identity, prev_status, self.status)
         # Log
         message = str(prev_status)
         if prev_hold_swap:
@@ -450,5 +463,5 @@ class TaskState(object):
                 cpre = Prerequisite(point, tdef.start_point)
                 cpre.add(tdef.name, p_prev, TASK_STATUS_SUCCEEDED,
                          p_prev < tdef.start_point)
-                cpre.set_condition(tdef.name)
+                cpre.set_condition()
                 self.prerequisites.append(cpre)
@@ -17,7 +17,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from cylc.cycling.loader import get_point_relative
-from cylc.prerequisite import Prerequisite
+from cylc.prerequisite import (
+    Condition, Prerequisite, TriggerExpressionError)
 from cylc.task_outputs import (
     TASK_OUTPUT_EXPIRED, TASK_OUTPUT_SUBMITTED, TASK_OUTPUT_SUBMIT_FAILED,
     TASK_OUTPUT_STARTED, TASK_OUTPUT_SUCCEEDED, TASK_OUTPUT_FAILED)
@@ -126,12 +127,16 @@ class Dependency(object):
 
     """
 
-    __slots__ = ['_exp', 'task_triggers', 'suicide']
+    __slots__ = ['_exp', 'task_triggers', 'suicide', '_condition',
+                 '_is_conditional']
 
     def __init__(self, exp, task_triggers, suicide):
         self._exp = exp
         self.task_triggers = tuple(task_triggers)  # More memory efficient.
         self.suicide = suicide
+        # Compiled condition, over the bits of task_triggers, on demand.
+        self._condition = None
+        self._is_conditional = None
 
     def get_prerequisite(self, point, tdef):
         """Generate a Prerequisite object from this dependency.
@@ -145,39 +150,99 @@ class Dependency(object):
             cylc.prerequisite.Prerequisite
 
         """
-        # Create Prerequisite.
-        cpre = Prerequisite(point, tdef.start_point)
-
-        # Loop over TaskTrigger instances.
-        for task_trigger in self.task_triggers:
-            if task_trigger.cycle_point_offset is not None:
-                # Inter-cycle trigger - compute the trigger's cycle point from
-                # its offset.
-                prereq_offset_point = get_point_relative(
-                    task_trigger.cycle_point_offset, point)
-                if prereq_offset_point > point:
-                    # Update tdef.max_future_prereq_offset.
-                    prereq_offset = prereq_offset_point - point
-                    if (tdef.max_future_prereq_offset is None or
-                            (prereq_offset >
-                             tdef.max_future_prereq_offset)):
-                        tdef.max_future_prereq_offset = (
-                            prereq_offset)
-                pre_initial = ((prereq_offset_point < tdef.start_point) &
-                               (point >= tdef.start_point))
-                cpre.add(task_trigger.task_name,
-                         task_trigger.get_point(point),
-                         task_trigger.output,
-                         pre_initial)
-            else:
-                # Trigger is within the same cycle point.
-                # Register task message with Prerequisite object.
-                cpre.add(task_trigger.task_name,
-                         task_trigger.get_point(point),
-                         task_trigger.output)
-        cpre.set_condition(self.get_expression(point))
+        if self._is_conditional is None:
+            self._compile(point)
+        # Messages are resolved from this dependency on demand, but check
+        # for future and pre-initial triggers now.
+        cpre = Prerequisite(point, tdef.start_point, self)
+        for i, task_trigger in enumerate(self.task_triggers):
+            trigger_point = task_trigger.get_point(point)
+            if (task_trigger.cycle_point_offset is not None and
+                    trigger_point > point):
+                # Inter-cycle trigger - update tdef.max_future_prereq_offset.
+                prereq_offset = trigger_point - point
+                if (tdef.max_future_prereq_offset is None or
+                        prereq_offset > tdef.max_future_prereq_offset):
+                    tdef.max_future_prereq_offset = prereq_offset
+            cpre.drop_pre_initial(i, trigger_point)
+        cpre.set_condition(self._condition)
         return cpre
 
+    def get_messages(self, point):
+        """Return the messages of the prerequisite at point.
+
+        Args:
+            point (cylc.cycling.PointBase): The cycle point of the dependent
+                task.
+
+        Returns:
+            list: [('task name', 'point string', 'output'), ...], in the
+            order of self.task_triggers.
+
+        """
+        return [
+            (task_trigger.task_name, str(task_trigger.get_point(point)),
+             task_trigger.output)
+            for task_trigger in self.task_triggers]
+
+    def is_conditional(self):
+        """Return True if the expression has an "|".
+
+        (Only known after the first prerequisite is generated.)
+        """
+        return bool(self._is_conditional)
+
+    def _compile(self, point):
+        """Compile the expression into a Condition over task_triggers.
+
+        Bit i of the condition represents the i-th task trigger, which is
+        also the i-th message added to each prerequisite.
+
+        Raise TriggerExpressionError if the expression is a conditional one
+        and contains an xtrigger label. (Point is only used in the message.)
+        """
+        indices = dict(
+            (id(trigger), i) for i, trigger in enumerate(self.task_triggers))
+        is_conditional = self._is_conditional_list(self._exp)
+        try:
+            self._condition = self._compile_list(
+                self._exp, indices, is_conditional)
+        except ValueError:
+            raise TriggerExpressionError(
+                '"%s"' % self.get_expression(point))
+        self._is_conditional = is_conditional
+
+    @classmethod
+    def _compile_list(cls, nested_expr, indices, is_conditional):
+        """Compile a nested list of TaskTrigger objects.
+
+        "&" takes precedence over "|", as in the graph.
+        """
+        and_items_list = [[]]
+        for item in nested_expr:
+            if isinstance(item, TaskTrigger):
+                and_items_list[-1].append(indices[id(item)])
+            elif isinstance(item, list):
+                and_items_list[-1].append(
+                    cls._compile_list(item, indices, is_conditional))
+            elif item == '|':
+                and_items_list.append([])
+            elif item != '&' and is_conditional:
+                # xtrigger label, not allowed in conditional expressions
+                raise ValueError(item)
+        return Condition.get_or(
+            [Condition.get_and(and_items) for and_items in and_items_list])
+
+    @classmethod
+    def _is_conditional_list(cls, nested_expr):
+        """Return True if nested list contains a "|"."""
+        for item in nested_expr:
+            if item == '|' or (
+                    isinstance(item, list) and
+                    cls._is_conditional_list(item)):
+                return True
+        return False
+
     def get_expression(self, point):
         """Return the expression as a string.
 
@@ -33,6 +33,7 @@ TMPL_TASK_NAME = 'name'
 TMPL_SUITE_RUN_DIR = 'suite_run_dir'
 TMPL_SUITE_SHARE_DIR = 'suite_share_dir'
 TMPL_DEBUG_MODE = 'debug'
+TASK_TEMPLATES = [TMPL_TASK_IDENT, TMPL_TASK_NAME]
 ARG_VAL_TEMPLATES = [
     TMPL_TASK_CYCLE_POINT, TMPL_TASK_IDENT, TMPL_TASK_NAME, TMPL_SUITE_RUN_DIR,
     TMPL_SUITE_SHARE_DIR, TMPL_USER_NAME, TMPL_SUITE_NAME, TMPL_DEBUG_MODE]
@@ -71,6 +72,12 @@ class XtriggerManager(object):
     "name(args):INTVL") determines frequency of calls (default PT10S).
 
     Once a trigger is satisfied, remember it until the cleanup cutoff point.
+    When a function call returns satisfied, all task proxies waiting on its
+    signature are satisfied at once.
+
+    The signature and templated function context of each trigger label are
+    computed once per cycle point (per task name if the arguments use task
+    templates), and cached while any task proxy in the pool needs them.
 
     Clock triggers are treated separately and called synchronously in the main
     process, because they are guaranteed to be quick (but they are still
@@ -92,12 +99,21 @@ class XtriggerManager(object):
         # Satisfied triggers and their function results, by signature.
         self.sat_xtrig = {}
         # Signatures of satisfied clock triggers.
-        self.sat_xclock = []
+        self.sat_xclock = set()
         # Signatures of active functions (waiting on callback).
-        self.active = []
+        self.active = set()
         # All trigger and clock signatures in the current task pool.
-        self.all_xtrig = []
-        self.all_xclock = []
+        self.all_xtrig = set()
+        self.all_xclock = set()
+        # Unsatisfied (label, task proxy) in the current task pool, by
+        # trigger signature.
+        self.waitings = {}
+        # Labels of triggers with task name or ID templates in their args.
+        self.task_tmpl_labels = set()
+        # (signature, context) by (label, point, task name or None).
+        self.xtrig_cache = {}
+        # (signature, context) by (label, point as seconds).
+        self.xclock_cache = {}
 
         self.pflag = False
 
@@ -115,10 +131,13 @@ class XtriggerManager(object):
     def add_clock(self, label, fctx):
         """Add a new clock xtrigger."""
         self.clockx_map[label] = fctx
+        self.xclock_cache.clear()
 
     def add_trig(self, label, fctx):
         """Add a new xtrigger."""
         self.functx_map[label] = fctx
+        self.task_tmpl_labels.discard(label)
+        self.xtrig_cache.clear()
         # Check any string templates in the function arg values (note this
         # won't catch bad task-specific values - which are added dynamically).
         for argv in fctx.func_args + fctx.func_kwargs.values():
@@ -128,6 +147,8 @@ class XtriggerManager(object):
                         raise ValueError(
                             "Illegal template in xtrigger %s: %s" % (
                                 label, match))
+                    if match in TASK_TEMPLATES:
+                        self.task_tmpl_labels.add(label)
             except TypeError:
                 # Not a string arg.
                 pass
@@ -144,8 +165,7 @@ class XtriggerManager(object):
         for sig in list(self.sat_xtrig):
             if sig not in self.all_xtrig:
                 del self.sat_xtrig[sig]
-        self.sat_xclock = [
-            sig for sig in self.sat_xclock if sig in self.all_xclock]
+        self.sat_xclock &= self.all_xclock
 
     def satisfy_xclock(self, itask):
         """Attempt to satisfy itask's clock trigger, if it has one."""
@@ -155,86 +175,133 @@ class XtriggerManager(object):
         if wall_clock(*ctx.func_args, **ctx.func_kwargs):
             satisfied = True
             itask.state.xclock = (label, True)
-            self.sat_xclock.append(sig)
+            self.sat_xclock.add(sig)
             LOG.info('clock xtrigger satisfied: %s = %s' % (label, str(ctx)))
 
-    def _get_xclock(self, itask, sig_only=False):
-        """(Internal helper method.)"""
+    def _get_xclock(self, itask, sig_only=False, xclock_cache=None):
+        """(Internal helper method.)
+
+        Look up and store (signature, context) in xclock_cache if specified,
+        otherwise in self.xclock_cache.
+        """
+        if xclock_cache is None:
+            xclock_cache = self.xclock_cache
         label, satisfied = itask.state.xclock
-        ctx = deepcopy(self.clockx_map[label])
-        ctx.func_kwargs.update(
-            {
-                'point_as_seconds': itask.get_point_as_seconds(),
-            }
-        )
-        sig = ctx.get_signature()
+        point_as_seconds = itask.get_point_as_seconds()
+        key = (label, point_as_seconds)
+        try:
+            sig, ctx = xclock_cache[key]
+        except KeyError:
+            try:
+                sig, ctx = self.xclock_cache[key]
+            except KeyError:
+                ctx = deepcopy(self.clockx_map[label])
+                ctx.func_kwargs.update(
+                    {
+                        'point_as_seconds': point_as_seconds,
+                    }
+                )
+                sig = ctx.get_signature()
+            xclock_cache[key] = (sig, ctx)
         if sig_only:
             return sig
         else:
             return (label, sig, ctx, satisfied)
 
-    def _get_xtrig(self, itask, unsat_only=False, sigs_only=False):
-        """(Internal helper method.)"""
+    def _get_xtrig(self, itask, unsat_only=False, sigs_only=False,
+                   xtrig_cache=None):
+        """(Internal helper method.)
+
+        Look up and store (signature, context) in xtrig_cache if specified,
+        otherwise in self.xtrig_cache.
+        """
+        if xtrig_cache is None:
+            xtrig_cache = self.xtrig_cache
         res = []
-        farg_templ = {}
-        farg_templ[TMPL_TASK_CYCLE_POINT] = str(itask.point)
-        farg_templ[TMPL_TASK_NAME] = str(itask.tdef.name)
-        farg_templ[TMPL_TASK_IDENT] = str(itask.identity)
-        farg_templ.update(self.farg_templ)
+        farg_templ = None
+        point = str(itask.point)
         for label, satisfied in itask.state.xtriggers.items():
             if unsat_only and satisfied:
                 continue
-            ctx = deepcopy(self.functx_map[label])
-            ctx.point = itask.point
-            kwargs = {}
-            args = []
-            # Replace legal string templates in function arg values.
-            for val in ctx.func_args:
-                try:
-                    val = val % farg_templ
-                except TypeError:
-                    pass
-                args.append(val)
-            for key, val in ctx.func_kwargs.items():
+            if label in self.task_tmpl_labels:
+                key = (label, point, itask.tdef.name)
+            else:
+                key = (label, point, None)
+            try:
+                sig, ctx = xtrig_cache[key]
+            except KeyError:
                 try:
-                    val = val % farg_templ
-                except TypeError:
-                    pass
-                kwargs[key] = val
-            ctx.func_args = args
-            ctx.func_kwargs = kwargs
-            ctx.update_command(self.suite_source_dir)
-            sig = ctx.get_signature()
+                    sig, ctx = self.xtrig_cache[key]
+                except KeyError:
+                    if farg_templ is None:
+                        farg_templ = {}
+                        farg_templ[TMPL_TASK_CYCLE_POINT] = point
+                        farg_templ[TMPL_TASK_NAME] = str(itask.tdef.name)
+                        farg_templ[TMPL_TASK_IDENT] = str(itask.identity)
+                        farg_templ.update(self.farg_templ)
+                    sig, ctx = self._get_xtrig_ctx(
+                        label, itask.point, farg_templ)
+                xtrig_cache[key] = (sig, ctx)
             if sigs_only:
                 res.append(sig)
             else:
                 res.append((label, sig, ctx, satisfied))
         return res
 
+    def _get_xtrig_ctx(self, label, point, farg_templ):
+        """Return (signature, context) of trigger label at point.
+
+        Replace legal string templates in function arg values with values in
+        farg_templ.
+        """
+        ctx = deepcopy(self.functx_map[label])
+        ctx.point = point
+        kwargs = {}
+        args = []
+        for val in ctx.func_args:
+            try:
+                val = val % farg_templ
+            except TypeError:
+                pass
+            args.append(val)
+        for key, val in ctx.func_kwargs.items():
+            try:
+                val = val % farg_templ
+            except TypeError:
+                pass
+            kwargs[key] = val
+        ctx.func_args = args
+        ctx.func_kwargs = kwargs
+        ctx.update_command(self.suite_source_dir)
+        return ctx.get_signature(), ctx
+
     def collate(self, itasks):
-        """Get list of all current xtrigger sigs."""
-        self.all_xtrig = []
-        self.all_xclock = []
+        """Get all current xtrigger sigs, and task proxies waiting on them.
+
+        Drop cached contexts no longer needed by any task proxy.
+        """
+        self.all_xtrig = set()
+        self.all_xclock = set()
+        self.waitings = {}
+        xtrig_cache = {}
+        xclock_cache = {}
         for itask in itasks:
-            self.all_xtrig += self._get_xtrig(itask, sigs_only=True)
+            for label, sig, _, satisfied in self._get_xtrig(
+                    itask, xtrig_cache=xtrig_cache):
+                self.all_xtrig.add(sig)
+                if not satisfied:
+                    self.waitings.setdefault(sig, set()).add((label, itask))
             if itask.state.xclock is not None:
-                self.all_xclock.append(self._get_xclock(itask, sig_only=True))
+                self.all_xclock.add(self._get_xclock(
+                    itask, sig_only=True, xclock_cache=xclock_cache))
+        self.xtrig_cache = xtrig_cache
+        self.xclock_cache = xclock_cache
 
     def satisfy_xtriggers(self, itask, proc_pool):
         """Attempt to satisfy itask's xtriggers."""
         for label, sig, ctx, _ in self._get_xtrig(itask, unsat_only=True):
             if sig in self.sat_xtrig:
-                if not itask.state.xtriggers[label]:
-                    itask.state.xtriggers[label] = True
-                    res = {}
-                    for key, val in self.sat_xtrig[sig].items():
-                        res["%s_%s" % (label, key)] = val
-                    if res:
-                        self.broadcast_mgr.put_broadcast(
-                            [str(ctx.point)],
-                            [itask.tdef.name],
-                            [{'environment': res}],
-                        )
+                self._satisfy(sig, [(label, itask)])
                 continue
             if sig in self.active:
                 # Already waiting on this result.
@@ -245,18 +312,43 @@ class XtriggerManager(object):
                 continue
             self.t_next_call[sig] = now + ctx.intvl
             # Queue to the process pool, and record as active.
-            self.active.append(sig)
+            self.active.add(sig)
             proc_pool.put_command(ctx, self.callback)
 
+    def _satisfy(self, sig, label_itasks):
+        """Satisfy each (label, itask) with the results of sig.
+
+        Broadcast the results to the satisfied tasks, in one broadcast per
+        label and cycle point.
+        """
+        names_of = {}
+        for label, itask in label_itasks:
+            if itask.state.xtriggers[label]:
+                continue
+            itask.state.xtriggers[label] = True
+            names_of.setdefault((label, str(itask.point)), set()).add(
+                itask.tdef.name)
+        for (label, point), names in sorted(names_of.items()):
+            res = {}
+            for key, val in self.sat_xtrig[sig].items():
+                res["%s_%s" % (label, key)] = val
+            if res:
+                self.broadcast_mgr.put_broadcast(
+                    [point],
+                    sorted(names),
+                    [{'environment': res}],
+                )
+
     def callback(self, ctx):
         """Callback for asynchronous xtrigger functions.
 
-        Record satisfaction status and function results dict.
+        Record satisfaction status and function results dict. Satisfy task
+        proxies waiting on the function call signature.
 
         """
         LOG.debug(ctx)
         sig = ctx.get_signature()
-        self.active.remove(sig)
+        self.active.discard(sig)
         try:
             satisfied, results = json.loads(ctx.out)
         except ValueError:
@@ -265,3 +357,122 @@ class XtriggerManager(object):
         if satisfied:
             self.pflag = True
             self.sat_xtrig[sig] = results
+            self._satisfy(sig, self.waitings.pop(sig, []))
+
+
+if __name__ == "__main__":
+    import unittest
+    from cylc.mp_pool import SuiteFuncContext
+
+    class _TaskProxy(object):
+        """Mock task proxy."""
+
+        class _TaskDef(object):
+            """Mock task definition."""
+
+            def __init__(self, name):
+                self.name = name
+
+        class _TaskState(object):
+            """Mock task state."""
+
+            def __init__(self, xtriggers):
+                self.xclock = None
+                self.xtriggers = xtriggers
+
+        def __init__(self, name, point, labels):
+            self.tdef = self._TaskDef(name)
+            self.point = point
+            self.identity = '%s.%s' % (name, point)
+            self.state = self._TaskState(
+                dict((label, False) for label in labels))
+
+    class _BroadcastMgr(object):
+        """Mock broadcast manager."""
+
+        def __init__(self):
+            self.broadcasts = []
+
+        def put_broadcast(self, point_strings, namespaces, settings):
+            """Record a broadcast."""
+            self.broadcasts.append((point_strings, namespaces, settings))
+
+    class _ProcPool(object):
+        """Mock process pool."""
+
+        def __init__(self):
+            self.ctxs = []
+
+        def put_command(self, ctx, _):
+            """Record a command."""
+            self.ctxs.append(ctx)
+
+    class TestXtriggerManager(unittest.TestCase):
+        """Test XtriggerManager."""
+
+        def setUp(self):
+            self.broadcast_mgr = _BroadcastMgr()
+            self.proc_pool = _ProcPool()
+            self.xtrigger_mgr = XtriggerManager(
+                'suite', 'user', broadcast_mgr=self.broadcast_mgr,
+                suite_source_dir='suite_source_dir')
+            self.xtrigger_mgr.add_trig('x', SuiteFuncContext(
+                'x', 'echo', ['%(point)s'], {}, 10.0))
+            self.xtrigger_mgr.add_trig('y', SuiteFuncContext(
+                'y', 'echo', ['%(name)s'], {}, 10.0))
+
+        def _call(self, itasks, out):
+            """Collate and satisfy itasks, return function contexts called
+            back with out."""
+            self.xtrigger_mgr.collate(itasks)
+            for itask in itasks:
+                self.xtrigger_mgr.satisfy_xtriggers(itask, self.proc_pool)
+            ctxs = self.proc_pool.ctxs
+            self.proc_pool.ctxs = []
+            for ctx in ctxs:
+                ctx.out = out
+                self.xtrigger_mgr.callback(ctx)
+            return ctxs
+
+        def test_satisfy_waitings(self):
+            """One function call satisfies all tasks waiting on it."""
+            itasks = [
+                _TaskProxy(name, '1', ['x']) for name in ['foo', 'bar']]
+            itasks.append(_TaskProxy('baz', '2', ['x']))
+            ctxs = self._call(itasks, '[false, {}]')
+            self.assertEqual(
+                ['echo(1)', 'echo(2)'],
+                sorted(ctx.get_signature() for ctx in ctxs))
+            self.assertEqual(set(), self.xtrigger_mgr.active)
+            self.assertFalse(any(
+                itask.state.xtriggers['x'] for itask in itasks))
+            # Not called again before interval
+            self.assertEqual([], self._call(itasks, '[true, {"a": 1}]'))
+            for sig in self.xtrigger_mgr.t_next_call:
+                self.xtrigger_mgr.t_next_call[sig] = 0
+            self._call(itasks, '[true, {"a": 1}]')
+            self.assertTrue(all(
+                itask.state.xtriggers['x'] for itask in itasks))
+            self.assertEqual(
+                [(['1'], ['bar', 'foo'], [{'environment': {'x_a': 1}}]),
+                 (['2'], ['baz'], [{'environment': {'x_a': 1}}])],
+                sorted(self.broadcast_mgr.broadcasts))
+
+        def test_cache(self):
+            """Contexts are cached by point, and by name if needed."""
+            itasks = [
+                _TaskProxy(name, '1', ['x', 'y']) for name in ['foo', 'bar']]
+            ctxs = self._call(itasks, '[false, {}]')
+            self.assertEqual(
+                ['echo(1)', 'echo(bar)', 'echo(foo)'],
+                sorted(ctx.get_signature() for ctx in ctxs))
+            self.assertEqual(
+                [('x', '1', None), ('y', '1', 'bar'), ('y', '1', 'foo')],
+                sorted(self.xtrigger_mgr.xtrig_cache))
+            # Cache entries dropped with tasks
+            self.xtrigger_mgr.collate(itasks[0:1])
+            self.assertEqual(
+                [('x', '1', None), ('y', '1', 'foo')],
+                sorted(self.xtrigger_mgr.xtrig_cache))
+
+    unittest.main()
@@ -100,6 +100,20 @@ class OrderedDictWithDefaults(OrderedDict):
         """Include any default keys in the nonzero calculation."""
         return bool(self.keys())
 
+    def __reduce__(self):
+        """Pickle set items and attributes, bypassing the overrides above.
+
+        (Much faster than the OrderedDict default for large nested configs.)
+        """
+        items = [
+            (key, dict.__getitem__(self, key))
+            for key in OrderedDict.__iter__(self)]
+        attrs = dict(
+            (key, value) for key, value in vars(self).items()
+            if not key.startswith('_OrderedDict__'))
+        return (_unpickle_ordered_dict_with_defaults, (
+            self.__class__, items, attrs))
+
     def prepend(self, key, value, dict_setitem=dict.__setitem__):
         """Prepend new item in the ordered dict.
 
@@ -125,3 +139,12 @@ class OrderedDictWithDefaults(OrderedDict):
             root[1] = first[0] = self._OrderedDict__map[key] = [
                 root, first, key]
         dict_setitem(self, key, value)
+
+
+def _unpickle_ordered_dict_with_defaults(cls, items, attrs):
+    """Return a new OrderedDictWithDefaults (sub-class) from its pickle."""
+    odict = cls()
+    for key, value in items:
+        OrderedDict.__setitem__(odict, key, value)
+    odict.__dict__.update(attrs)
+    return odict
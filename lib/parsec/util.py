@@ -23,7 +23,7 @@ The copy and override functions below assume values are either dicts
 
 import sys
 from copy import copy
-from parsec.OrderedDict import OrderedDictWithDefaults
+from parsec.OrderedDict import OrderedDict, OrderedDictWithDefaults
 
 
 def listjoin(lst, none_str=''):
@@ -128,6 +128,50 @@ def pdeepcopy(source):
     return target
 
 
+def poverride_copy(source, sparse, prepend=False):
+    """Return a copy of pdict source, overridden by sparse as "poverride".
+
+    Copy on write: only the source sections in the path of an item in sparse
+    are copied, other sections and items are shared with source. Source is
+    not modified.
+
+    """
+    if not sparse:
+        return source
+    target = OrderedDictWithDefaults()
+    for key in source:
+        # Explicitly set items only, shared defaults are added below
+        target[key] = OrderedDict.__getitem__(source, key)
+    if hasattr(source, 'defaults_'):
+        target.defaults_ = source.defaults_
+    for key, val in sparse.items():
+        if isinstance(val, dict):
+            if OrderedDict.__contains__(target, key):
+                target[key] = poverride_copy(target[key], val, prepend)
+            else:
+                # Section in defaults, copy the defaults on write
+                section = target[key]
+                if target.defaults_ is source.defaults_:
+                    target.defaults_ = OrderedDictWithDefaults(
+                        OrderedDict.items(source.defaults_))
+                    if hasattr(source.defaults_, 'defaults_'):
+                        target.defaults_.defaults_ = (
+                            source.defaults_.defaults_)
+                target.defaults_[key] = poverride_copy(section, val, prepend)
+        else:
+            if prepend and (key not in target):
+                # Prepend new items in the target ordered dict.
+                setitem = target.prepend
+            else:
+                # Override in-place in the target ordered dict.
+                setitem = target.__setitem__
+            if isinstance(val, list):
+                setitem(key, val[:])
+            else:
+                setitem(key, val)
+    return target
+
+
 def poverride(target, sparse, prepend=False):
     """Override or add items in a target pdict.
 
@@ -0,0 +1,125 @@
+#!/bin/bash
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2018 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Test "get_latest_state" API call, summary changes since a given revision.
+
+json_check() {
+    # Load JSON from file in argument 1, and run the Python code in argument 2
+    # with "data" set to the loaded data.
+    local TEST_KEY="$1"
+    run_ok "${TEST_KEY}" python - "$@" <<'__PYTHON__'
+import json
+import sys
+data = json.load(open(sys.argv[1]))
+exec(sys.argv[2])
+__PYTHON__
+    if [[ -s "${TEST_KEY}.stderr" ]]; then
+        cat "${TEST_KEY}.stderr" >&2
+    fi
+}
+
+get_revision() {
+    python -c 'import json, sys; print(json.load(sys.stdin)["revision"])' <"$1"
+}
+
+. "$(dirname "$0")/test_header"
+set_test_number 9
+
+init_suite "${TEST_NAME_BASE}" <<'__SUITERC__'
+[cylc]
+    cycle point time zone = Z
+    [[events]]
+        abort on stalled = True
+        abort on inactivity = True
+        inactivity = PT2M
+[scheduling]
+    initial cycle point = 2010
+    final cycle point = 2012
+    [[dependencies]]
+        [[[P1Y]]]
+            graph = foo[-P1Y] => foo => bar
+[runtime]
+    [[FOOBAR]]
+    [[foo, bar]]
+        inherit = FOOBAR
+        script = true
+__SUITERC__
+
+TEST_NAME="${TEST_NAME_BASE}-validate"
+run_ok "${TEST_NAME}" cylc validate "${SUITE_NAME}"
+
+cylc run --hold "${SUITE_NAME}"
+UUID="$(python -c 'import uuid; print(uuid.uuid4())')"
+
+# Call 1, full, with revision
+run_ok "${TEST_NAME_BASE}-1" \
+    cylc client --set-uuid="${UUID}" 'get_latest_state' "${SUITE_NAME}" \
+    <<<'{"full_mode": true, "revision": 0}'
+json_check "${TEST_NAME_BASE}-1.stdout" '
+assert "summary" in data
+assert "summary_delta" not in data
+assert data["revision"] > 0
+assert "foo.20100101T0000Z" in data["summary"][1]
+'
+REVISION="$(get_revision "${TEST_NAME_BASE}-1.stdout")"
+
+# Call 2, no change since revision
+sleep 1
+run_ok "${TEST_NAME_BASE}-2" \
+    cylc client --set-uuid="${UUID}" 'get_latest_state' "${SUITE_NAME}" \
+    <<<"{\"revision\": ${REVISION}}"
+json_check "${TEST_NAME_BASE}-2.stdout" "
+assert 'summary' not in data
+assert 'summary_delta' not in data
+assert data['revision'] == ${REVISION}
+"
+
+# Run the 2010 tasks and wait
+cylc release "${SUITE_NAME}" '2010/*'
+cylc suite-state "${SUITE_NAME}" \
+    --task='foo' --status='succeeded' --point='20100101T0000Z' \
+    --interval=1 --max-polls=20
+
+# Call 3, changes since revision
+sleep 1
+run_ok "${TEST_NAME_BASE}-3" \
+    cylc client --set-uuid="${UUID}" 'get_latest_state' "${SUITE_NAME}" \
+    <<<"{\"revision\": ${REVISION}}"
+json_check "${TEST_NAME_BASE}-3.stdout" "
+assert 'summary' not in data
+delta = data['summary_delta']
+assert data['revision'] == delta['revision'] > ${REVISION}
+assert delta['global']['status_string'] == 'held'
+assert delta['tasks']['foo.20100101T0000Z']['state'] == 'succeeded'
+assert 'bar.20100101T0000Z' in delta['tasks']
+assert 'foo.20110101T0000Z' in delta['tasks']
+assert 'FOOBAR.20100101T0000Z' in delta['families']
+"
+
+# Call 4, unknown revision, full
+run_ok "${TEST_NAME_BASE}-4" \
+    cylc client --set-uuid="${UUID}" 'get_latest_state' "${SUITE_NAME}" \
+    <<<'{"revision": 1}'
+json_check "${TEST_NAME_BASE}-4.stdout" '
+assert "summary" in data
+assert "summary_delta" not in data
+'
+
+# Stop and purge the suite.
+cylc stop --max-polls=20 --interval=1 "${SUITE_NAME}"
+purge_suite "${SUITE_NAME}"
+exit
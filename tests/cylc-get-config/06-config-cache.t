@@ -0,0 +1,77 @@
+#!/bin/bash
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2018 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#-------------------------------------------------------------------------------
+# Test the cache of the processed suite configuration is used, and is not used
+# after a change to an include-file, template variable or environment variable.
+. "$(dirname "$0")/test_header"
+#-------------------------------------------------------------------------------
+set_test_number 12
+#-------------------------------------------------------------------------------
+init_suite "${TEST_NAME_BASE}" <<'__SUITERC__'
+#!Jinja2
+[scheduling]
+    [[dependencies]]
+        graph = foo
+[runtime]
+    [[root]]
+        script = echo {{ GREETING | default("hello") }} {{ environ['SUBJECT'] }}
+%include inc.rc
+__SUITERC__
+cat >'inc.rc' <<'__RC__'
+    [[foo]]
+        pre-script = true
+__RC__
+CACHE="${SUITE_RUN_DIR}/.service/suite.rc.cache"
+export SUBJECT='world'
+
+get_config() {
+    local TEST_NAME="${TEST_NAME_BASE}-$1"
+    shift
+    run_ok "${TEST_NAME}" cylc get-config "$@" \
+        --item='[runtime][foo]pre-script' --item='[runtime][foo]script' \
+        "${SUITE_NAME}"
+    cmp_ok "${TEST_NAME}.stdout" -
+}
+
+get_config 'miss' <<'__OUT__'
+true
+echo hello world
+__OUT__
+exists_ok "${CACHE}"
+touch -d '2000-01-01' "${CACHE}"
+get_config 'hit' <<'__OUT__'
+true
+echo hello world
+__OUT__
+run_fail "${TEST_NAME_BASE}-hit-mtime" test "${CACHE}" -nt 'inc.rc'
+
+sed -i 's/true/false/' 'inc.rc'
+get_config 'include' <<'__OUT__'
+false
+echo hello world
+__OUT__
+get_config 'template-var' -s 'GREETING=bye' <<'__OUT__'
+false
+echo bye world
+__OUT__
+SUBJECT='moon' get_config 'environ' <<'__OUT__'
+false
+echo hello moon
+__OUT__
+#-------------------------------------------------------------------------------
+purge_suite "${SUITE_NAME}"
+exit
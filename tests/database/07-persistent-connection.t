@@ -0,0 +1,49 @@
+#!/bin/bash
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2018 NIWA & British Crown (Met Office) & Contributors.
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# Suite database content, with persistent database connections
+. "$(dirname "$0")/test_header"
+set_test_number 6
+install_suite "${TEST_NAME_BASE}" '00-simple'
+create_test_globalrc '' '
+[cylc]
+    database persistent connection = True'
+
+run_ok "${TEST_NAME_BASE}-validate" cylc validate "${SUITE_NAME}"
+suite_run_ok "${TEST_NAME_BASE}-run" cylc run --debug --no-detach "${SUITE_NAME}"
+
+if ! which sqlite3 > /dev/null; then
+    skip 4 "sqlite3 not installed?"
+    purge_suite "${SUITE_NAME}"
+    exit 0
+fi
+
+SUITE_RUN_DIR="$(cylc get-global-config '--print-run-dir')/${SUITE_NAME}"
+for DB_FILE in "${SUITE_RUN_DIR}/log/db" "${SUITE_RUN_DIR}/.service/db"; do
+    NAME='select-task-states.out'
+    sqlite3 "${DB_FILE}" \
+        'SELECT name, cycle, status FROM task_states ORDER BY name' \
+        >"${NAME}"
+    cmp_ok "${TEST_SOURCE_DIR}/00-simple/${NAME}" "${NAME}"
+    # Write-ahead log mode should not be left behind on shutdown
+    NAME='journal-mode.out'
+    sqlite3 "${DB_FILE}" 'PRAGMA journal_mode' >"${NAME}"
+    cmp_ok "${NAME}" <<<'delete'
+done
+
+unset CYLC_CONF_PATH
+purge_suite "${SUITE_NAME}"
+exit